@@ -0,0 +1,72 @@
+"""Compare the cached felt codec with the uncached conversions used before.
+
+Usage: python benchmarks/bench_felt.py [--number N]
+"""
+
+import argparse
+import random
+import timeit
+import warnings
+
+from pontis.core.utils import felt_to_str, felts_to_strs, str_to_felt, strs_to_felts
+
+# 3 hours of get_entries every 5 minutes, for 5 publishers with 7 sources each
+HISTORY_ENTRIES = 12 * 3 * 5 * 7
+
+
+def uncached_str_to_felt(text):
+    if text.lower() != text:
+        warnings.warn(
+            "Converting string to felt that has uppercase characters. Converting to lowercase."
+        )
+        text = text.lower()
+    return int.from_bytes(bytes(text, "utf-8"), "big")
+
+
+def uncached_felt_to_str(felt):
+    num_bytes = (felt.bit_length() + 7) // 8
+    return felt.to_bytes(num_bytes, "big").decode("utf-8")
+
+
+def sample_publishers(count, seed=0):
+    rng = random.Random(seed)
+    prefixes = ["pontis", "equilibrium", "argent", "gemini", "alphaleap"]
+    sources = ["coinbase", "gemini", "binance", "ftx", "cex", "bitstamp", "thegraph"]
+    return [f"{rng.choice(prefixes)}-{rng.choice(sources)}" for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+
+    publishers = sample_publishers(HISTORY_ENTRIES)
+    felts = [uncached_str_to_felt(publisher) for publisher in publishers]
+    candidates = {
+        "encode": {
+            "uncached": lambda: [uncached_str_to_felt(text) for text in publishers],
+            "str_to_felt": lambda: [str_to_felt(text) for text in publishers],
+            "strs_to_felts": lambda: strs_to_felts(publishers),
+        },
+        "decode": {
+            "uncached": lambda: [uncached_felt_to_str(felt) for felt in felts],
+            "felt_to_str": lambda: [felt_to_str(felt) for felt in felts],
+            "felts_to_strs": lambda: felts_to_strs(felts),
+        },
+    }
+
+    print(f"{HISTORY_ENTRIES} entries ({len(set(publishers))} distinct publishers)")
+    for operation, convert in candidates.items():
+        baseline = None
+        for name, run in convert.items():
+            seconds = min(timeit.repeat(run, number=args.number, repeat=5))
+            per_value = seconds / (args.number * HISTORY_ENTRIES) * 1e9
+            baseline = per_value if baseline is None else baseline
+            print(
+                f"{operation:>6} {name:>14}: {per_value:8.1f} ns/value "
+                f"({per_value / baseline:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Record exchange responses and benchmark the fetchers against them.
+
+Usage:
+    python benchmarks/bench_fetchers.py record [--fixtures PATH]
+    python benchmarks/bench_fetchers.py run [--fixtures PATH] [--latency S] [--number N]
+
+`record` runs every fetcher for PONTIS_ALL_ASSETS against the real APIs (API keys are
+read from the environment as usual) and saves the responses. `run` replays them:
+  * per fetcher, in-process without HTTP: parse time, peak allocations and requests
+  * all fetchers through a local HTTP stand-in with the given latency: cycle time,
+    peak allocations and requests
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+
+from pontis.publisher.assets import PONTIS_ALL_ASSETS
+from pontis.publisher.fetch import FETCHER_REGISTRY
+from pontis.publisher.orchestrator import fetch_all
+from pontis.publisher.replay import (
+    RecordedTransport,
+    Recordings,
+    RecordingTransport,
+    ReplayServer,
+    ReplayTransport,
+)
+
+DEFAULT_FIXTURES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fixtures", "responses.json"
+)
+# Decimals are read from the chain in production, they only affect scaling here
+DEFAULT_DECIMALS = 18
+# Any well-formed value will do, Coinbase expects a base64 secret
+REPLAY_CREDENTIALS = {
+    "COINBASE_API_SECRET": "cmVwbGF5",
+    "COINBASE_API_KEY": "replay",
+    "COINBASE_API_PASSPHRASE": "replay",
+    "FTX_API_KEY": "replay",
+    "FTX_API_SECRET": "replay",
+    "COINMARKETCAP_KEY": "replay",
+}
+
+
+def benchmark_assets():
+    return PONTIS_ALL_ASSETS.with_decimals([DEFAULT_DECIMALS] * len(PONTIS_ALL_ASSETS))
+
+
+async def record(path):
+    async with RecordingTransport() as transport:
+        entries_by_source = await fetch_all(benchmark_assets(), transport)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    transport.recordings.save(path)
+    for source, entries in entries_by_source.items():
+        print(f"{source:>14}: {len(entries)} entries")
+    print(f"Saved {len(transport.recordings)} responses to {path}")
+
+
+def quiet():
+    """Hide the progress the fetchers print, which would drown the results."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+async def measure(run):
+    """Run a coroutine function once, return (result, seconds, peak bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = await run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+async def bench_parse(recordings, number):
+    print("Per fetcher, replayed in-process (min time over runs):")
+    for fetcher in FETCHER_REGISTRY.values():
+        assets = fetcher.supported_assets(benchmark_assets())
+        if len(assets) == 0:
+            continue
+
+        timings = []
+        async with RecordedTransport(recordings) as transport:
+            try:
+                with quiet():
+                    for _ in range(number):
+                        start = time.perf_counter()
+                        entries = await fetcher.fetch(assets, transport)
+                        timings.append(time.perf_counter() - start)
+                    _, _, peak = await measure(lambda: fetcher.fetch(assets, transport))
+            except Exception as e:
+                print(f"{fetcher.name:>14}: failed on recorded responses ({e!r})")
+                continue
+            requests = sum(transport.request_counts.values()) // (number + 1)
+
+        print(
+            f"{fetcher.name:>14}: {min(timings) * 1e3:8.3f} ms"
+            f" {peak / 1024:8.1f} KiB peak {requests:3d} requests"
+            f" {len(entries or []):3d} entries"
+        )
+
+
+async def bench_cycle(recordings, latency, number):
+    print(f"All fetchers through the local stand-in, {latency * 1e3:.0f} ms latency:")
+    server = ReplayServer(recordings, latency=latency)
+
+    timings = []
+    async with server.serve() as base_url:
+        async with ReplayTransport(base_url) as transport:
+            for _ in range(number):
+                with quiet():
+                    entries_by_source, elapsed, peak = await measure(
+                        lambda: fetch_all(benchmark_assets(), transport)
+                    )
+                timings.append(elapsed)
+
+    entries = sum(len(entries) for entries in entries_by_source.values())
+    requests = sum(server.request_counts.values()) // number
+    print(
+        f"{'cycle':>14}: {min(timings) * 1e3:8.3f} ms"
+        f" {peak / 1024:8.1f} KiB peak {requests:3d} requests {entries:3d} entries"
+    )
+    if server.misses:
+        print(f"{len(set(server.misses))} requests had no recording, re-record?")
+
+
+async def run(path, latency, number):
+    if not os.path.exists(path):
+        raise SystemExit(
+            f"No recordings at {path}, create them with "
+            "`python benchmarks/bench_fetchers.py record`"
+        )
+    recordings = Recordings.load(path)
+
+    # Authenticated fetchers sign their requests, which are not recorded
+    for name, value in REPLAY_CREDENTIALS.items():
+        os.environ.setdefault(name, value)
+    os.environ.setdefault("PUBLISHER_PREFIX", "bench")
+
+    await bench_parse(recordings, number)
+    await bench_cycle(recordings, latency, number)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=["record", "run"])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record(args.fixtures))
+    else:
+        asyncio.run(run(args.fixtures, args.latency, args.number))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare exact fixed-point parsing with the float round-trip fetchers used before.
+
+Usage: python benchmarks/bench_fixed_point.py [--number N]
+"""
+
+import argparse
+import random
+import timeit
+
+from pontis.core.fixed_point import to_fixed, to_fixed_many
+
+DECIMALS = 18
+
+
+def float_round_trip(values, decimals):
+    return [int(float(value) * (10**decimals)) for value in values]
+
+
+def fixed_point(values, decimals):
+    return [to_fixed(value, decimals) for value in values]
+
+
+def sample_prices(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        f"{rng.uniform(0.0001, 100000):.{rng.randint(2, 10)}f}" for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    values = sample_prices(args.count)
+    candidates = {
+        "float round-trip": float_round_trip,
+        "to_fixed": fixed_point,
+        "to_fixed_many": to_fixed_many,
+    }
+
+    baseline = None
+    for name, convert in candidates.items():
+        seconds = min(
+            timeit.repeat(
+                lambda: convert(values, DECIMALS), number=args.number, repeat=5
+            )
+        )
+        per_value = seconds / (args.number * len(values)) * 1e9
+        baseline = per_value if baseline is None else baseline
+        print(f"{name:>18}: {per_value:8.1f} ns/value ({per_value / baseline:.2f}x)")
+
+    exact = to_fixed_many(values, DECIMALS)
+    mismatches = sum(a != b for a, b in zip(float_round_trip(values, DECIMALS), exact))
+    print(f"float round-trip differs from exact result on {mismatches}/{len(values)}")
+
+
+if __name__ == "__main__":
+    main()
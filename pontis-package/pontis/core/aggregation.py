@@ -0,0 +1,116 @@
+import numpy as np
+
+# Mirrors contracts/oracle_implementation/library.cairo
+TIMESTAMP_BUFFER = 3600
+
+# Largest value computed with int64, leaving room for the sort sentinel; larger
+# values (e.g. prices with 18 decimals) are computed exactly with Python ints
+MAX_INT64_VALUE = np.iinfo(np.int64).max - 1
+
+
+def is_entry_used(timestamp, now):
+    """Whether Oracle_build_entries_array keeps an entry at block timestamp `now`.
+
+    Uninitialized entries (timestamp 0) and entries at least TIMESTAMP_BUFFER old are
+    skipped.
+    """
+    return timestamp != 0 and timestamp > now - TIMESTAMP_BUFFER
+
+
+def build_entries_array(entries, now):
+    return [entry for entry in entries if is_entry_used(entry.timestamp, now)]
+
+
+def average_entries_value(value_1, value_2):
+    """Entry_average_entries_value: halves each value, then adds half the remainders."""
+    return value_1 // 2 + value_2 // 2 + (value_1 % 2 + value_2 % 2) // 2
+
+
+def entries_median(values):
+    """Entry_entries_median: the middle value, or the average of the two middle ones."""
+    sorted_values = sorted(values)
+    num_entries = len(sorted_values)
+    median_idx = num_entries - num_entries // 2 - 1
+    if num_entries % 2 == 1:
+        return sorted_values[median_idx]
+    return average_entries_value(
+        sorted_values[median_idx], sorted_values[median_idx + 1]
+    )
+
+
+def get_value(entries, now):
+    """Oracle_get_value for the entries of one key, as (value, last_updated_timestamp)."""
+    entries = build_entries_array(entries, now)
+    if len(entries) == 0:
+        return 0, 0
+    return (
+        entries_median([entry.value for entry in entries]),
+        max(entry.timestamp for entry in entries),
+    )
+
+
+def entry_arrays(entries, keys, publishers):
+    """Arrange entries into (values, timestamps) arrays of shape (keys, publishers).
+
+    Like the contract's storage, only the last entry per key and publisher is kept,
+    and missing entries have timestamp 0.
+    """
+    key_index = {key: i for i, key in enumerate(keys)}
+    publisher_index = {publisher: i for i, publisher in enumerate(publishers)}
+
+    values = np.zeros((len(keys), len(publishers)), dtype=object)
+    timestamps = np.zeros((len(keys), len(publishers)), dtype=np.int64)
+    for entry in entries:
+        if entry.key not in key_index or entry.publisher not in publisher_index:
+            continue
+        position = key_index[entry.key], publisher_index[entry.publisher]
+        values[position] = entry.value
+        timestamps[position] = entry.timestamp
+
+    return as_value_array(values), timestamps
+
+
+def as_value_array(values):
+    values = np.asarray(values)
+    if values.size == 0 or values.max() <= MAX_INT64_VALUE:
+        return values.astype(np.int64)
+    return values.astype(object)
+
+
+def get_values(values, timestamps, now):
+    """Vectorized Oracle_get_value over any number of keys and snapshots.
+
+    `values` and `timestamps` have shape (..., publishers), holding each publisher's
+    stored entry with timestamp 0 where there is none. `now` is the block timestamp
+    and is broadcast against the leading dimensions, e.g. one per snapshot. Returns
+    (values, last_updated_timestamps) arrays of the leading shape.
+    """
+    values = as_value_array(values)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    now = np.asarray(now, dtype=np.int64)[..., np.newaxis]
+    if values.shape[-1] == 0:
+        # Without publishers, a single uninitialized entry gives the same result
+        values = np.zeros(values.shape[:-1] + (1,), dtype=np.int64)
+        timestamps = np.zeros(timestamps.shape[:-1] + (1,), dtype=np.int64)
+
+    used = (timestamps != 0) & (timestamps > now - TIMESTAMP_BUFFER)
+    values, used, timestamps = np.broadcast_arrays(values, used, timestamps)
+    num_entries = used.sum(axis=-1)
+
+    # Skipped entries are sorted after every used one
+    sentinel = values.max() + 1
+    sorted_values = np.sort(np.where(used, values, sentinel), axis=-1)
+
+    median_idx_1 = np.maximum(num_entries - num_entries // 2 - 1, 0)
+    median_idx_2 = np.minimum(median_idx_1 + 1, values.shape[-1] - 1)
+    value_1 = np.take_along_axis(sorted_values, median_idx_1[..., np.newaxis], -1)
+    value_2 = np.take_along_axis(sorted_values, median_idx_2[..., np.newaxis], -1)
+    value_1, value_2 = value_1[..., 0], value_2[..., 0]
+
+    median = np.where(
+        num_entries % 2 == 1, value_1, average_entries_value(value_1, value_2)
+    )
+    median = np.where(num_entries == 0, 0, median)
+    last_updated_timestamp = np.where(used, timestamps, 0).max(axis=-1)
+
+    return median, last_updated_timestamp
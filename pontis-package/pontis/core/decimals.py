@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from pontis.core.utils import felt_to_str, str_to_felt
+
+DEFAULT_DECIMALS_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "pontis", "decimals.json"
+)
+# Seconds cached decimals are used before all of them are read again
+DEFAULT_MAX_AGE = 60 * 60
+
+
+class DecimalsCache:
+    """Decimals per key, per network and oracle controller, persisted in a JSON file.
+
+    Decimals can be changed in place on the controller without any event, so once
+    cached decimals are `max_age` seconds old, all of them are read again
+    concurrently and changed values replaced. Within that time no calls are made at
+    all. Without a `path`, the cache only lives in memory.
+    """
+
+    def __init__(self, path=None, max_age=None):
+        self.path = path
+        self.max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+        self.controllers = self.load()
+
+    def load(self):
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write the cache atomically, so that concurrent runs never read half of it."""
+        if self.path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.controllers, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save decimals cache to {self.path}: {e}")
+
+    @staticmethod
+    def controller_id(client):
+        return f"{client.network}:{client.oracle_controller_address:#x}"
+
+    def invalidate(self, client=None):
+        """Forget the decimals of the client's controller, or of every controller."""
+        if client is None:
+            self.controllers = {}
+        else:
+            self.controllers.pop(self.controller_id(client), None)
+        self.save()
+
+    async def get_many(self, client, keys):
+        """Decimals of each key, reading the ones not cached (or too old) concurrently."""
+        controller = self.controllers.setdefault(self.controller_id(client), {})
+        # Keys are stored as felts (in decimal, as JSON keys are strings), so that they
+        # can be read again whether they were given as strings or felts
+        cached = controller.setdefault("felt_decimals", {})
+        felt_keys = [str(str_to_felt(key) if type(key) == str else key) for key in keys]
+
+        now = time.time()
+        expired = now - controller.get("validated_at", 0) > self.max_age
+        stale = list(cached) if expired else []
+        missing = [key for key in dict.fromkeys(felt_keys) if key not in cached]
+        to_read = stale + missing
+
+        if len(to_read) > 0:
+            # Load the contract once, rather than once per concurrent read
+            await client.fetch_oracle_controller_contract()
+            decimals = await asyncio.gather(
+                *[client.get_decimals(int(key)) for key in to_read]
+            )
+            for key, key_decimals in zip(to_read, decimals):
+                if key in cached and cached[key] != key_decimals:
+                    print(
+                        f"Decimals of {felt_to_str(int(key))} changed from "
+                        f"{cached[key]} to {key_decimals}"
+                    )
+                cached[key] = key_decimals
+        if expired:
+            controller["validated_at"] = now
+        if len(to_read) > 0 or expired:
+            self.save()
+        return [cached[key] for key in felt_keys]
+
+    async def get(self, client, key):
+        [decimals] = await self.get_many(client, [key])
+        return decimals
+
+
+def default_decimals_cache():
+    """Decimals cache at PONTIS_DECIMALS_CACHE_PATH, or in the user's cache directory."""
+    return DecimalsCache(
+        os.environ.get("PONTIS_DECIMALS_CACHE_PATH", DEFAULT_DECIMALS_CACHE_PATH)
+    )
+
+
+async def load_decimals(client, assets, cache=None):
+    """Copy of `assets` (an AssetRegistry) with the decimals read from the client's
+    oracle controller.
+    """
+    cache = default_decimals_cache() if cache is None else cache
+    return assets.with_decimals(await cache.get_many(client, assets.keys()))
@@ -0,0 +1,98 @@
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+DECIMAL_NUMBER = re.compile(r"\s*([+-]?)(\d*)(?:\.(\d*))?(?:[eE]([+-]?\d+))?\s*")
+
+
+@lru_cache(maxsize=None)
+def pow10(exponent):
+    return 10**exponent
+
+
+def parse_decimal(value):
+    """Split a decimal number into (negative, mantissa, exponent), exactly.
+
+    Accepts strings, ints, Decimals and floats. Floats are read from their shortest
+    repr, so 0.1 is parsed as 1e-1 rather than its binary expansion.
+    """
+    if isinstance(value, bool):
+        raise TypeError(f"Cannot parse {value!r} as a decimal number")
+    if isinstance(value, int):
+        return value < 0, abs(value), 0
+    if isinstance(value, (float, Decimal)):
+        text = repr(value) if isinstance(value, float) else str(value)
+    elif isinstance(value, str):
+        text = value
+    else:
+        raise TypeError(f"Cannot parse {value!r} as a decimal number")
+
+    match = DECIMAL_NUMBER.fullmatch(text)
+    if match is None:
+        raise ValueError(f"Invalid decimal number {value!r}")
+
+    sign, integer, fraction, exponent = match.groups()
+    fraction = fraction or ""
+    if not integer and not fraction:
+        raise ValueError(f"Invalid decimal number {value!r}")
+
+    mantissa = int(integer + fraction)
+    return sign == "-", mantissa, int(exponent or 0) - len(fraction)
+
+
+def parse_plain_decimal(value):
+    """Fast path of `parse_decimal` for unsigned "123.45" strings, None otherwise."""
+    if not value.isascii():
+        return None
+    integer, _, fraction = value.partition(".")
+    if integer.isdigit() and (fraction.isdigit() or not fraction):
+        return int(integer + fraction), -len(fraction)
+    if not integer and fraction.isdigit():
+        return int(fraction), -len(fraction)
+    return None
+
+
+def scale(mantissa, shift):
+    if shift >= 0:
+        return mantissa * pow10(shift)
+    return mantissa // pow10(-shift)
+
+
+def to_fixed(value, decimals, input_decimals=0):
+    """Convert a decimal number to an integer with `decimals` decimals.
+
+    `input_decimals` is the number of decimals `value` is already scaled by, e.g. 27
+    for Aave rates. Digits beyond the target precision are truncated towards zero,
+    like `int(float(value) * 10 ** decimals)` did, but without float rounding errors.
+    """
+    if type(value) is str:
+        plain = parse_plain_decimal(value)
+        if plain is not None:
+            return scale(plain[0], plain[1] + decimals - input_decimals)
+
+    negative, mantissa, exponent = parse_decimal(value)
+    scaled = scale(mantissa, exponent + decimals - input_decimals)
+    return -scaled if negative else scaled
+
+
+def to_fixed_many(values, decimals, input_decimals=0):
+    """Convert a column of decimal numbers sharing the same `decimals`.
+
+    Same result as calling `to_fixed` on each value, with the fast path inlined.
+    """
+    shift = decimals - input_decimals
+    result = []
+    append = result.append
+    for value in values:
+        if type(value) is str and value.isascii():
+            integer, _, fraction = value.partition(".")
+            if integer.isdigit() and (fraction.isdigit() or not fraction):
+                value_shift = shift - len(fraction)
+                mantissa = int(integer + fraction)
+                if value_shift >= 0:
+                    append(mantissa * pow10(value_shift))
+                else:
+                    append(mantissa // pow10(-value_shift))
+                continue
+        append(to_fixed(value, decimals, input_decimals))
+    return result
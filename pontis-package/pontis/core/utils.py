@@ -1,6 +1,15 @@
+import sys
 import warnings
+from functools import lru_cache
 
+# Felts are integers modulo this prime, strings are encoded as Cairo short strings
+FELT_PRIME = 2**251 + 17 * 2**192 + 1
+MAX_SHORT_STRING_BYTES = 31
+# Keys and publishers are few, but entries repeat them constantly
+FELT_CACHE_SIZE = 4096
 
+
+@lru_cache(maxsize=FELT_CACHE_SIZE)
 def str_to_felt(text):
     if text.lower() != text:
         warnings.warn(
@@ -8,13 +17,40 @@ def str_to_felt(text):
         )
         text = text.lower()
     b_text = bytes(text, "utf-8")
+    if len(b_text) > MAX_SHORT_STRING_BYTES:
+        raise ValueError(
+            f"Cannot convert {text!r} to felt, it is longer than "
+            f"{MAX_SHORT_STRING_BYTES} bytes"
+        )
     return int.from_bytes(b_text, "big")
 
 
+@lru_cache(maxsize=FELT_CACHE_SIZE)
 def felt_to_str(felt):
+    if not 0 <= felt < FELT_PRIME:
+        raise ValueError(f"{felt} is not a felt")
     num_bytes = (felt.bit_length() + 7) // 8
     bytes = felt.to_bytes(num_bytes, "big")
-    return bytes.decode("utf-8")
+    # Decoded strings are interned, so repeated publishers and keys share one object
+    return sys.intern(bytes.decode("utf-8"))
+
+
+def strs_to_felts(texts):
+    """Convert many strings to felts, e.g. the keys of a batch of entries."""
+    if hasattr(texts, "tolist"):
+        texts = texts.tolist()
+    return list(map(str_to_felt, texts))
+
+
+def felts_to_strs(felts):
+    """Convert many felts to strings, e.g. the publishers of an entries history.
+
+    Accepts any iterable of integers, including NumPy arrays and pandas columns.
+    """
+    if hasattr(felts, "tolist"):
+        # Array elements are converted to Python ints at once
+        felts = felts.tolist()
+    return list(map(felt_to_str, felts))
 
 
 def currency_pair_to_key(quote, base):
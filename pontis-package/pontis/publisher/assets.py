@@ -1,26 +1,182 @@
-PONTIS_ALL_ASSETS = [
-    {"type": "SPOT", "pair": ("BTC", "USD")},
-    {"type": "SPOT", "pair": ("ETH", "USD")},
-    {"type": "SPOT", "pair": ("SOL", "USD")},
-    {"type": "SPOT", "pair": ("AVAX", "USD")},
-    {"type": "SPOT", "pair": ("DOGE", "USD")},
-    {"type": "SPOT", "pair": ("SHIB", "USD")},
-    {"type": "SPOT", "pair": ("TEMP", "USD")},
-    {"type": "SPOT", "pair": ("DAI", "USD")},
-    {"type": "SPOT", "pair": ("USDT", "USD")},
-    {"type": "SPOT", "pair": ("USDC", "USD")},
-    {"type": "SPOT", "pair": ("TUSD", "USD")},
-    {"type": "SPOT", "pair": ("ETH", "MXN")},
-    {"type": "FUTURE", "pair": ("BTC", "USD")},
-    {"type": "FUTURE", "pair": ("ETH", "USD")},
-    {
-        "type": "ONCHAIN",
-        "source": "AAVE",
-        "key": "aave-on-borrow",
-        "detail": {
-            "asset_name": "USD Coin",
-            "asset_address": "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb480xb53c1a33016b2dc2ff3653530bff1848a515c8c5",
-            "metric": "variableBorrowRate",
-        },
-    },
-]
+from types import MappingProxyType
+
+from pontis.core.utils import currency_pair_to_key, str_to_felt
+
+
+class Asset:
+    """An asset to publish, immutable and with its keys computed once.
+
+    Pair assets (SPOT, FUTURE) are keyed by their currency pair, ONCHAIN assets by their
+    `key`, and also have a `source` and a `detail` mapping telling how to fetch them.
+    `decimals` is None until it is read from the oracle controller, see
+    `AssetRegistry.with_decimals`.
+    """
+
+    __slots__ = ("type", "pair", "key", "felt_key", "source", "detail", "decimals")
+
+    def __init__(
+        self, type, pair=None, key=None, source=None, detail=None, decimals=None
+    ):
+        if pair is None and key is None:
+            raise ValueError("Asset needs either a pair or a key")
+        pair = None if pair is None else tuple(pair)
+        key = currency_pair_to_key(*pair) if key is None else key
+        detail = None if detail is None else MappingProxyType(dict(detail))
+
+        set_slot = object.__setattr__
+        set_slot(self, "type", type)
+        set_slot(self, "pair", pair)
+        set_slot(self, "key", key)
+        set_slot(self, "felt_key", str_to_felt(key))
+        set_slot(self, "source", source)
+        set_slot(self, "detail", detail)
+        set_slot(self, "decimals", decimals)
+
+    @classmethod
+    def from_dict(cls, asset):
+        return asset if isinstance(asset, cls) else cls(**asset)
+
+    def arguments(self):
+        return (
+            self.type,
+            self.pair,
+            self.key,
+            self.source,
+            None if self.detail is None else dict(self.detail),
+            self.decimals,
+        )
+
+    def with_decimals(self, decimals):
+        arguments = self.arguments()
+        return Asset(*arguments[:-1], decimals)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Asset is immutable, cannot set {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Asset is immutable, cannot delete {name}")
+
+    def __reduce__(self):
+        return Asset, self.arguments()
+
+    def __eq__(self, other):
+        if not isinstance(other, Asset):
+            return NotImplemented
+        return self.arguments() == other.arguments()
+
+    def __hash__(self):
+        return hash((self.type, self.key, self.decimals))
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in ("type", "pair", "key", "source", "decimals")
+            if getattr(self, name) is not None
+        )
+        return f"Asset({fields})"
+
+
+class AssetRegistry:
+    """Immutable sequence of assets, indexed by type, by source and by felt key.
+
+    Decimals are read once per run, so rather than being set on shared assets they are
+    carried by a copy of the registry made with `with_decimals`, which each run keeps
+    to itself.
+    """
+
+    __slots__ = ("assets", "types", "sources", "felt_keys")
+
+    def __init__(self, assets):
+        assets = tuple(Asset.from_dict(asset) for asset in assets)
+        types = {}
+        sources = {}
+        felt_keys = {}
+        for asset in assets:
+            types.setdefault(asset.type, []).append(asset)
+            if asset.source is not None:
+                sources.setdefault(asset.source, []).append(asset)
+            # Spot and future prices of a pair share a key, the spot price comes first
+            felt_keys.setdefault(asset.felt_key, asset)
+
+        set_slot = object.__setattr__
+        set_slot(self, "assets", assets)
+        set_slot(self, "types", {name: tuple(group) for name, group in types.items()})
+        set_slot(self, "sources", {name: tuple(g) for name, g in sources.items()})
+        set_slot(self, "felt_keys", felt_keys)
+
+    @classmethod
+    def from_assets(cls, assets):
+        return assets if isinstance(assets, cls) else cls(assets)
+
+    def by_type(self, asset_type):
+        return self.types.get(asset_type, ())
+
+    def by_source(self, source):
+        return self.sources.get(source, ())
+
+    def by_felt_key(self, felt_key):
+        """Asset with the given felt key (the SPOT one for pairs), None if there is none."""
+        return self.felt_keys.get(felt_key)
+
+    def keys(self):
+        return [asset.key for asset in self.assets]
+
+    def with_decimals(self, decimals):
+        """Copy of the registry with the given decimals, in the order of the assets."""
+        decimals = list(decimals)
+        if len(decimals) != len(self.assets):
+            raise ValueError(
+                f"Got {len(decimals)} decimals for {len(self.assets)} assets"
+            )
+        return AssetRegistry(
+            asset.with_decimals(asset_decimals)
+            for asset, asset_decimals in zip(self.assets, decimals)
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"AssetRegistry is immutable, cannot set {name}")
+
+    def __reduce__(self):
+        return AssetRegistry, (self.assets,)
+
+    def __iter__(self):
+        return iter(self.assets)
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __getitem__(self, index):
+        return self.assets[index]
+
+    def __repr__(self):
+        return f"AssetRegistry({list(self.assets)!r})"
+
+
+PONTIS_ALL_ASSETS = AssetRegistry(
+    [
+        Asset("SPOT", ("BTC", "USD")),
+        Asset("SPOT", ("ETH", "USD")),
+        Asset("SPOT", ("SOL", "USD")),
+        Asset("SPOT", ("AVAX", "USD")),
+        Asset("SPOT", ("DOGE", "USD")),
+        Asset("SPOT", ("SHIB", "USD")),
+        Asset("SPOT", ("TEMP", "USD")),
+        Asset("SPOT", ("DAI", "USD")),
+        Asset("SPOT", ("USDT", "USD")),
+        Asset("SPOT", ("USDC", "USD")),
+        Asset("SPOT", ("TUSD", "USD")),
+        Asset("SPOT", ("ETH", "MXN")),
+        Asset("FUTURE", ("BTC", "USD")),
+        Asset("FUTURE", ("ETH", "USD")),
+        Asset(
+            "ONCHAIN",
+            key="aave-on-borrow",
+            source="AAVE",
+            detail={
+                "asset_name": "USD Coin",
+                "asset_address": "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb480xb53c1a33016b2dc2ff3653530bff1848a515c8c5",
+                "metric": "variableBorrowRate",
+            },
+        ),
+    ]
+)
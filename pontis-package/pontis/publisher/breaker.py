@@ -0,0 +1,146 @@
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+DEFAULT_WINDOW = 5  # latest fetches the failure rate is computed over
+DEFAULT_MIN_CALLS = 3  # fetches needed before the circuit can open
+DEFAULT_FAILURE_RATE = 0.6  # share of failed (or slow) fetches that opens the circuit
+DEFAULT_SLOW_CALL_DURATION = 15  # seconds; slower fetches count as failures
+DEFAULT_OPEN_DURATION = 60  # seconds before an open circuit is probed again
+MAX_OPEN_DURATION = 30 * 60  # open duration doubles on each failed probe, up to this
+
+
+class CircuitBreaker:
+    """Circuit breaker for one source.
+
+    Closed, the source is fetched as usual and outcomes are recorded. When enough of
+    the latest fetches failed or were too slow, the circuit opens and the source is
+    skipped. After `open_duration` it goes half-open and a single probe fetch is let
+    through: success closes the circuit, failure opens it again for twice as long.
+    """
+
+    def __init__(
+        self,
+        window=None,
+        min_calls=None,
+        failure_rate=None,
+        slow_call_duration=None,
+        open_duration=None,
+    ):
+        self.min_calls = DEFAULT_MIN_CALLS if min_calls is None else min_calls
+        self.failure_rate = (
+            DEFAULT_FAILURE_RATE if failure_rate is None else failure_rate
+        )
+        self.slow_call_duration = (
+            DEFAULT_SLOW_CALL_DURATION
+            if slow_call_duration is None
+            else slow_call_duration
+        )
+        self.base_open_duration = (
+            DEFAULT_OPEN_DURATION if open_duration is None else open_duration
+        )
+
+        self.outcomes = deque(maxlen=DEFAULT_WINDOW if window is None else window)
+        self.state = CLOSED
+        self.open_duration = self.base_open_duration
+        self.opened_at = None
+        self.probing = False
+        self.last_error = None
+
+    def current_state(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.state == OPEN and now - self.opened_at >= self.open_duration:
+            self.state = HALF_OPEN
+        return self.state
+
+    def allow(self, now=None):
+        """Whether the source should be fetched now."""
+        state = self.current_state(now)
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def current_failure_rate(self):
+        if len(self.outcomes) == 0:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def record_success(self, duration, now=None):
+        if duration > self.slow_call_duration:
+            self.record_failure(
+                f"Fetch took {duration:.1f}s, more than {self.slow_call_duration}s",
+                now,
+            )
+            return
+
+        if self.state == HALF_OPEN:
+            self.outcomes.clear()
+            self.open_duration = self.base_open_duration
+        self.state = CLOSED
+        self.probing = False
+        self.outcomes.append(True)
+
+    def record_failure(self, error=None, now=None):
+        self.last_error = None if error is None else str(error)
+        self.outcomes.append(False)
+
+        if self.state == HALF_OPEN:
+            self.open_duration = min(2 * self.open_duration, MAX_OPEN_DURATION)
+            self.trip(now)
+        elif (
+            len(self.outcomes) >= self.min_calls
+            and self.current_failure_rate() >= self.failure_rate
+        ):
+            self.trip(now)
+
+    def trip(self, now=None):
+        self.state = OPEN
+        self.opened_at = time.monotonic() if now is None else now
+        self.probing = False
+
+    def status(self, now=None):
+        now = time.monotonic() if now is None else now
+        state = self.current_state(now)
+        return {
+            "state": state,
+            "failure_rate": self.current_failure_rate(),
+            "calls": len(self.outcomes),
+            "retry_in": (
+                max(0.0, self.opened_at + self.open_duration - now)
+                if state == OPEN
+                else None
+            ),
+            "last_error": self.last_error,
+        }
+
+
+class CircuitBreakers:
+    """One `CircuitBreaker` per source, created on first use with shared settings."""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self.breakers = {}
+
+    def breaker_for(self, source):
+        if source not in self.breakers:
+            self.breakers[source] = CircuitBreaker(**self.settings)
+        return self.breakers[source]
+
+    def allow(self, source):
+        return self.breaker_for(source).allow()
+
+    def record_success(self, source, duration):
+        self.breaker_for(source).record_success(duration)
+
+    def record_failure(self, source, error=None):
+        self.breaker_for(source).record_failure(error)
+
+    def status(self):
+        """State of every source's breaker, by source name."""
+        return {source: breaker.status() for source, breaker in self.breakers.items()}
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+# Share of the cycle budget a single source may take, leaving time to publish
+DEFAULT_SOURCE_SHARE = 0.8
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class CycleBudget:
+    """Time budget for fetching in one publish cycle.
+
+    Each source gets a slice of the budget (`source_shares[name]`, or
+    `default_share`, times `seconds`), capped by the time left in the cycle. Fetches
+    still running when their slice runs out are cancelled and listed in `skipped`.
+    """
+
+    def __init__(self, seconds, source_shares=None, default_share=None):
+        self.seconds = seconds
+        self.source_shares = {} if source_shares is None else source_shares
+        self.default_share = (
+            DEFAULT_SOURCE_SHARE if default_share is None else default_share
+        )
+        self.started_at = time.monotonic()
+        self.skipped = []
+
+    def remaining(self):
+        return max(0.0, self.started_at + self.seconds - time.monotonic())
+
+    def timeout_for(self, source):
+        share = self.source_shares.get(source, self.default_share)
+        return min(self.remaining(), share * self.seconds)
+
+    async def run(self, source, fetch):
+        """Await `fetch`, cancelling it once `source`'s slice is spent.
+
+        Raises DeadlineExceeded if it was cancelled.
+        """
+        timeout = self.timeout_for(source)
+        task = asyncio.ensure_future(fetch)
+        try:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+        finally:
+            if not task.done():
+                task.cancel()
+
+        if len(done) == 0:
+            print(f"Cancelled {source} as it did not finish within {timeout:.1f}s")
+            self.skipped.append(source)
+            raise DeadlineExceeded(f"{source} did not finish within {timeout:.1f}s")
+        return task.result()
+
+
+async def within_budget(source, fetch, budget):
+    if budget is None:
+        return await fetch
+    return await budget.run(source, fetch)
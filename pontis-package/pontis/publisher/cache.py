@@ -0,0 +1,174 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter, namedtuple
+from urllib.parse import urlencode
+
+# Seconds a response is served without contacting the source. Sources without a TTL
+# are always revalidated, which is still cheaper when they support ETag or
+# Last-Modified.
+DEFAULT_TTLS = {
+    "Coingecko": 30,
+    "Coinmarketcap": 30,
+}
+
+# Response headers kept with a cached entry (looked up case-insensitively)
+CACHED_HEADERS = ("ETag", "Last-Modified", "Content-Type")
+
+CacheEntry = namedtuple("CacheEntry", ["status", "headers", "body", "url", "stored_at"])
+
+
+class MemoryCacheBackend:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, entry):
+        self.entries[key] = entry
+
+    def clear(self):
+        self.entries = {}
+
+
+class DiskCacheBackend:
+    """Stores one JSON file per cache key, so that processes on one host can share it.
+
+    Files are written atomically (write to a temporary file, then rename), so readers
+    never see a partially written entry.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self.path_for(key), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return CacheEntry(
+            status=data["status"],
+            headers=data["headers"],
+            body=base64.b64decode(data["body"]),
+            url=data["url"],
+            stored_at=data["stored_at"],
+        )
+
+    def set(self, key, entry):
+        data = {
+            "status": entry.status,
+            "headers": entry.headers,
+            "body": base64.b64encode(entry.body).decode("ascii"),
+            "url": entry.url,
+            "stored_at": entry.stored_at,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path_for(key))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+class ResponseCache:
+    """Cache of GET responses with a TTL per source and conditional revalidation.
+
+    Fresh entries are served without a request. Stale entries that carry an ETag or
+    Last-Modified header are revalidated with If-None-Match / If-Modified-Since, and a
+    304 response refreshes the entry instead of downloading the body again.
+    """
+
+    def __init__(self, ttls=None, default_ttl=0, backend=None):
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self.backend = MemoryCacheBackend() if backend is None else backend
+        self.counters = Counter()
+
+    @staticmethod
+    def key_for(url, params=None):
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return url
+
+    def ttl_for(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def lookup(self, key, source=None):
+        """Returns (entry, is_fresh); entry is None on a miss."""
+        entry = self.backend.get(key)
+        if entry is None:
+            self.count("misses", source)
+            return None, False
+
+        if time.time() - entry.stored_at < self.ttl_for(source):
+            self.count("hits", source)
+            return entry, True
+
+        return entry, False
+
+    def conditional_headers(self, entry):
+        headers = {}
+        etag = entry.headers.get("ETag")
+        last_modified = entry.headers.get("Last-Modified")
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def store(self, key, status, headers, body, url):
+        entry = CacheEntry(
+            status=status,
+            headers={name: headers[name] for name in CACHED_HEADERS if name in headers},
+            body=body,
+            url=url,
+            stored_at=time.time(),
+        )
+        self.backend.set(key, entry)
+        return entry
+
+    def revalidated(self, key, entry, source=None):
+        """Record a 304 response for a stale entry and refresh it."""
+        self.count("revalidations", source)
+        return self.store(key, entry.status, entry.headers, entry.body, entry.url)
+
+    def stale(self, source=None):
+        self.count("misses", source)
+
+    def count(self, outcome, source):
+        self.counters[outcome] += 1
+        if source is not None:
+            self.counters[(source, outcome)] += 1
+
+    def stats(self, source=None):
+        """Hit, miss and revalidation counts, overall or for a single source."""
+        if source is None:
+            return {
+                outcome: self.counters[outcome]
+                for outcome in ("hits", "misses", "revalidations")
+            }
+        return {
+            outcome: self.counters[(source, outcome)]
+            for outcome in ("hits", "misses", "revalidations")
+        }
+
+
+def default_response_cache():
+    """Response cache shared on disk if PONTIS_HTTP_CACHE_DIR is set, in memory otherwise."""
+    cache_dir = os.environ.get("PONTIS_HTTP_CACHE_DIR")
+    backend = None if cache_dir is None else DiskCacheBackend(cache_dir)
+    return ResponseCache(backend=backend)
@@ -0,0 +1,285 @@
+import asyncio
+import os
+import signal
+import traceback
+
+from pontis.core.client import PontisClient
+from pontis.core.decimals import default_decimals_cache, load_decimals
+from pontis.publisher.assets import PONTIS_ALL_ASSETS, AssetRegistry
+from pontis.publisher.breaker import CLOSED, CircuitBreakers
+from pontis.publisher.budget import CycleBudget
+from pontis.publisher.cache import default_response_cache
+from pontis.publisher.client import PontisPublisherClient
+from pontis.publisher.fetch import FETCHER_REGISTRY
+from pontis.publisher.filter import PublishFilter
+from pontis.publisher.hedging import Hedger
+from pontis.publisher.orchestrator import (
+    create_executor,
+    fetch_all,
+    fetch_all_in_executor,
+    publish_all_sources,
+)
+from pontis.publisher.pipeline import stream_and_publish
+from pontis.publisher.ratelimit import RateLimiter
+from pontis.publisher.scheduler import CadenceScheduler
+from pontis.publisher.streaming import (
+    TickerCache,
+    create_streams,
+    with_streaming_fetchers,
+)
+from pontis.publisher.transport import Transport
+
+DEFAULT_INTERVAL = 60  # seconds between the starts of consecutive cycles
+
+
+def executor_from_env():
+    """Executor named by PONTIS_PUBLISHER_EXECUTOR ("thread" or "process"), if any."""
+    kind = os.environ.get("PONTIS_PUBLISHER_EXECUTOR")
+    if kind is None:
+        return None
+
+    max_workers = os.environ.get("PONTIS_PUBLISHER_WORKERS")
+    return create_executor(kind, None if max_workers is None else int(max_workers))
+
+
+def cycle_budget_from_env():
+    """Seconds set in PONTIS_PUBLISHER_CYCLE_BUDGET, if any."""
+    seconds = os.environ.get("PONTIS_PUBLISHER_CYCLE_BUDGET")
+    return None if seconds is None else float(seconds)
+
+
+def websockets_from_env():
+    """Source names listed in PONTIS_PUBLISHER_WEBSOCKETS, e.g. "Coinbase,Gemini"."""
+    sources = os.environ.get("PONTIS_PUBLISHER_WEBSOCKETS")
+    if not sources:
+        return []
+    return [source.strip() for source in sources.split(",") if source.strip()]
+
+
+class PublisherDaemon:
+    """Fetches and publishes all assets, keeping clients and connections across cycles.
+
+    Contract ABIs, decimals and HTTP connections are loaded once in `setup`, so a cycle
+    only pays for fetching and publishing (and, hourly, for re-reading decimals). If an
+    `executor` is given, fetchers run in it instead of on the event loop, and the daemon
+    shuts it down on `close`. With `streaming`, entries are published in batches as
+    they are fetched rather than once per source after every source has been fetched.
+    With a `cycle_budget` (in seconds), sources still fetching when their slice of it is
+    spent are cancelled and whatever was fetched in time is published. The
+    `websockets` sources (e.g. ["Coinbase"]) keep a websocket open from `setup` to
+    `close`, and their SPOT prices are read from it instead of fetched every cycle.
+    """
+
+    def __init__(
+        self,
+        publisher_private_key,
+        publisher_address,
+        assets=None,
+        fetchers=None,
+        exit_on_error=False,
+        thresholds=None,
+        executor=None,
+        streaming=False,
+        cycle_budget=None,
+        websockets=None,
+    ):
+        if executor is not None and streaming:
+            raise ValueError("Fetchers cannot both stream and run in an executor")
+        if executor is not None and websockets:
+            raise ValueError("Websocket sources cannot be read from an executor")
+
+        self.assets = AssetRegistry.from_assets(
+            PONTIS_ALL_ASSETS if assets is None else assets
+        )
+        self.ticker_cache = TickerCache()
+        self.streams = create_streams(websockets or [], self.assets)
+        if self.streams:
+            fetchers = with_streaming_fetchers(
+                list(FETCHER_REGISTRY.values()) if fetchers is None else fetchers,
+                self.streams,
+                self.ticker_cache,
+            )
+        self.fetchers = fetchers
+        self.exit_on_error = exit_on_error
+        self.executor = executor
+        self.streaming = streaming
+        self.cycle_budget = cycle_budget
+
+        self.client = PontisClient()
+        self.decimals_cache = default_decimals_cache()
+        self.publisher_client = PontisPublisherClient(
+            publisher_private_key, publisher_address
+        )
+        self.publish_filter = PublishFilter.from_assets(self.assets, thresholds)
+        self.cache = default_response_cache()
+        self.breakers = CircuitBreakers()
+        self.hedger = Hedger()
+        self.transport = Transport(
+            cache=self.cache, rate_limiter=RateLimiter(), hedger=self.hedger
+        )
+        self.scheduler = None
+
+    @classmethod
+    def from_env(cls, assets=None, fetchers=None):
+        executor = executor_from_env()
+        try:
+            return cls(
+                int(os.environ.get("PUBLISHER_PRIVATE_KEY")),
+                int(os.environ.get("PUBLISHER_ADDRESS")),
+                assets=assets,
+                fetchers=fetchers,
+                exit_on_error=os.environ.get("__PONTIS_PUBLISHER_EXIT_ON_ERROR__")
+                == "TRUE",
+                executor=executor,
+                streaming=os.environ.get("PONTIS_PUBLISHER_STREAMING") == "TRUE",
+                cycle_budget=cycle_budget_from_env(),
+                websockets=websockets_from_env(),
+            )
+        except Exception:
+            # The daemon owns the executor only once it has been created
+            if executor is not None:
+                executor.shutdown(wait=False)
+            raise
+
+    async def setup(self):
+        for stream in self.streams:
+            stream.start(self.ticker_cache)
+        self.assets = await load_decimals(self.client, self.assets, self.decimals_cache)
+
+    async def close(self):
+        for stream in self.streams:
+            await stream.stop()
+        await self.transport.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        await self.setup()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def fetch(self, budget=None):
+        if self.executor is not None:
+            return await fetch_all_in_executor(
+                self.assets,
+                self.executor,
+                fetchers=self.fetchers,
+                exit_on_error=self.exit_on_error,
+                breakers=self.breakers,
+                budget=budget,
+                transport=self.transport,
+            )
+
+        return await fetch_all(
+            self.assets,
+            self.transport,
+            fetchers=self.fetchers,
+            exit_on_error=self.exit_on_error,
+            breakers=self.breakers,
+            budget=budget,
+        )
+
+    def health(self):
+        """Circuit breaker state of every source fetched so far, by source name."""
+        return self.breakers.status()
+
+    async def fetch_and_publish(self, budget=None):
+        if self.streaming:
+            return await stream_and_publish(
+                self.publisher_client,
+                self.assets,
+                self.transport,
+                fetchers=self.fetchers,
+                exit_on_error=self.exit_on_error,
+                breakers=self.breakers,
+                budget=budget,
+                publish_filter=self.publish_filter,
+            )
+
+        entries_by_source = await self.fetch(budget)
+        return await publish_all_sources(
+            self.publisher_client,
+            entries_by_source,
+            fetchers=self.fetchers,
+            exit_on_error=self.exit_on_error,
+            publish_filter=self.publish_filter,
+        )
+
+    async def run_cycle(self, wait_for_accept=False):
+        budget = None
+        if self.cycle_budget is not None:
+            budget = CycleBudget(self.cycle_budget)
+
+        # Free while the cached decimals are fresh, picks up changed decimals otherwise
+        self.assets = await load_decimals(self.client, self.assets, self.decimals_cache)
+
+        invocation = await self.fetch_and_publish(budget)
+
+        if budget is not None and len(budget.skipped) > 0:
+            print(
+                f"Skipped {', '.join(budget.skipped)} as they missed the "
+                f"{self.cycle_budget}s cycle deadline"
+            )
+
+        print(f"Response cache stats: {self.cache.stats()}")
+        for source, status in self.health().items():
+            if status["state"] != CLOSED:
+                print(f"Circuit for {source} is {status['state']}: {status}")
+        for source in sorted(self.hedger.sources):
+            print(f"Hedging stats for {source}: {self.hedger.stats(source)}")
+
+        # Post success to Better Uptime
+        betteruptime_id = os.environ.get("BETTERUPTIME_ID")
+        await self.transport.get(
+            f"https://betteruptime.com/api/v1/heartbeat/{betteruptime_id}"
+        )
+
+        if wait_for_accept and invocation is not None:
+            # Wait for the last transaction we sent to be confirmed
+            print("Waiting for last tx to be confirmed...")
+            await self.publisher_client.wait_for_tx(
+                invocation.hash, wait_for_accept=True
+            )
+
+        return invocation
+
+    async def run_cycle_safely(self):
+        try:
+            await self.run_cycle()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.exit_on_error:
+                raise e
+            print(f"Error in publish cycle: {e}")
+            print(traceback.format_exc())
+
+    async def run(self, interval=DEFAULT_INTERVAL):
+        self.scheduler = CadenceScheduler(interval)
+        await self.scheduler.run(self.run_cycle_safely)
+
+    def stop(self):
+        """Stop after the current cycle has finished."""
+        print("Shutting down after the current cycle")
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+
+async def run_daemon(interval):
+    async with PublisherDaemon.from_env() as daemon:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, daemon.stop)
+        await daemon.run(interval)
+    print("Publisher daemon stopped")
+
+
+def main():
+    interval = float(os.environ.get("PONTIS_PUBLISHER_INTERVAL", DEFAULT_INTERVAL))
+    asyncio.run(run_daemon(interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
-from .binance import fetch_binance
-from .bitstamp import fetch_bitstamp
-from .cex import fetch_cex
-from .coinbase import fetch_coinbase
-from .coingecko import fetch_coingecko
-from .coinmarketcap import fetch_coinmarketcap
-from .ftx import fetch_ftx
-from .gemini import fetch_gemini
-from .thegraph import fetch_thegraph
+from .base import FETCHER_REGISTRY, Fetcher, register_fetcher
+from .binance import BinanceFetcher, fetch_binance, fetch_binance_async
+from .bitstamp import (
+    BitstampFetcher,
+    fetch_bitstamp,
+    fetch_bitstamp_async,
+    stream_bitstamp_async,
+)
+from .cex import CexFetcher, fetch_cex, fetch_cex_async, stream_cex_async
+from .coinbase import CoinbaseFetcher, fetch_coinbase, fetch_coinbase_async
+from .coingecko import CoingeckoFetcher, fetch_coingecko, fetch_coingecko_async
+from .coinmarketcap import (
+    CoinmarketcapFetcher,
+    fetch_coinmarketcap,
+    fetch_coinmarketcap_async,
+)
+from .ftx import FtxFetcher, fetch_ftx, fetch_ftx_async
+from .futures import FutureContract, FuturesIndex, future_key
+from .gemini import GeminiFetcher, fetch_gemini, fetch_gemini_async
+from .snapshot import ExchangeSnapshot, normalize_symbol
+from .thegraph import (
+    TheGraphFetcher,
+    fetch_thegraph,
+    fetch_thegraph_async,
+    stream_thegraph_async,
+)
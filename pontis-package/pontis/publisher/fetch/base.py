@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+
+from pontis.publisher.assets import AssetRegistry
+
+FETCHER_REGISTRY = {}
+
+
+def register_fetcher(fetcher_class):
+    """Class decorator that adds an instance of the fetcher to FETCHER_REGISTRY."""
+    FETCHER_REGISTRY[fetcher_class.name] = fetcher_class()
+    return fetcher_class
+
+
+class Fetcher(ABC):
+    # Human readable source name, e.g. "Coinbase"
+    name = None
+    # Used in log messages, e.g. "Coinbase price"
+    description = None
+    # Maps each supported asset type to the set of supported quote currencies,
+    # or to None if any quote currency is supported
+    asset_types = {}
+    # Optional set of supported base currencies
+    base_currencies = None
+    # Optional set of (base, quote) pairs; if set, no other pairs are supported
+    pairs = None
+    # Optional set of supported sources for ONCHAIN assets
+    onchain_sources = None
+    # Whether fetches update state that later fetches rely on, which would be lost in
+    # a process pool, so such fetchers run on the event loop instead
+    keeps_state = False
+
+    def supports(self, asset):
+        if asset.type not in self.asset_types:
+            return False
+
+        if asset.pair is not None:
+            pair = asset.pair
+            quote_currencies = self.asset_types[asset.type]
+            if quote_currencies is not None and pair[1] not in quote_currencies:
+                return False
+            if self.base_currencies is not None and pair[0] not in self.base_currencies:
+                return False
+            if self.pairs is not None and pair not in self.pairs:
+                return False
+
+        if asset.source is not None and self.onchain_sources is not None:
+            return asset.source in self.onchain_sources
+
+        return True
+
+    def supported_assets(self, assets):
+        assets = AssetRegistry.from_assets(assets)
+        return [asset for asset in assets if self.supports(asset)]
+
+    @abstractmethod
+    async def fetch(self, assets, transport):
+        pass
+
+    async def stream(self, assets, transport):
+        """Yield entries as they are fetched.
+
+        By default they are all yielded once `fetch` returns, fetchers that make one
+        request per asset override this to yield each entry as soon as it arrives.
+        """
+        entries = await self.fetch(assets, transport)
+        for entry in entries or []:
+            yield entry
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name}>"
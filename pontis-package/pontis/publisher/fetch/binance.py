@@ -1,50 +1,49 @@
-import datetime
 import os
-import re
 
-import requests
 from pontis.core.entry import construct_entry
+from pontis.core.fixed_point import to_fixed_many
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .futures import FuturesIndex, future_key
+from .utils import run_fetcher
 
-def fetch_binance(assets):
+SOURCE = "Binance"
+BASE_URL = "https://dapi.binance.com/dapi/v1"
+
+
+async def fetch_binance_async(assets, transport):
+    assets = AssetRegistry.from_assets(assets)
     PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
     publisher = PUBLISHER_PREFIX + "-binance"
 
-    base_url = "https://dapi.binance.com/dapi/v1"
-    response = requests.get(base_url + "/premiumIndex", timeout=20)
+    response = await transport.get(BASE_URL + "/premiumIndex", source=SOURCE)
+    premium_index = response.json()
+
+    futures_index = FuturesIndex.from_binance(premium_index)
 
     entries = []
 
     # Don't fetch spot data because Binance only has crypto/crypto spot price pairs
 
     for asset in assets:
-        if asset["type"] != "FUTURE":
+        if asset.type != "FUTURE":
             print(f"Skipping Binance for non-futures asset {asset}")
             continue
 
-        pair = asset["pair"]
+        pair = asset.pair
 
-        result = [
-            e
-            for e in response.json()
-            if re.match(rf"{pair[0]}{pair[1]}_[0-9]+", e["symbol"])
-        ]
-        if len(result) == 0:
-            print(f"No entry found for {asset['type']} {'/'.join(pair)} from Binance")
+        term_structure = futures_index.term_structure(*pair)
+        if len(term_structure) == 0:
+            print(f"No entry found for {asset.type} {'/'.join(pair)} from Binance")
             continue
 
-        for future in result:
-            timestamp = int(future["time"] / 1000)
-            price = float(future["markPrice"])
-            price_int = int(price * (10 ** asset["decimals"]))
+        prices = [future.data["markPrice"] for future in term_structure]
+        prices_int = to_fixed_many(prices, asset.decimals)
 
-            future_expiration_date = int(
-                datetime.datetime.strptime(
-                    future["symbol"],
-                    f"{pair[0]}{pair[1]}_%y%m%d",
-                ).strftime("%Y%m%d")
-            )
-            key = f"{pair[0]}/{pair[1]}-{future_expiration_date}".lower()
+        for future, price, price_int in zip(term_structure, prices, prices_int):
+            timestamp = int(future.data["time"] / 1000)
+            key = future_key(*pair, future.expiry)
 
             print(f"Fetched futures price {price} for {key} from Binance")
 
@@ -58,3 +57,17 @@ def fetch_binance(assets):
             )
 
     return entries
+
+
+def fetch_binance(assets):
+    return run_fetcher(fetch_binance_async, assets)
+
+
+@register_fetcher
+class BinanceFetcher(Fetcher):
+    name = SOURCE
+    description = "Binance price"
+    asset_types = {"FUTURE": {"USD"}}
+
+    async def fetch(self, assets, transport):
+        return await fetch_binance_async(assets, transport)
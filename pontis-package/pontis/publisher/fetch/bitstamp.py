@@ -1,46 +1,81 @@
 import os
 
-import requests
 from pontis.core.entry import construct_entry
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .utils import gather_entries, iterate_entries, run_fetcher
 
-def fetch_bitstamp(assets):
+SOURCE = "Bitstamp"
+BASE_URL = "https://www.bitstamp.net/api/v2/ticker"
+
+
+async def fetch_bitstamp_pair(asset, transport, publisher):
+    pair = asset.pair
+    response = await transport.get(
+        f"{BASE_URL}/{pair[0].lower()}{pair[1].lower()}", source=SOURCE
+    )
+    if response.status == 404:
+        print(f"No data found for {'/'.join(pair)} from Bitstamp")
+        return
+
+    result = response.json()
+
+    timestamp = int(result["timestamp"])
+    price = result["last"]
+    price_int = to_fixed(price, asset.decimals)
+
+    print(f"Fetched price {price} for {'/'.join(pair)} from Bitstamp")
+
+    return construct_entry(
+        key=asset.felt_key,
+        value=price_int,
+        timestamp=timestamp,
+        publisher=publisher,
+    )
+
+
+def bitstamp_pair_fetches(assets, transport):
+    """One fetch coroutine per supported pair."""
+    assets = AssetRegistry.from_assets(assets)
     PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
     publisher = PUBLISHER_PREFIX + "-bitstamp"
-    base_url = "https://www.bitstamp.net/api/v2/ticker"
 
-    entries = []
+    tasks = []
 
     for asset in assets:
-        if asset["type"] != "SPOT":
+        if asset.type != "SPOT":
             print(f"Skipping Bitstamp for non-spot asset {asset}")
             continue
 
-        pair = asset["pair"]
-        response = requests.get(
-            f"{base_url}/{pair[0].lower()}{pair[1].lower()}", timeout=10
-        )
-        if response.status_code == 404:
-            print(f"No data found for {'/'.join(pair)} from Bitstamp")
-            continue
+        tasks.append(fetch_bitstamp_pair(asset, transport, publisher))
+
+    return tasks
+
+
+async def fetch_bitstamp_async(assets, transport):
+    return await gather_entries(bitstamp_pair_fetches(assets, transport))
 
-        result = response.json()
 
-        timestamp = int(result["timestamp"])
-        price = float(result["last"])
-        price_int = int(price * (10 ** asset["decimals"]))
-        key = currency_pair_to_key(*pair)
+async def stream_bitstamp_async(assets, transport):
+    async for entry in iterate_entries(bitstamp_pair_fetches(assets, transport)):
+        yield entry
+
+
+def fetch_bitstamp(assets):
+    return run_fetcher(fetch_bitstamp_async, assets)
+
 
-        print(f"Fetched price {price} for {'/'.join(pair)} from Bitstamp")
+@register_fetcher
+class BitstampFetcher(Fetcher):
+    name = SOURCE
+    description = "Bitstamp price"
+    asset_types = {"SPOT": None}
 
-        entries.append(
-            construct_entry(
-                key=key,
-                value=price_int,
-                timestamp=timestamp,
-                publisher=publisher,
-            )
-        )
+    async def fetch(self, assets, transport):
+        return await fetch_bitstamp_async(assets, transport)
 
-    return entries
+    async def stream(self, assets, transport):
+        async for entry in stream_bitstamp_async(assets, transport):
+            yield entry
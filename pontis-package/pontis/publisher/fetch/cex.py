@@ -1,44 +1,79 @@
 import os
 
-import requests
 from pontis.core.entry import construct_entry
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .utils import gather_entries, iterate_entries, run_fetcher
 
-def fetch_cex(assets):
+SOURCE = "CEX"
+BASE_URL = "https://cex.io/api/ticker"
+
+
+async def fetch_cex_pair(asset, transport, publisher):
+    pair = asset.pair
+    response = await transport.get(f"{BASE_URL}/{pair[0]}/{pair[1]}", source=SOURCE)
+    result = response.json()
+
+    if "error" in result and result["error"] == "Invalid Symbols Pair":
+        print(f"No data found for {'/'.join(pair)} from CEX")
+        return
+
+    timestamp = int(result["timestamp"])
+    price = result["last"]
+    price_int = to_fixed(price, asset.decimals)
+
+    print(f"Fetched price {price} for {'/'.join(pair)} from CEX")
+
+    return construct_entry(
+        key=asset.felt_key,
+        value=price_int,
+        timestamp=timestamp,
+        publisher=publisher,
+    )
+
+
+def cex_pair_fetches(assets, transport):
+    """One fetch coroutine per supported pair."""
+    assets = AssetRegistry.from_assets(assets)
     PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
     publisher = PUBLISHER_PREFIX + "-cex"
-    base_url = "https://cex.io/api/ticker"
 
-    entries = []
+    tasks = []
 
     for asset in assets:
-        if asset["type"] != "SPOT":
+        if asset.type != "SPOT":
             print(f"Skipping CEX for non-spot asset {asset}")
             continue
 
-        pair = asset["pair"]
-        response = requests.get(f"{base_url}/{pair[0]}/{pair[1]}", timeout=10)
-        result = response.json()
+        tasks.append(fetch_cex_pair(asset, transport, publisher))
 
-        if "error" in result and result["error"] == "Invalid Symbols Pair":
-            print(f"No data found for {'/'.join(pair)} from CEX")
-            continue
+    return tasks
+
+
+async def fetch_cex_async(assets, transport):
+    return await gather_entries(cex_pair_fetches(assets, transport))
+
+
+async def stream_cex_async(assets, transport):
+    async for entry in iterate_entries(cex_pair_fetches(assets, transport)):
+        yield entry
+
+
+def fetch_cex(assets):
+    return run_fetcher(fetch_cex_async, assets)
 
-        timestamp = int(result["timestamp"])
-        price = float(result["last"])
-        price_int = int(price * (10 ** asset["decimals"]))
-        key = currency_pair_to_key(*pair)
 
-        print(f"Fetched price {price} for {'/'.join(pair)} from CEX")
+@register_fetcher
+class CexFetcher(Fetcher):
+    name = SOURCE
+    description = "CEX price"
+    asset_types = {"SPOT": None}
 
-        entries.append(
-            construct_entry(
-                key=key,
-                value=price_int,
-                timestamp=timestamp,
-                publisher=publisher,
-            )
-        )
+    async def fetch(self, assets, transport):
+        return await fetch_cex_async(assets, transport)
 
-    return entries
+    async def stream(self, assets, transport):
+        async for entry in stream_cex_async(assets, transport):
+            yield entry
@@ -4,80 +4,117 @@ import hmac
 import os
 from hashlib import sha256
 
-import requests
 from pontis.core.entry import construct_entry
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .snapshot import ExchangeSnapshot
+from .utils import run_fetcher
 
-def fetch_coinbase(assets):
-    PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
-    publisher = PUBLISHER_PREFIX + "-coinbase"
+SOURCE = "Coinbase"
+URL = "https://api.exchange.coinbase.com"
+REQUEST_PATH = "/oracle"
+
+
+def generate_coinbase_headers():
     COINBASE_API_SECRET = os.environ.get("COINBASE_API_SECRET")
     COINBASE_API_KEY = os.environ.get("COINBASE_API_KEY")
     COINBASE_API_PASSPHRASE = os.environ.get("COINBASE_API_PASSPHRASE")
-    URL = "https://api.exchange.coinbase.com"
-    REQUEST_PATH = "/oracle"
-    METHOD = "GET"
 
-    entries = []
+    request_timestamp = str(
+        int(
+            datetime.datetime.now(datetime.timezone.utc)
+            .replace(tzinfo=datetime.timezone.utc)
+            .timestamp()
+        )
+    )
+
+    signature = hmac.new(
+        base64.b64decode(COINBASE_API_SECRET),
+        (request_timestamp + "GET" + REQUEST_PATH).encode("ascii"),
+        sha256,
+    )
+
+    return {
+        "Accept": "application/json",
+        "CB-ACCESS-KEY": COINBASE_API_KEY,
+        "CB-ACCESS-SIGN": base64.b64encode(signature.digest()).decode("ascii"),
+        "CB-ACCESS-TIMESTAMP": request_timestamp,
+        "CB-ACCESS-PASSPHRASE": COINBASE_API_PASSPHRASE,
+    }
+
+
+async def fetch_coinbase_async(assets, transport):
+    assets = AssetRegistry.from_assets(assets)
+    PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
+    publisher = PUBLISHER_PREFIX + "-coinbase"
+
+    usd_assets = []
 
     for asset in assets:
-        if asset["type"] != "SPOT":
+        if asset.type != "SPOT":
             print(f"Skipping Coinbase for non-spot asset {asset}")
             continue
 
-        pair = asset["pair"]
-        key = currency_pair_to_key(*pair)
-
+        pair = asset.pair
         if pair[1] != "USD":
             print(f"Unable to fetch Coinbase price for non-USD denomination {pair[1]}")
             continue
 
-        request_timestamp = str(
-            int(
-                datetime.datetime.now(datetime.timezone.utc)
-                .replace(tzinfo=datetime.timezone.utc)
-                .timestamp()
-            )
-        )
+        usd_assets.append(asset)
 
-        signature = hmac.new(
-            base64.b64decode(COINBASE_API_SECRET),
-            (request_timestamp + METHOD + REQUEST_PATH).encode("ascii"),
-            sha256,
-        )
+    if len(usd_assets) == 0:
+        return []
 
-        headers = {
-            "Accept": "application/json",
-            "CB-ACCESS-KEY": COINBASE_API_KEY,
-            "CB-ACCESS-SIGN": base64.b64encode(signature.digest()),
-            "CB-ACCESS-TIMESTAMP": request_timestamp,
-            "CB-ACCESS-PASSPHRASE": COINBASE_API_PASSPHRASE,
-        }
+    # The oracle payload only quotes USD prices, keyed by base currency
+    snapshot = await ExchangeSnapshot.fetch(
+        transport,
+        URL + REQUEST_PATH,
+        rows_of=lambda result: result["prices"].items(),
+        symbol_of=lambda row: row[0] + "USD",
+        timestamp_of=lambda result: int(result["timestamp"]),
+        source=SOURCE,
+        headers=generate_coinbase_headers(),
+    )
 
-        response = requests.request(
-            METHOD, URL + REQUEST_PATH, headers=headers, timeout=10
-        )
+    entries = []
 
-        response.raise_for_status()
-        result = response.json()
-        if pair[0] in result["prices"]:
-            price = float(result["prices"][pair[0]])
-            price_int = int(price * (10 ** asset["decimals"]))
+    for asset in usd_assets:
+        pair = asset.pair
+        key = asset.key
 
-            timestamp = int(result["timestamp"])
+        row = snapshot.get(*pair)
+        if row is None:
+            print(f"No entry found for {key} from Coinbase")
+            continue
 
-            print(f"Fetched price {price} for {key} from Coinbase")
+        price = row[1]
+        price_int = to_fixed(price, asset.decimals)
 
-            entries.append(
-                construct_entry(
-                    key=key,
-                    value=price_int,
-                    timestamp=timestamp,
-                    publisher=publisher,
-                )
+        print(f"Fetched price {price} for {key} from Coinbase")
+
+        entries.append(
+            construct_entry(
+                key=asset.felt_key,
+                value=price_int,
+                timestamp=snapshot.timestamp,
+                publisher=publisher,
             )
-        else:
-            print(f"No entry found for {key} from Coinbase")
+        )
 
     return entries
+
+
+def fetch_coinbase(assets):
+    return run_fetcher(fetch_coinbase_async, assets)
+
+
+@register_fetcher
+class CoinbaseFetcher(Fetcher):
+    name = SOURCE
+    description = "Coinbase price"
+    asset_types = {"SPOT": {"USD"}}
+
+    async def fetch(self, assets, transport):
+        return await fetch_coinbase_async(assets, transport)
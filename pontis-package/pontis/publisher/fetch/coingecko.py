@@ -1,74 +1,116 @@
 import datetime
 import os
+from functools import partial
 
-import requests
 from pontis.core.entry import construct_entry
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .utils import gather_entries, run_fetcher
 
-def fetch_coingecko(assets):
-    PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
-    publisher = PUBLISHER_PREFIX + "-coingecko"
+SOURCE = "Coingecko"
+BASE_URL = "https://api.coingecko.com/api/v3"
+HEADERS = {
+    "Accepts": "application/json",
+}
 
-    headers = {
-        "Accepts": "application/json",
-    }
+COINGECKO_IDS = {
+    "ETH": "ethereum",
+    "BTC": "bitcoin",
+    "SOL": "solana",
+    "AVAX": "avalanche-2",
+    "DOGE": "dogecoin",
+    "SHIB": "shiba-inu",
+    "TEMP": "tempus",
+    "DAI": "dai",
+    "USDT": "tether",
+    "USDC": "usd-coin",
+    "TUSD": "true-usd",
+}
 
-    entries = []
 
+def get_coingecko_id(symbol):
+    if symbol not in COINGECKO_IDS:
+        raise Exception(
+            f"Unknown price pair, do not know how to query coingecko for {symbol}"
+        )
+    return COINGECKO_IDS[symbol]
+
+
+async def fetch_coingecko_pair(asset, transport, publisher):
+    pair = asset.pair
+    key = asset.key
+    pair_id = get_coingecko_id(pair[0])
+
+    url = f"{BASE_URL}/coins/{pair_id}?localization=false&market_data=true&community_data=false&developer_data=false&sparkline=false"
+
+    response = await transport.get(url, source=SOURCE, headers=HEADERS)
+    response.raise_for_status()
+    result = response.json()
+
+    price = result["market_data"]["current_price"][pair[1].lower()]
+    timestamp = int(
+        datetime.datetime.strptime(
+            result["last_updated"],
+            "%Y-%m-%dT%H:%M:%S.%f%z",
+        ).timestamp()
+    )
+    price_int = to_fixed(price, asset.decimals)
+
+    print(f"Fetched price {price} for {key} from Coingecko")
+
+    return construct_entry(
+        key=asset.felt_key,
+        value=price_int,
+        timestamp=timestamp,
+        publisher=publisher,
+    )
+
+
+async def fetch_coingecko_batch(assets, transport, publisher):
+    """Fetch all assets with a single /simple/price request."""
+    ids = []
+    vs_currencies = []
     for asset in assets:
-        if asset["type"] != "SPOT":
-            print(f"Skipping Coingecko for non-spot asset {asset}")
-            continue
+        pair_id = get_coingecko_id(asset.pair[0])
+        if pair_id not in ids:
+            ids.append(pair_id)
+        vs_currency = asset.pair[1].lower()
+        if vs_currency not in vs_currencies:
+            vs_currencies.append(vs_currency)
 
-        pair = asset["pair"]
-        key = currency_pair_to_key(*pair)
-
-        if pair[0] == "ETH":
-            pair_id = "ethereum"
-        elif pair[0] == "BTC":
-            pair_id = "bitcoin"
-        elif pair[0] == "SOL":
-            pair_id = "solana"
-        elif pair[0] == "AVAX":
-            pair_id = "avalanche-2"
-        elif pair[0] == "DOGE":
-            pair_id = "dogecoin"
-        elif pair[0] == "SHIB":
-            pair_id = "shiba-inu"
-        elif pair[0] == "TEMP":
-            pair_id = "tempus"
-        elif pair[0] == "DAI":
-            pair_id = "dai"
-        elif pair[0] == "USDT":
-            pair_id = "tether"
-        elif pair[0] == "USDC":
-            pair_id = "usd-coin"
-        elif pair[0] == "TUSD":
-            pair_id = "true-usd"
-        else:
-            raise Exception(
-                f"Unknown price pair, do not know how to query coingecko for {pair[0]}"
-            )
+    parameters = {
+        "ids": ",".join(ids),
+        "vs_currencies": ",".join(vs_currencies),
+        "include_last_updated_at": "true",
+    }
 
-        url = f"https://api.coingecko.com/api/v3/coins/{pair_id}?localization=false&market_data=true&community_data=false&developer_data=false&sparkline=false"
+    response = await transport.get(
+        f"{BASE_URL}/simple/price", source=SOURCE, headers=HEADERS, params=parameters
+    )
+    response.raise_for_status()
+    result = response.json()
 
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        price = response.json()["market_data"]["current_price"][pair[1].lower()]
-        timestamp = int(
-            datetime.datetime.strptime(
-                response.json()["last_updated"],
-                "%Y-%m-%dT%H:%M:%S.%f%z",
-            ).timestamp()
-        )
-        price_int = int(price * (10 ** asset["decimals"]))
+    entries = []
+    for asset in assets:
+        pair = asset.pair
+        key = asset.key
+        data = result.get(COINGECKO_IDS[pair[0]], {})
+
+        if pair[1].lower() not in data:
+            print(f"No entry found for {key} from Coingecko")
+            continue
+
+        price = data[pair[1].lower()]
+        timestamp = int(data["last_updated_at"])
+        price_int = to_fixed(price, asset.decimals)
 
         print(f"Fetched price {price} for {key} from Coingecko")
 
         entries.append(
             construct_entry(
-                key=key,
+                key=asset.felt_key,
                 value=price_int,
                 timestamp=timestamp,
                 publisher=publisher,
@@ -76,3 +118,43 @@ def fetch_coingecko(assets):
         )
 
     return entries
+
+
+async def fetch_coingecko_async(assets, transport, batch=True):
+    assets = AssetRegistry.from_assets(assets)
+    PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
+    publisher = PUBLISHER_PREFIX + "-coingecko"
+
+    spot_assets = []
+
+    for asset in assets:
+        if asset.type != "SPOT":
+            print(f"Skipping Coingecko for non-spot asset {asset}")
+            continue
+
+        spot_assets.append(asset)
+
+    if len(spot_assets) == 0:
+        return []
+
+    if batch:
+        return await fetch_coingecko_batch(spot_assets, transport, publisher)
+
+    return await gather_entries(
+        [fetch_coingecko_pair(asset, transport, publisher) for asset in spot_assets]
+    )
+
+
+def fetch_coingecko(assets, batch=True):
+    return run_fetcher(partial(fetch_coingecko_async, batch=batch), assets)
+
+
+@register_fetcher
+class CoingeckoFetcher(Fetcher):
+    name = SOURCE
+    description = "Coingecko price"
+    asset_types = {"SPOT": None}
+    base_currencies = set(COINGECKO_IDS)
+
+    async def fetch(self, assets, transport):
+        return await fetch_coingecko_async(assets, transport)
@@ -1,12 +1,106 @@
+import asyncio
 import datetime
 import os
+from functools import partial
 
-import requests
 from pontis.core.entry import construct_entry
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .utils import gather_entries, run_fetcher
 
-def fetch_coinmarketcap(assets):
+SOURCE = "Coinmarketcap"
+URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
+# Keeps the comma-separated symbol list well below URL length limits
+MAX_SYMBOLS_PER_REQUEST = 100
+
+
+def parse_coinmarketcap_quote(asset, data, publisher):
+    pair = asset.pair
+    key = asset.key
+
+    if pair[0] not in data:
+        print(f"No entry found for {key} from Coinmarketcap")
+        return
+
+    quote = data[pair[0]]["quote"][pair[1]]
+    price = quote["price"]
+    timestamp = int(
+        datetime.datetime.strptime(
+            quote["last_updated"],
+            "%Y-%m-%dT%H:%M:%S.%f%z",
+        ).timestamp()
+    )
+    price_int = to_fixed(price, asset.decimals)
+
+    print(f"Fetched price {price} for {key} from Coinmarketcap")
+
+    return construct_entry(
+        key=asset.felt_key,
+        value=price_int,
+        timestamp=timestamp,
+        publisher=publisher,
+    )
+
+
+async def fetch_coinmarketcap_quotes(transport, headers, symbols, convert):
+    parameters = {"symbol": ",".join(symbols), "convert": convert}
+
+    response = await transport.get(
+        URL, source=SOURCE, headers=headers, params=parameters
+    )
+    response.raise_for_status()
+    result = response.json()
+
+    return result["data"]
+
+
+async def fetch_coinmarketcap_pair(asset, transport, headers, publisher):
+    pair = asset.pair
+    data = await fetch_coinmarketcap_quotes(transport, headers, [pair[0]], pair[1])
+
+    return parse_coinmarketcap_quote(asset, data, publisher)
+
+
+async def fetch_coinmarketcap_batch(assets, transport, headers, publisher):
+    """Fetch all assets in one request per convert currency (and per chunk of symbols)."""
+    symbols_by_convert = {}
+    for asset in assets:
+        base, quote = asset.pair
+        symbols = symbols_by_convert.setdefault(quote, [])
+        if base not in symbols:
+            symbols.append(base)
+
+    batches = [
+        (convert, symbols[i : i + MAX_SYMBOLS_PER_REQUEST])
+        for convert, symbols in symbols_by_convert.items()
+        for i in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST)
+    ]
+    results = await asyncio.gather(
+        *[
+            fetch_coinmarketcap_quotes(transport, headers, symbols, convert)
+            for convert, symbols in batches
+        ]
+    )
+
+    data_by_convert = {}
+    for (convert, _), data in zip(batches, results):
+        data_by_convert.setdefault(convert, {}).update(data)
+
+    entries = []
+    for asset in assets:
+        entry = parse_coinmarketcap_quote(
+            asset, data_by_convert[asset.pair[1]], publisher
+        )
+        if entry is not None:
+            entries.append(entry)
+
+    return entries
+
+
+async def fetch_coinmarketcap_async(assets, transport, batch=True):
+    assets = AssetRegistry.from_assets(assets)
     PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
     publisher = PUBLISHER_PREFIX + "-coinmarketcap"
     COINMARKETCAP_KEY = os.environ.get("COINMARKETCAP_KEY")
@@ -15,40 +109,37 @@ def fetch_coinmarketcap(assets):
         "Accepts": "application/json",
     }
 
-    url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
-
-    entries = []
+    spot_assets = []
 
     for asset in assets:
-        if asset["type"] != "SPOT":
+        if asset.type != "SPOT":
             print(f"Skipping Coinmarketcap for non-spot asset {asset}")
             continue
 
-        pair = asset["pair"]
+        spot_assets.append(asset)
 
-        key = currency_pair_to_key(*pair)
-        parameters = {"symbol": pair[0], "convert": pair[1]}
-
-        response = requests.get(url, headers=headers, params=parameters, timeout=10)
-        response.raise_for_status()
-        price = response.json()["data"][pair[0]]["quote"][pair[1]]["price"]
-        timestamp = int(
-            datetime.datetime.strptime(
-                response.json()["data"][pair[0]]["quote"][pair[1]]["last_updated"],
-                "%Y-%m-%dT%H:%M:%S.%f%z",
-            ).timestamp()
+    if batch:
+        return await fetch_coinmarketcap_batch(
+            spot_assets, transport, headers, publisher
         )
-        price_int = int(price * (10 ** asset["decimals"]))
 
-        print(f"Fetched price {price} for {key} from Coinmarketcap")
+    return await gather_entries(
+        [
+            fetch_coinmarketcap_pair(asset, transport, headers, publisher)
+            for asset in spot_assets
+        ]
+    )
 
-        entries.append(
-            construct_entry(
-                key=key,
-                value=price_int,
-                timestamp=timestamp,
-                publisher=publisher,
-            )
-        )
 
-    return entries
+def fetch_coinmarketcap(assets, batch=True):
+    return run_fetcher(partial(fetch_coinmarketcap_async, batch=batch), assets)
+
+
+@register_fetcher
+class CoinmarketcapFetcher(Fetcher):
+    name = SOURCE
+    description = "Coinmarketcap price"
+    asset_types = {"SPOT": None}
+
+    async def fetch(self, assets, transport):
+        return await fetch_coinmarketcap_async(assets, transport)
@@ -1,63 +1,60 @@
-import datetime
+import asyncio
 import hmac
 import os
-import re
 import time
 
-import requests
 from pontis.core.entry import construct_entry
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.fixed_point import to_fixed, to_fixed_many
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .futures import FuturesIndex, future_key
+from .snapshot import ExchangeSnapshot
+from .utils import run_fetcher
 
-def parse_ftx_spot(asset, data, publisher, timestamp):
-    pair = asset["pair"]
-    key = currency_pair_to_key(*pair)
+SOURCE = "FTX"
+BASE_URL = "https://ftx.com/api"
 
-    result = [e for e in data if e["name"] == "/".join(pair)]
-    if len(result) == 0:
+
+def parse_ftx_spot(asset, snapshot, publisher, timestamp):
+    pair = asset.pair
+
+    row = snapshot.get(*pair)
+    if row is None:
         print(f"No entry found for {'/'.join(pair)} from FTX")
         return
 
-    assert (
-        len(result) == 1
-    ), f"Found more than one matching entries for FTX response and price pair {pair}"
-    price = float(result[0]["price"])
-    price_int = int(price * (10 ** asset["decimals"]))
+    price = row["price"]
+    price_int = to_fixed(price, asset.decimals)
 
     print(f"Fetched price {price} for {'/'.join(pair)} from FTX")
 
     return construct_entry(
-        key=key,
+        key=asset.felt_key,
         value=price_int,
         timestamp=timestamp,
         publisher=publisher,
     )
 
 
-def parse_ftx_futures(asset, data, publisher, timestamp):
-    pair = asset["pair"]
+def parse_ftx_futures(asset, futures_index, publisher, timestamp):
+    pair = asset.pair
     if pair[1] != "USD":
         print(f"Unable to fetch price from FTX for non-USD derivative {pair}")
         return
 
-    result = [e for e in data if re.match(rf"{pair[0]}-[0-9]+", e["name"])]
-    if len(result) == 0:
+    term_structure = futures_index.term_structure(*pair)
+    if len(term_structure) == 0:
         print(f"No entry found for {'/'.join(pair)} from FTX")
         return
 
     entries = []
 
-    for future in result:
-        price = float(future["mark"])
-        price_int = int(price * (10 ** asset["decimals"]))
+    prices = [future.data["mark"] for future in term_structure]
+    prices_int = to_fixed_many(prices, asset.decimals)
 
-        future_expiration_date = int(
-            datetime.datetime.strptime(
-                future["expiry"],
-                "%Y-%m-%dT%H:%M:%S%z",
-            ).strftime("%Y%m%d")
-        )
-        key = f"{pair[0]}/{pair[1]}-{future_expiration_date}".lower()
+    for future, price, price_int in zip(term_structure, prices, prices_int):
+        key = future_key(*pair, future.expiry)
 
         print(f"Fetched futures price {price} for {key} from FTX")
 
@@ -91,37 +88,56 @@ def generate_ftx_headers(endpoint):
     return headers
 
 
-def fetch_ftx(assets):
+async def fetch_ftx_endpoint(transport, endpoint):
+    headers = generate_ftx_headers(endpoint)
+    response = await transport.get(BASE_URL + endpoint, source=SOURCE, headers=headers)
+    return response.json()["result"]
+
+
+async def fetch_ftx_async(assets, transport):
+    assets = AssetRegistry.from_assets(assets)
     PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
     publisher = PUBLISHER_PREFIX + "-ftx"
-    base_url = "https://ftx.com/api"
-
-    endpoint = "/markets"
-    headers = generate_ftx_headers(endpoint)
-    response = requests.get(base_url + endpoint, headers=headers, timeout=10)
-    spot_data = response.json()["result"]
 
-    endpoint = "/futures"
-    headers = generate_ftx_headers(endpoint)
-    response = requests.get(base_url + endpoint, headers=headers, timeout=10)
-    future_data = response.json()["result"]
+    spot_data, future_data = await asyncio.gather(
+        fetch_ftx_endpoint(transport, "/markets"),
+        fetch_ftx_endpoint(transport, "/futures"),
+    )
 
     timestamp = int(time.time())
+    spot_snapshot = ExchangeSnapshot(spot_data, lambda row: row["name"], timestamp)
+    futures_index = FuturesIndex.from_ftx(future_data)
 
     entries = []
 
     for asset in assets:
-        if asset["type"] == "SPOT":
-            entry = parse_ftx_spot(asset, spot_data, publisher, timestamp)
+        if asset.type == "SPOT":
+            entry = parse_ftx_spot(asset, spot_snapshot, publisher, timestamp)
             if entry is not None:
                 entries.append(entry)
             continue
-        elif asset["type"] == "FUTURE":
-            future_entries = parse_ftx_futures(asset, future_data, publisher, timestamp)
-            if len(future_entries) is not None:
+        elif asset.type == "FUTURE":
+            future_entries = parse_ftx_futures(
+                asset, futures_index, publisher, timestamp
+            )
+            if future_entries is not None:
                 entries.extend(future_entries)
             continue
         else:
             print(f"Unable to fetch FTX for un-supported asset type {asset}")
 
     return entries
+
+
+def fetch_ftx(assets):
+    return run_fetcher(fetch_ftx_async, assets)
+
+
+@register_fetcher
+class FtxFetcher(Fetcher):
+    name = SOURCE
+    description = "FTX price"
+    asset_types = {"SPOT": None, "FUTURE": {"USD"}}
+
+    async def fetch(self, assets, transport):
+        return await fetch_ftx_async(assets, transport)
@@ -0,0 +1,104 @@
+import datetime
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Coin-margined delivery contracts, e.g. BTCUSD_220624 (perpetuals end in _PERP)
+BINANCE_FUTURE_SYMBOL = re.compile(r"^([A-Z0-9]+?)(USD)_([0-9]{6})$")
+# Dated futures, e.g. BTC-0624 (all FTX dated futures are quoted in USD)
+FTX_FUTURE_NAME = re.compile(r"^([A-Z0-9]+)-([0-9]+)$")
+
+FutureContract = namedtuple(
+    "FutureContract", ["base", "quote", "expiry", "symbol", "data"]
+)
+
+
+def future_key(base, quote, expiry):
+    """Key for a future, in the format registered with the yield curve, e.g. btc/usd-20220624."""
+    return f"{base}/{quote}-{expiry}".lower()
+
+
+@lru_cache(maxsize=None)
+def parse_binance_expiry(yymmdd):
+    return int(datetime.datetime.strptime(yymmdd, "%y%m%d").strftime("%Y%m%d"))
+
+
+@lru_cache(maxsize=None)
+def parse_ftx_expiry(expiry):
+    return int(
+        datetime.datetime.strptime(expiry, "%Y-%m-%dT%H:%M:%S%z").strftime("%Y%m%d")
+    )
+
+
+class FuturesIndex:
+    """Futures listing of an exchange, indexed by (base, quote, expiry).
+
+    The listing is parsed in a single pass; the term structure of every underlying
+    is kept sorted by expiry so it can be read without re-scanning the listing.
+    """
+
+    def __init__(self, contracts):
+        self.contracts = {}
+        self.term_structures = {}
+
+        for contract in contracts:
+            self.contracts[(contract.base, contract.quote, contract.expiry)] = contract
+            self.term_structures.setdefault((contract.base, contract.quote), []).append(
+                contract
+            )
+
+        for term_structure in self.term_structures.values():
+            term_structure.sort(key=lambda contract: contract.expiry)
+
+    @classmethod
+    def from_binance(cls, premium_index):
+        contracts = []
+        for row in premium_index:
+            match = BINANCE_FUTURE_SYMBOL.match(row["symbol"])
+            if match is None:
+                continue
+            base, quote, yymmdd = match.groups()
+            contracts.append(
+                FutureContract(
+                    base, quote, parse_binance_expiry(yymmdd), row["symbol"], row
+                )
+            )
+        return cls(contracts)
+
+    @classmethod
+    def from_ftx(cls, futures):
+        contracts = []
+        for row in futures:
+            match = FTX_FUTURE_NAME.match(row["name"])
+            if match is None:
+                continue
+            contracts.append(
+                FutureContract(
+                    match.group(1),
+                    "USD",
+                    parse_ftx_expiry(row["expiry"]),
+                    row["name"],
+                    row,
+                )
+            )
+        return cls(contracts)
+
+    def get(self, base, quote, expiry):
+        return self.contracts.get((base, quote, expiry))
+
+    def term_structure(self, base, quote):
+        """All contracts on the underlying, sorted by expiry."""
+        return self.term_structures.get((base, quote), [])
+
+    def underlyings(self):
+        return list(self.term_structures)
+
+    def keys(self):
+        return [
+            future_key(contract.base, contract.quote, contract.expiry)
+            for term_structure in self.term_structures.values()
+            for contract in term_structure
+        ]
+
+    def __len__(self):
+        return len(self.contracts)
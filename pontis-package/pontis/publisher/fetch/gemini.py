@@ -1,48 +1,69 @@
 import os
-import time
 
-import requests
 from pontis.core.entry import construct_entry
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .snapshot import ExchangeSnapshot
+from .utils import run_fetcher
 
-def fetch_gemini(assets):
+SOURCE = "Gemini"
+BASE_URL = "https://api.gemini.com/v1"
+
+
+async def fetch_gemini_async(assets, transport):
+    assets = AssetRegistry.from_assets(assets)
     PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
     publisher = PUBLISHER_PREFIX + "-gemini"
 
-    base_url = "https://api.gemini.com/v1"
-    response = requests.get(base_url + "/pricefeed", timeout=20)
+    snapshot = await ExchangeSnapshot.fetch(
+        transport,
+        BASE_URL + "/pricefeed",
+        symbol_of=lambda row: row["pair"],
+        source=SOURCE,
+    )
 
     entries = []
 
     for asset in assets:
-        if asset["type"] != "SPOT":
+        if asset.type != "SPOT":
             print(f"Skipping Gemini for non-spot asset {asset}")
             continue
 
-        pair = asset["pair"]
-        key = currency_pair_to_key(*pair)
-        timestamp = int(time.time())
-        result = [e for e in response.json() if e["pair"] == "".join(pair)]
-        if len(result) == 0:
+        pair = asset.pair
+        key = asset.key
+        row = snapshot.get(*pair)
+        if row is None:
             print(f"No entry found for {key} from Gemini")
             continue
 
-        assert (
-            len(result) == 1
-        ), f"Found more than one matching entries for Gemini response and price pair {pair}"
-        price = float(result[0]["price"])
-        price_int = int(price * (10 ** asset["decimals"]))
+        price = row["price"]
+        price_int = to_fixed(price, asset.decimals)
 
         print(f"Fetched price {price} for {key} from Gemini")
 
         entries.append(
             construct_entry(
-                key=key,
+                key=asset.felt_key,
                 value=price_int,
-                timestamp=timestamp,
+                timestamp=snapshot.timestamp,
                 publisher=publisher,
             )
         )
 
     return entries
+
+
+def fetch_gemini(assets):
+    return run_fetcher(fetch_gemini_async, assets)
+
+
+@register_fetcher
+class GeminiFetcher(Fetcher):
+    name = SOURCE
+    description = "Gemini price"
+    asset_types = {"SPOT": None}
+
+    async def fetch(self, assets, transport):
+        return await fetch_gemini_async(assets, transport)
@@ -0,0 +1,60 @@
+import time
+
+SYMBOL_SEPARATORS = str.maketrans("", "", "/-_ ")
+
+
+def normalize_symbol(symbol):
+    """Normalize an exchange symbol, e.g. "BTC/USD", "btc-usd" and "BTCUSD" all map to "BTCUSD"."""
+    return symbol.translate(SYMBOL_SEPARATORS).upper()
+
+
+class ExchangeSnapshot:
+    """A bulk exchange response, parsed once and indexed by normalized symbol.
+
+    Lookups are O(1), so a fetcher pays for one request plus one pass over the
+    exchange's pairs, however many assets it serves.
+    """
+
+    def __init__(self, rows, symbol_of, timestamp=None):
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.index = {}
+        self.duplicates = set()
+
+        for row in rows:
+            symbol = normalize_symbol(symbol_of(row))
+            if symbol in self.index:
+                self.duplicates.add(symbol)
+            self.index[symbol] = row
+
+    @classmethod
+    async def fetch(
+        cls, transport, url, rows_of=None, symbol_of=None, timestamp_of=None, **kwargs
+    ):
+        """Download a bulk endpoint once and index it.
+
+        `rows_of` extracts the list of rows from the decoded JSON body (defaults to the
+        body itself), `symbol_of` extracts the symbol from a row and `timestamp_of`
+        optionally extracts the snapshot timestamp from the body. Remaining keyword
+        arguments are passed on to `Transport.get`.
+        """
+        response = await transport.get(url, **kwargs)
+        response.raise_for_status()
+        body = response.json()
+
+        rows = body if rows_of is None else rows_of(body)
+        timestamp = None if timestamp_of is None else timestamp_of(body)
+
+        return cls(rows, symbol_of, timestamp)
+
+    def get(self, *symbol_parts):
+        symbol = normalize_symbol("".join(symbol_parts))
+        assert (
+            symbol not in self.duplicates
+        ), f"Found more than one matching entries for symbol {symbol}"
+        return self.index.get(symbol)
+
+    def __contains__(self, symbol):
+        return normalize_symbol(symbol) in self.index
+
+    def __len__(self):
+        return len(self.index)
@@ -1,53 +1,226 @@
 import os
+import re
 import time
+from collections import namedtuple
 
-import requests
 from pontis.core.entry import construct_entry
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
 
+from .base import Fetcher, register_fetcher
+from .utils import TrackedEntry, gather_entries, iterate_entries, run_fetcher
 
-def fetch_thegraph(assets):
-    PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
-    publisher = PUBLISHER_PREFIX + "-thegraph"
+SOURCE = "The Graph"
+BASE_URL = "https://api.thegraph.com/subgraphs/name/"
 
-    base_url = "https://api.thegraph.com/subgraphs/name/"
+# Metrics and entity ids are interpolated into queries, so they are checked first
+GRAPHQL_NAME = re.compile(r"^[_A-Za-z][_0-9A-Za-z]*$")
+ENTITY_ID = re.compile(r"^[0-9A-Za-z_-]+$")
 
-    entries = []
+OnchainSource = namedtuple(
+    "OnchainSource", ["subgraph", "entity", "fields", "input_decimals", "check"]
+)
+
+
+def check_aave_reserve(asset, reserve):
+    assert reserve["name"] == asset.detail["asset_name"]
+    assert reserve["isActive"] is True
+    assert reserve["isFrozen"] is False
+
+
+# Sources of ONCHAIN assets. An asset's detail holds the `asset_address` of the entity
+# to query and the `metric` to publish; `fields` are queried as well and passed to
+# `check` along with the asset, to reject data that should not be published.
+ONCHAIN_SOURCES = {
+    "AAVE": OnchainSource(
+        subgraph="aave/protocol-v2",
+        entity="reserves",
+        fields=("name", "isActive", "isFrozen"),
+        input_decimals=27,
+        check=check_aave_reserve,
+    ),
+}
+
+
+class BlockCache:
+    """Latest subgraph block number each query was answered at.
+
+    A response at the same block as the previous one holds the same data, so its
+    entries need not be published again.
+    """
+
+    def __init__(self):
+        self.blocks = {}
+
+    def is_new(self, query, block_number):
+        return self.blocks.get(query) != block_number
+
+    def record(self, query, block_number):
+        self.blocks[query] = block_number
 
+
+class PendingBlock:
+    """Block a query was answered at, recorded once all of its entries are published.
+
+    Until then the next fetch still publishes the query's entries, so that a failed
+    publish is retried even if the subgraph has not moved on.
+    """
+
+    def __init__(self, blocks, query, block_number, keys):
+        self.blocks = blocks
+        self.query = query
+        self.block_number = block_number
+        self.remaining = set(keys)
+
+    def published(self, entry):
+        self.remaining.discard(entry.key)
+        if len(self.remaining) == 0:
+            self.blocks.record(self.query, self.block_number)
+
+
+def onchain_source_for(asset):
+    if asset.source not in ONCHAIN_SOURCES:
+        raise Exception(
+            f"Unknown on-chain source {asset.source}, do not know how to query The "
+            f"Graph for {asset.key}"
+        )
+    return ONCHAIN_SOURCES[asset.source]
+
+
+def build_query(assets):
+    """Query the metrics of all assets of one subgraph, with the subgraph's block.
+
+    Each entity is queried once, under an alias, with every metric requested for it.
+    Returns the query and the alias holding each asset's entity.
+    """
+    aliases = {}
+    selections = {}
+    asset_aliases = []
     for asset in assets:
-        if asset["type"] != "ONCHAIN":
-            print(f"Skipping The Graph for non-on-chain asset {asset}")
-            continue
+        onchain_source = onchain_source_for(asset)
+        entity_id = asset.detail["asset_address"]
+        metric = asset.detail["metric"]
+        if ENTITY_ID.match(entity_id) is None:
+            raise ValueError(f"Invalid entity id for The Graph: {entity_id!r}")
+        if GRAPHQL_NAME.match(metric) is None:
+            raise ValueError(f"Invalid metric for The Graph: {metric!r}")
 
-        if asset["source"] == "AAVE":
-            url_slug = "aave/protocol-v2"
-            key = asset["key"]
-            query = f"query {{reserves(where: {{id: \"{asset['detail']['asset_address']}\"}}) {{name isActive isFrozen {asset['detail']['metric']}}}}}"
-            input_decimals = 27
-        else:
-            raise Exception(
-                f"Unknown asset name, do not know how to query The Graph for {asset['name']}"
-            )
+        entity = (onchain_source.entity, entity_id)
+        if entity not in aliases:
+            aliases[entity] = f"e{len(aliases)}"
+            selections[entity] = list(onchain_source.fields)
+        if metric not in selections[entity]:
+            selections[entity].append(metric)
+        asset_aliases.append(aliases[entity])
+
+    fields = " ".join(
+        f'{alias}: {entity}(where: {{id: "{entity_id}"}}) '
+        f"{{{' '.join(selections[(entity, entity_id)])}}}"
+        for (entity, entity_id), alias in aliases.items()
+    )
+    return f"query {{_meta {{block {{number}}}} {fields}}}", asset_aliases
 
-        response = requests.post(base_url + url_slug, timeout=5, json={"query": query})
-        result = response.json()["data"]["reserves"][0]
 
-        assert result["name"] == asset["detail"]["asset_name"]
-        assert result["isActive"] is True
-        assert result["isFrozen"] is False
+async def fetch_thegraph_subgraph(subgraph, assets, transport, publisher, blocks):
+    query, aliases = build_query(assets)
+    response = await transport.post(
+        BASE_URL + subgraph, source=SOURCE, json={"query": query}
+    )
+    response.raise_for_status()
+    data = response.json()
+    if "errors" in data:
+        raise Exception(f"Error querying {subgraph} on The Graph: {data['errors']}")
+    data = data["data"]
 
-        value = float(result[asset["detail"]["metric"]])
-        value_int = int(value * (10 ** (asset["decimals"] - input_decimals)))
-        timestamp = int(time.time())
+    block_number = data["_meta"]["block"]["number"]
+    if blocks is not None and not blocks.is_new(query, block_number):
+        print(f"Skipping {subgraph} from The Graph, still at block {block_number}")
+        return []
 
-        print(f"Fetched data {value_int} for {key} from The Graph")
+    timestamp = int(time.time())
+    entries = []
+    for asset, alias in zip(assets, aliases):
+        onchain_source = ONCHAIN_SOURCES[asset.source]
+        result = data[alias][0]
+        onchain_source.check(asset, result)
+
+        value = result[asset.detail["metric"]]
+        value_int = to_fixed(value, asset.decimals, onchain_source.input_decimals)
+
+        print(f"Fetched data {value_int} for {asset.key} from The Graph")
 
         entries.append(
             construct_entry(
-                key=key,
+                key=asset.key,
                 value=value_int,
                 timestamp=timestamp,
                 publisher=publisher,
             )
         )
 
+    if blocks is not None:
+        block = PendingBlock(
+            blocks, query, block_number, [entry.key for entry in entries]
+        )
+        entries = [TrackedEntry(entry, block.published) for entry in entries]
     return entries
+
+
+def thegraph_subgraph_fetches(assets, transport, blocks=None):
+    """One fetch coroutine per subgraph, querying all of its assets at once."""
+    assets = AssetRegistry.from_assets(assets)
+    PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
+    publisher = PUBLISHER_PREFIX + "-thegraph"
+
+    subgraph_assets = {}
+
+    for asset in assets:
+        if asset.type != "ONCHAIN":
+            print(f"Skipping The Graph for non-on-chain asset {asset}")
+            continue
+
+        subgraph = onchain_source_for(asset).subgraph
+        subgraph_assets.setdefault(subgraph, []).append(asset)
+
+    return [
+        fetch_thegraph_subgraph(subgraph, queried, transport, publisher, blocks)
+        for subgraph, queried in subgraph_assets.items()
+    ]
+
+
+async def fetch_thegraph_async(assets, transport, blocks=None):
+    """Fetch ONCHAIN assets from The Graph, with one request per subgraph.
+
+    If a BlockCache is given, subgraphs still at the block their entries were last
+    published at are skipped.
+    """
+    return await gather_entries(thegraph_subgraph_fetches(assets, transport, blocks))
+
+
+async def stream_thegraph_async(assets, transport, blocks=None):
+    fetches = thegraph_subgraph_fetches(assets, transport, blocks)
+    async for entry in iterate_entries(fetches):
+        yield entry
+
+
+def fetch_thegraph(assets):
+    return run_fetcher(fetch_thegraph_async, assets)
+
+
+@register_fetcher
+class TheGraphFetcher(Fetcher):
+    name = SOURCE
+    description = "The Graph data"
+    asset_types = {"ONCHAIN": None}
+    onchain_sources = set(ONCHAIN_SOURCES)
+    keeps_state = True
+
+    def __init__(self):
+        self.blocks = BlockCache()
+
+    async def fetch(self, assets, transport):
+        return await fetch_thegraph_async(assets, transport, self.blocks)
+
+    async def stream(self, assets, transport):
+        async for entry in stream_thegraph_async(assets, transport, self.blocks):
+            yield entry
@@ -0,0 +1,80 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from pontis.core.entry import Entry
+from pontis.publisher.transport import Transport
+
+
+class TrackedEntry(Entry):
+    """Entry with an `on_published` callback, see `notify_published`."""
+
+    def __new__(cls, entry, on_published):
+        tracked = super().__new__(cls, *entry)
+        tracked.on_published = on_published
+        return tracked
+
+
+def notify_published(entries):
+    """Call the `on_published` callback of each TrackedEntry among `entries`.
+
+    Called once entries have been published, or filtered out as not worth publishing,
+    so that fetchers can update state that must only change once data is on chain.
+    """
+    for entry in entries:
+        if isinstance(entry, TrackedEntry):
+            entry.on_published(entry)
+
+
+def run_fetcher(fetcher, assets, transport_factory=Transport):
+    """Run an async fetcher to completion from synchronous code, with its own transport.
+
+    If called from a coroutine, the fetcher runs on its own event loop in a worker
+    thread, blocking the caller like any synchronous call; coroutines should await
+    the `fetch_*_async` functions instead.
+    """
+
+    async def _run():
+        async with transport_factory() as transport:
+            return await fetcher(assets, transport)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_run())
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, _run()).result()
+
+
+def flatten_result(result):
+    if result is None:
+        return []
+    if isinstance(result, list):
+        return result
+    return [result]
+
+
+async def gather_entries(coroutines):
+    """Await per-asset coroutines concurrently and collect their entries in order.
+
+    Each coroutine returns an entry, a list of entries or None (nothing found).
+    """
+    results = await asyncio.gather(*coroutines)
+
+    entries = []
+    for result in results:
+        entries.extend(flatten_result(result))
+
+    return entries
+
+
+async def iterate_entries(coroutines):
+    """Run per-asset coroutines concurrently and yield entries as each one completes."""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            for entry in flatten_result(await next_result):
+                yield entry
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,76 @@
+import re
+import time
+from collections import namedtuple
+
+from pontis.core.utils import felt_to_str
+
+# Entries older than this are ignored on-chain, see contracts/oracle_implementation
+TIMESTAMP_BUFFER = 3600
+
+# An entry is forwarded if its value moved by more than `deviation` (as a fraction of
+# the last published value) or if the last published entry is `heartbeat` seconds old
+Threshold = namedtuple("Threshold", ["deviation", "heartbeat"])
+
+DEFAULT_THRESHOLDS = {
+    "SPOT": Threshold(deviation=0.0025, heartbeat=TIMESTAMP_BUFFER - 600),
+    "FUTURE": Threshold(deviation=0.005, heartbeat=TIMESTAMP_BUFFER - 600),
+    "ONCHAIN": Threshold(deviation=0.01, heartbeat=TIMESTAMP_BUFFER - 600),
+}
+DEFAULT_ASSET_TYPE = "SPOT"
+
+FUTURE_KEY = re.compile(r"^[a-z0-9]+/[a-z0-9]+-[0-9]{8}$")
+
+
+class PublishFilter:
+    """Drops entries that would not change the on-chain value meaningfully.
+
+    Keeps the last published entry per (key, publisher). An entry is forwarded if its
+    value deviates from the last published one by more than its asset type's threshold,
+    or if the last published entry is about to go stale on-chain.
+    """
+
+    def __init__(self, thresholds=None, key_types=None):
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        if thresholds is not None:
+            self.thresholds.update(thresholds)
+        self.key_types = {} if key_types is None else key_types
+        self.last_published = {}
+
+    @classmethod
+    def from_assets(cls, assets, thresholds=None):
+        key_types = {}
+        for asset in assets:
+            # Futures keys carry an expiry suffix, those are recognized by format
+            if asset.type != "FUTURE":
+                key_types[asset.felt_key] = asset.type
+        return cls(thresholds, key_types)
+
+    def asset_type_for(self, key):
+        if key not in self.key_types:
+            if FUTURE_KEY.match(felt_to_str(key)):
+                self.key_types[key] = "FUTURE"
+            else:
+                self.key_types[key] = DEFAULT_ASSET_TYPE
+        return self.key_types[key]
+
+    def should_publish(self, entry, now=None):
+        last = self.last_published.get((entry.key, entry.publisher))
+        if last is None:
+            return True
+
+        threshold = self.thresholds[self.asset_type_for(entry.key)]
+        now = time.time() if now is None else now
+        if now - last.timestamp >= threshold.heartbeat:
+            return True
+
+        if last.value == 0:
+            return entry.value != 0
+        return abs(entry.value - last.value) / last.value > threshold.deviation
+
+    def filter(self, entries, now=None):
+        return [entry for entry in entries if self.should_publish(entry, now)]
+
+    def record(self, entries):
+        """Remember entries once they have been published."""
+        for entry in entries:
+            self.last_published[(entry.key, entry.publisher)] = entry
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import Counter, deque
+
+# Sources with long timeouts whose occasional slow responses stall a cycle
+DEFAULT_HEDGED_SOURCES = {"Binance", "Gemini"}
+DEFAULT_PERCENTILE = 0.95
+DEFAULT_WINDOW = 100  # latest latencies per source the percentile is taken over
+DEFAULT_MIN_SAMPLES = 20  # no hedging until the percentile means something
+DEFAULT_MAX_EXTRA_RATIO = 0.05  # hedged requests per request, so rate limits hold
+MIN_HEDGE_DELAY = 0.05  # seconds
+
+
+class LatencyTracker:
+    """Latencies of the latest successful requests per source."""
+
+    def __init__(self, window=None):
+        self.window = DEFAULT_WINDOW if window is None else window
+        self.samples = {}
+
+    def record(self, source, seconds):
+        if source not in self.samples:
+            self.samples[source] = deque(maxlen=self.window)
+        self.samples[source].append(seconds)
+
+    def count(self, source):
+        return len(self.samples.get(source, ()))
+
+    def percentile(self, source, percentile):
+        samples = sorted(self.samples.get(source, ()))
+        if len(samples) == 0:
+            return None
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+
+class Hedger:
+    """Sends a duplicate of a request that is slower than its source's usual latency.
+
+    Once a source has `min_samples` latencies, a request that has not completed
+    within the `percentile` of them is sent again and the first successful response
+    wins, the other request being cancelled. At most `max_extra_ratio` extra requests
+    are sent per request to a source.
+    """
+
+    def __init__(
+        self,
+        sources=None,
+        percentile=None,
+        window=None,
+        min_samples=None,
+        max_extra_ratio=None,
+    ):
+        self.sources = DEFAULT_HEDGED_SOURCES if sources is None else set(sources)
+        self.percentile = DEFAULT_PERCENTILE if percentile is None else percentile
+        self.min_samples = DEFAULT_MIN_SAMPLES if min_samples is None else min_samples
+        self.max_extra_ratio = (
+            DEFAULT_MAX_EXTRA_RATIO if max_extra_ratio is None else max_extra_ratio
+        )
+        self.latencies = LatencyTracker(window)
+        self.requests = Counter()
+        self.hedged = Counter()
+        self.hedge_wins = Counter()
+
+    def hedge_delay(self, source):
+        """Seconds after which a request to `source` is hedged, None if it is not."""
+        if source not in self.sources:
+            return None
+        if self.latencies.count(source) < self.min_samples:
+            return None
+        return max(MIN_HEDGE_DELAY, self.latencies.percentile(source, self.percentile))
+
+    def can_hedge(self, source):
+        return self.hedged[source] + 1 <= self.max_extra_ratio * self.requests[source]
+
+    async def timed(self, source, send):
+        start = time.monotonic()
+        response = await send()
+        self.latencies.record(source, time.monotonic() - start)
+        return response
+
+    async def run(self, source, send):
+        """Call `send` (a coroutine function), hedging it if it is slow."""
+        self.requests[source] += 1
+        delay = self.hedge_delay(source)
+
+        first = asyncio.ensure_future(self.timed(source, send))
+        pending = {first}
+        try:
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if len(done) > 0:
+                    return first.result()
+                if self.can_hedge(source):
+                    self.hedged[source] += 1
+                    pending.add(asyncio.ensure_future(self.timed(source, send)))
+
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins[source] += 1
+                        return task.result()
+                if len(pending) == 0:
+                    # Every attempt failed, raise the error of the last one
+                    return done.pop().result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self, source):
+        return {
+            "requests": self.requests[source],
+            "hedged": self.hedged[source],
+            "hedge_wins": self.hedge_wins[source],
+            "hedge_delay": self.hedge_delay(source),
+        }
@@ -0,0 +1,271 @@
+import asyncio
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pontis.core.utils import pprint_entry
+from pontis.publisher.budget import DeadlineExceeded, within_budget
+from pontis.publisher.fetch import FETCHER_REGISTRY
+from pontis.publisher.fetch.utils import notify_published, run_fetcher
+from pontis.publisher.transport import Transport, WorkerTransportFactory
+
+# Threads suit I/O-bound sources, processes suit sources with CPU-heavy parsing
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+def handle_source_error(fetcher, error, exit_on_error):
+    print(f"Error fetching {fetcher.description}: {error}")
+    print("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+    if exit_on_error:
+        raise error
+
+
+def plan_fetches(assets, fetchers=None, breakers=None):
+    """Assign each fetcher the assets it supports.
+
+    Returns a list of (fetcher, assets) tuples, leaving out fetchers that cannot serve
+    any of the given assets, and those whose circuit is open if `breakers` is given.
+    """
+    if fetchers is None:
+        fetchers = list(FETCHER_REGISTRY.values())
+
+    plan = []
+    for fetcher in fetchers:
+        supported_assets = fetcher.supported_assets(assets)
+        if len(supported_assets) == 0:
+            print(f"Skipping {fetcher.name} as it supports none of the assets")
+            continue
+        if breakers is not None and not breakers.allow(fetcher.name):
+            print(f"Skipping {fetcher.name} as its circuit is open")
+            continue
+        plan.append((fetcher, supported_assets))
+
+    return plan
+
+
+async def guarded(fetcher, fetch, breakers):
+    """Await a fetch, recording its outcome and duration with the source's breaker."""
+    if breakers is None:
+        return await fetch
+
+    start = time.monotonic()
+    try:
+        result = await fetch
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        breakers.record_failure(fetcher.name, e)
+        raise
+    breakers.record_success(fetcher.name, time.monotonic() - start)
+    return result
+
+
+def report_result(fetcher, result, exit_on_error):
+    """Whether a fetch result holds entries, reporting it if it is an error.
+
+    Fetches cancelled at the cycle deadline were already reported by the budget and
+    are not errors.
+    """
+    if isinstance(result, DeadlineExceeded):
+        return False
+    if isinstance(result, Exception):
+        handle_source_error(fetcher, result, exit_on_error)
+        return False
+    return True
+
+
+async def fetch_all(
+    assets,
+    transport,
+    fetchers=None,
+    exit_on_error=False,
+    breakers=None,
+    budget=None,
+):
+    """Fetch entries from all fetchers concurrently.
+
+    Each fetcher is only sent the assets it supports. Returns a dict mapping fetcher
+    name to entries, in the order of `fetchers`. A fetcher that fails is reported and
+    left out, unless `exit_on_error` is set, in which case the first failure (in
+    fetcher order) is raised once every fetch has settled. If `CircuitBreakers` are
+    given, sources with an open circuit are skipped and every outcome is recorded.
+    If a `CycleBudget` is given, fetches are cancelled once their slice of it is spent
+    and left out, counting as failures for the breakers.
+    """
+    plan = plan_fetches(assets, fetchers, breakers)
+
+    results = await asyncio.gather(
+        *[
+            guarded(
+                fetcher,
+                within_budget(
+                    fetcher.name, fetcher.fetch(fetcher_assets, transport), budget
+                ),
+                breakers,
+            )
+            for fetcher, fetcher_assets in plan
+        ],
+        return_exceptions=True,
+    )
+
+    entries_by_source = {}
+    for (fetcher, _), result in zip(plan, results):
+        if report_result(fetcher, result, exit_on_error):
+            entries_by_source[fetcher.name] = result
+
+    return entries_by_source
+
+
+def create_executor(kind, max_workers=None):
+    if kind not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor {kind!r}, expected one of {', '.join(EXECUTORS)}"
+        )
+    return EXECUTORS[kind](max_workers=max_workers)
+
+
+def fetch_blocking(fetcher, assets, transport_factory=None):
+    """Run a fetcher to completion with its own event loop and transport.
+
+    The transport is built by `transport_factory` (see WorkerTransportFactory), or with
+    default settings. Module-level so that it can be sent to a process pool along with
+    the fetcher.
+    """
+    if transport_factory is None:
+        return run_fetcher(fetcher.fetch, assets)
+    return run_fetcher(fetcher.fetch, assets, transport_factory)
+
+
+async def fetch_all_in_executor(
+    assets,
+    executor,
+    fetchers=None,
+    exit_on_error=False,
+    breakers=None,
+    budget=None,
+    transport=None,
+):
+    """Fetch entries from all fetchers concurrently in a thread or process pool.
+
+    Keeps the event loop free while fetching, e.g. for submitting transactions.
+    Each fetcher runs synchronously in a worker and results are collected as they
+    complete, so the returned dict maps fetcher name to entries in completion order.
+    A fetcher that fails is reported and left out, unless `exit_on_error` is set, in
+    which case the first failure to complete is raised. Circuit `breakers` and the
+    `budget` are used as in `fetch_all`, except that a worker cannot be interrupted:
+    a fetch past its deadline is abandoned and its worker finishes in the background.
+
+    Workers cannot share the event loop's Transport. If one is given, each worker
+    builds its own from its settings with WorkerTransportFactory, otherwise with
+    default settings. A process worker would fetch with a copy of its fetcher, so with
+    a process pool, fetchers that keep state across fetches run on the event loop
+    instead, with `transport` or a default one.
+    """
+    loop = asyncio.get_running_loop()
+    plan = plan_fetches(assets, fetchers, breakers)
+    transport_factory = None if transport is None else WorkerTransportFactory(transport)
+
+    in_process_pool = isinstance(executor, ProcessPoolExecutor)
+    own_transport = None
+    if (
+        transport is None
+        and in_process_pool
+        and any(fetcher.keeps_state for fetcher, _ in plan)
+    ):
+        own_transport = transport = Transport()
+
+    def start_fetch(fetcher, fetcher_assets):
+        if in_process_pool and fetcher.keeps_state:
+            return fetcher.fetch(fetcher_assets, transport)
+        return loop.run_in_executor(
+            executor, fetch_blocking, fetcher, fetcher_assets, transport_factory
+        )
+
+    async def run(fetcher, fetcher_assets):
+        try:
+            entries = await guarded(
+                fetcher,
+                within_budget(
+                    fetcher.name, start_fetch(fetcher, fetcher_assets), budget
+                ),
+                breakers,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return fetcher, e
+        return fetcher, entries
+
+    tasks = [
+        asyncio.ensure_future(run(fetcher, fetcher_assets))
+        for fetcher, fetcher_assets in plan
+    ]
+    entries_by_source = {}
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            fetcher, result = await next_result
+            if report_result(fetcher, result, exit_on_error):
+                entries_by_source[fetcher.name] = result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own_transport is not None:
+            await own_transport.close()
+
+    return entries_by_source
+
+
+async def publish_all_sources(
+    publisher_client,
+    entries_by_source,
+    fetchers=None,
+    exit_on_error=False,
+    publish_filter=None,
+):
+    """Publish each source's entries in its own transaction.
+
+    If a PublishFilter is given, only the entries it forwards are published, and they
+    are recorded with it once their transaction has been sent. Fetchers are notified
+    of a source's entries (see `notify_published`) once they have been sent or
+    filtered out. Returns the invocation of the last transaction sent, or None if
+    nothing was sent.
+    """
+    if fetchers is None:
+        fetchers = list(FETCHER_REGISTRY.values())
+
+    last_invocation = None
+    for fetcher in fetchers:
+        if fetcher.name not in entries_by_source:
+            continue
+
+        fetched_entries = entries = entries_by_source[fetcher.name]
+        if publish_filter is not None:
+            entries = publish_filter.filter(fetched_entries)
+            print(
+                f"Forwarding {len(entries)} of {len(fetched_entries)} entries from {fetcher.name}"
+            )
+            if len(entries) == 0:
+                notify_published(fetched_entries)
+                continue
+
+        print(f"Publishing {len(entries)} entries from {fetcher.name}:")
+        for entry in entries:
+            pprint_entry(entry)
+
+        try:
+            invocation = await publisher_client.publish_many(entries)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            handle_source_error(fetcher, e, exit_on_error)
+            continue
+
+        if publish_filter is not None:
+            publish_filter.record(entries)
+        notify_published(fetched_entries)
+
+        if invocation is not None:
+            last_invocation = invocation
+
+    return last_invocation
@@ -0,0 +1,221 @@
+import asyncio
+import time
+import traceback
+from collections import namedtuple
+
+from pontis.core.utils import pprint_entry
+from pontis.publisher.budget import within_budget
+from pontis.publisher.fetch.utils import notify_published
+from pontis.publisher.orchestrator import guarded, plan_fetches, report_result
+
+DEFAULT_MAX_PENDING = 100  # entries buffered between fetchers and the batching stage
+DEFAULT_MAX_BATCH_SIZE = 50
+DEFAULT_MAX_BATCH_DELAY = 2  # seconds an entry may wait for its batch to fill up
+
+# Put on the queue by a fetcher once its stream is exhausted or has failed
+SourceFinished = namedtuple("SourceFinished", ["fetcher", "error"])
+# Marks the end of the entries being batched
+END = object()
+
+
+async def stream_entries(
+    assets,
+    transport,
+    fetchers=None,
+    exit_on_error=False,
+    breakers=None,
+    budget=None,
+    max_pending=None,
+):
+    """Yield entries from all fetchers concurrently, as soon as each one arrives.
+
+    Fetchers wait while `max_pending` entries have not been consumed yet, so memory
+    stays flat however many assets there are. Errors, breakers and the budget are
+    handled as in `fetch_all`, except that entries a source yielded before its
+    deadline are kept.
+    """
+    max_pending = DEFAULT_MAX_PENDING if max_pending is None else max_pending
+    queue = asyncio.Queue(max_pending)
+    plan = plan_fetches(assets, fetchers, breakers)
+
+    async def pump(fetcher, fetcher_assets):
+        async for entry in fetcher.stream(fetcher_assets, transport):
+            await queue.put(entry)
+
+    async def run(fetcher, fetcher_assets):
+        try:
+            await guarded(
+                fetcher,
+                within_budget(fetcher.name, pump(fetcher, fetcher_assets), budget),
+                breakers,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(SourceFinished(fetcher, e))
+        else:
+            await queue.put(SourceFinished(fetcher, None))
+
+    tasks = [
+        asyncio.ensure_future(run(fetcher, fetcher_assets))
+        for fetcher, fetcher_assets in plan
+    ]
+    try:
+        finished = 0
+        while finished < len(tasks):
+            item = await queue.get()
+            if isinstance(item, SourceFinished):
+                finished += 1
+                if item.error is not None:
+                    report_result(item.fetcher, item.error, exit_on_error)
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def batch_entries(entries, max_size=None, max_delay=None):
+    """Group an async iterator of entries into lists.
+
+    A batch is yielded once it holds `max_size` entries, or `max_delay` seconds after
+    its first entry arrived, whichever comes first.
+    """
+    max_size = DEFAULT_MAX_BATCH_SIZE if max_size is None else max_size
+    max_delay = DEFAULT_MAX_BATCH_DELAY if max_delay is None else max_delay
+
+    # Entries are read in a separate task, and a pending get is kept across timeouts,
+    # so that waiting with a timeout never cancels the upstream generator or drops an
+    # entry
+    queue = asyncio.Queue(max_size)
+
+    async def pump():
+        try:
+            async for entry in entries:
+                await queue.put(entry)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(END)
+
+    reader = asyncio.ensure_future(pump())
+    get = None
+    try:
+        batch = []
+        deadline = None
+        while True:
+            if get is None:
+                get = asyncio.ensure_future(queue.get())
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            done, _ = await asyncio.wait({get}, timeout=timeout)
+            if len(done) == 0:
+                yield batch
+                batch, deadline = [], None
+                continue
+            item, get = get.result(), None
+
+            if item is END:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + max_delay
+            if len(batch) >= max_size:
+                yield batch
+                batch, deadline = [], None
+
+        if len(batch) > 0:
+            yield batch
+    finally:
+        reader.cancel()
+        if get is not None:
+            get.cancel()
+        # Wait for the reader to stop iterating `entries`, so that it can be closed
+        await asyncio.gather(reader, return_exceptions=True)
+
+
+async def publish_batches(
+    publisher_client, batches, exit_on_error=False, publish_filter=None
+):
+    """Publish each batch of entries in its own transaction as it arrives.
+
+    If a PublishFilter is given, it is applied, and fetchers are notified of published
+    entries, as in `publish_all_sources`. Returns the invocation of the last
+    transaction sent, or None if nothing was sent.
+    """
+    last_invocation = None
+    async for fetched_entries in batches:
+        entries = fetched_entries
+        if publish_filter is not None:
+            entries = publish_filter.filter(fetched_entries)
+        if len(entries) == 0:
+            notify_published(fetched_entries)
+            continue
+
+        print(f"Publishing batch of {len(entries)} entries:")
+        for entry in entries:
+            pprint_entry(entry)
+
+        try:
+            invocation = await publisher_client.publish_many(entries)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error publishing batch of {len(entries)} entries: {e}")
+            print(traceback.format_exc())
+            if exit_on_error:
+                raise e
+            continue
+
+        if publish_filter is not None:
+            publish_filter.record(entries)
+        notify_published(fetched_entries)
+        if invocation is not None:
+            last_invocation = invocation
+
+    return last_invocation
+
+
+async def stream_and_publish(
+    publisher_client,
+    assets,
+    transport,
+    fetchers=None,
+    exit_on_error=False,
+    breakers=None,
+    budget=None,
+    publish_filter=None,
+    max_batch_size=None,
+    max_batch_delay=None,
+    max_pending=None,
+):
+    """Fetch and publish all assets, publishing entries in batches as they arrive.
+
+    Unlike `fetch_all` followed by `publish_all_sources`, fast sources reach the chain
+    without waiting for slow ones. If publishing stops early, e.g. when cancelled, the
+    fetches still running are cancelled before returning.
+    """
+    entries = stream_entries(
+        assets,
+        transport,
+        fetchers=fetchers,
+        exit_on_error=exit_on_error,
+        breakers=breakers,
+        budget=budget,
+        max_pending=max_pending,
+    )
+    batches = batch_entries(entries, max_batch_size, max_batch_delay)
+    try:
+        return await publish_batches(
+            publisher_client,
+            batches,
+            exit_on_error=exit_on_error,
+            publish_filter=publish_filter,
+        )
+    finally:
+        await batches.aclose()
+        await entries.aclose()
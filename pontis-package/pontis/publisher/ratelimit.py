@@ -0,0 +1,161 @@
+import asyncio
+import email.utils
+import time
+from collections import namedtuple
+
+# `requests` per `period` seconds, of which at most `burst` may be sent back to back
+Quota = namedtuple("Quota", ["requests", "period", "burst"])
+
+# Published limits of the free/basic API tiers we use
+DEFAULT_QUOTAS = {
+    "Coingecko": Quota(requests=10, period=60, burst=2),
+    "Coinmarketcap": Quota(requests=30, period=60, burst=5),
+    "Coinbase": Quota(requests=10, period=1, burst=5),
+    "Gemini": Quota(requests=120, period=60, burst=10),
+    "CEX": Quota(requests=600, period=600, burst=10),
+    "Bitstamp": Quota(requests=8000, period=600, burst=20),
+}
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_MAX_RETRY_WAIT = 30  # seconds; longer Retry-After values are not waited for
+INITIAL_BACKOFF = 1  # seconds, doubled on consecutive 429s without Retry-After
+MAX_BACKOFF = 60
+MIN_RATE_FACTOR = 0.1  # adaptive slow-down never goes below this share of the quota
+RATE_RECOVERY = 0.05  # share of the quota regained per successful request
+
+
+def parse_retry_after(value):
+    """Seconds to wait according to a Retry-After header (delta-seconds or HTTP date)."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    """Token bucket for one source, with adaptive backoff on 429 responses.
+
+    Tokens refill continuously, so requests within a cycle are spread evenly over the
+    quota rather than sent in one burst. After a 429 the bucket is paused until the
+    Retry-After time (or an exponential backoff) and its rate is halved, recovering
+    gradually as requests succeed.
+    """
+
+    def __init__(self, quota=None):
+        self.quota = quota
+        self.tokens = None if quota is None else quota.burst
+        self.updated_at = time.monotonic()
+        self.rate_factor = 1.0
+        self.blocked_until = 0
+        self.backoff = INITIAL_BACKOFF
+        self.lock = None
+
+    @property
+    def rate(self):
+        return self.quota.requests / self.quota.period * self.rate_factor
+
+    def refill(self, now):
+        self.tokens = min(
+            self.quota.burst, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self):
+        # Created lazily so that the lock belongs to the running event loop
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                if self.quota is None:
+                    return
+
+                self.refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def throttled(self, retry_after=None):
+        """Record a 429 response; returns the number of seconds the bucket is paused."""
+        if retry_after is None:
+            wait = self.backoff
+            self.backoff = min(MAX_BACKOFF, self.backoff * 2)
+        else:
+            wait = retry_after
+
+        self.blocked_until = max(self.blocked_until, time.monotonic() + wait)
+        self.rate_factor = max(MIN_RATE_FACTOR, self.rate_factor / 2)
+        return wait
+
+    def succeeded(self):
+        self.backoff = INITIAL_BACKOFF
+        self.rate_factor = min(1.0, self.rate_factor + RATE_RECOVERY)
+
+
+class RateLimiter:
+    """Per-source token buckets; sources without a quota are only subject to backoff."""
+
+    def __init__(self, quotas=None, max_retries=None, max_retry_wait=None):
+        self.quotas = dict(DEFAULT_QUOTAS)
+        if quotas is not None:
+            self.quotas.update(quotas)
+        self.max_retries = DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        self.max_retry_wait = (
+            DEFAULT_MAX_RETRY_WAIT if max_retry_wait is None else max_retry_wait
+        )
+        self.buckets = {}
+
+    def bucket_for(self, source):
+        if source not in self.buckets:
+            self.buckets[source] = TokenBucket(self.quotas.get(source))
+        return self.buckets[source]
+
+    async def run(self, source, send):
+        """Send a request (`send` is a coroutine function) within the source's quota.
+
+        Requests answered with 429 are retried after backing off, unless the retry
+        budget is spent or the server asks us to wait longer than `max_retry_wait`.
+        While a source is paused for longer than that, requests fail immediately with
+        RateLimitExceeded instead of waiting.
+        """
+        bucket = self.bucket_for(source)
+
+        attempt = 0
+        while True:
+            blocked_for = bucket.blocked_until - time.monotonic()
+            if blocked_for > self.max_retry_wait:
+                raise RateLimitExceeded(
+                    f"{source} asked us to back off for another {blocked_for:.0f}s"
+                )
+
+            await bucket.acquire()
+            response = await send()
+
+            if response.status != 429:
+                bucket.succeeded()
+                return response
+
+            wait = bucket.throttled(
+                parse_retry_after(response.headers.get("Retry-After"))
+            )
+            print(f"Rate limited by {source}, backing off for {wait:.1f}s")
+
+            attempt += 1
+            if attempt > self.max_retries or wait > self.max_retry_wait:
+                return response
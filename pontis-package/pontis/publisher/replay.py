@@ -0,0 +1,193 @@
+import asyncio
+import base64
+import json
+from collections import Counter, namedtuple
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from aiohttp import web
+from pontis.publisher.transport import Transport, TransportResponse
+
+# Response headers that are worth replaying, request headers are never recorded
+# because they carry API keys and signatures
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+Recording = namedtuple("Recording", ["status", "headers", "body", "url"])
+
+
+def request_key(method, url, params=None, json_body=None):
+    """Identify a request by method, url, query parameters and JSON body."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params is not None:
+        query += [(str(k), str(v)) for k, v in dict(params).items()]
+    key = f"{method} {parts.scheme}://{parts.netloc}{parts.path}"
+    if query:
+        key += "?" + urlencode(sorted(query))
+    if json_body is not None:
+        key += " " + json.dumps(json_body, sort_keys=True, separators=(",", ":"))
+    return key
+
+
+class Recordings:
+    """Recorded responses keyed by `request_key`, stored as a JSON fixture file."""
+
+    def __init__(self, responses=None):
+        self.responses = {} if responses is None else responses
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(
+            {
+                key: Recording(
+                    response["status"],
+                    response["headers"],
+                    base64.b64decode(response["body"]),
+                    response["url"],
+                )
+                for key, response in data.items()
+            }
+        )
+
+    def save(self, path):
+        data = {
+            key: {
+                "status": recording.status,
+                "headers": recording.headers,
+                "body": base64.b64encode(recording.body).decode("ascii"),
+                "url": recording.url,
+            }
+            for key, recording in sorted(self.responses.items())
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def record(self, key, response):
+        headers = {
+            name: response.headers[name]
+            for name in RECORDED_HEADERS
+            if name in response.headers
+        }
+        self.responses[key] = Recording(
+            response.status, headers, response.body, response.url
+        )
+
+    def get(self, key):
+        return self.responses.get(key)
+
+    def __len__(self):
+        return len(self.responses)
+
+
+class RecordingTransport(Transport):
+    """Transport that records every response it receives from the network."""
+
+    def __init__(self, recordings=None, **kwargs):
+        super().__init__(**kwargs)
+        self.recordings = Recordings() if recordings is None else recordings
+
+    async def send_now(self, method, url, source=None, **kwargs):
+        response = await super().send_now(method, url, source, **kwargs)
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"))
+        self.recordings.record(key, response)
+        return response
+
+
+class RecordedTransport(Transport):
+    """Transport that answers from recordings in-process, without any HTTP.
+
+    Used to measure the parsing cost of fetchers on their own.
+    """
+
+    def __init__(self, recordings, **kwargs):
+        super().__init__(**kwargs)
+        self.recordings = recordings
+        self.request_counts = Counter()
+
+    async def send_now(self, method, url, source=None, **kwargs):
+        self.request_counts[source] += 1
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"))
+        recording = self.recordings.get(key)
+        if recording is None:
+            return TransportResponse(404, {}, b"", url)
+        return TransportResponse(
+            recording.status, recording.headers, recording.body, recording.url
+        )
+
+
+@asynccontextmanager
+async def serve_app(app, host="127.0.0.1", port=0):
+    """Serve an aiohttp application, on a free port by default, and yield its base url."""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+class ReplayServer:
+    """Local HTTP stand-in serving recordings at /<host>/<path>.
+
+    Every response is delayed by `latency` seconds, or by `host_latencies[host]`.
+    """
+
+    def __init__(self, recordings, latency=0, host_latencies=None, scheme="https"):
+        self.recordings = recordings
+        self.latency = latency
+        self.host_latencies = {} if host_latencies is None else host_latencies
+        self.scheme = scheme
+        self.request_counts = Counter()
+        self.misses = []
+
+        self.app = web.Application()
+        self.app.router.add_route("*", "/{host}/{path:.*}", self.handle)
+
+    def serve(self, host="127.0.0.1", port=0):
+        """Serve the recordings and yield the base url to give to `ReplayTransport`."""
+        return serve_app(self.app, host, port)
+
+    async def handle(self, request):
+        host = request.match_info["host"]
+        url = f"{self.scheme}://{host}/{request.match_info['path']}"
+        json_body = await request.json() if request.body_exists else None
+        key = request_key(request.method, url, request.query, json_body)
+
+        self.request_counts[host] += 1
+        await asyncio.sleep(self.host_latencies.get(host, self.latency))
+
+        recording = self.recordings.get(key)
+        if recording is None:
+            self.misses.append(key)
+            return web.Response(status=404, text=f"No recording for {key}")
+        return web.Response(
+            status=recording.status, headers=recording.headers, body=recording.body
+        )
+
+
+class ReplayTransport(Transport):
+    """Transport that sends every request to a `ReplayServer` at `base_url`.
+
+    Urls are rewritten just before they hit the network, so the response cache and
+    rate limiter still see the original urls.
+    """
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def rewrite(self, url):
+        parts = urlsplit(url)
+        rewritten = f"{self.base_url}/{parts.netloc}{parts.path}"
+        if parts.query:
+            rewritten += "?" + parts.query
+        return rewritten
+
+    async def send_now(self, method, url, source=None, **kwargs):
+        return await super().send_now(method, self.rewrite(url), source, **kwargs)
@@ -0,0 +1,44 @@
+import asyncio
+import math
+
+
+class CadenceScheduler:
+    """Runs a coroutine function on a fixed cadence.
+
+    Cycle start times are anchored to the scheduler's start, so they do not drift by
+    the duration of each cycle. Cycles never overlap: a cycle that overruns its slot
+    delays the next cycle to the following free slot.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stop_event = None
+
+    async def run(self, cycle):
+        loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+
+        start = loop.time()
+        n_slots = 0
+        while not self.stop_event.is_set():
+            await cycle()
+
+            n_slots += 1
+            now = loop.time()
+            next_start = start + n_slots * self.interval
+            if now > next_start:
+                skipped = math.ceil((now - next_start) / self.interval)
+                print(
+                    f"Cycle overran by {now - next_start:.1f}s, skipping {skipped} slot(s)"
+                )
+                n_slots += skipped
+                next_start = start + n_slots * self.interval
+
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), next_start - now)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
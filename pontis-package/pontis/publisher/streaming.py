@@ -0,0 +1,286 @@
+import asyncio
+import datetime
+import json
+import os
+import time
+import traceback
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+import aiohttp
+from pontis.core.entry import construct_entry
+from pontis.core.fixed_point import to_fixed
+from pontis.publisher.assets import AssetRegistry
+from pontis.publisher.fetch import FETCHER_REGISTRY, Fetcher
+
+Tick = namedtuple("Tick", ["price", "timestamp", "received_at"])
+
+INITIAL_RECONNECT_DELAY = 1  # seconds, doubled after every failed connection
+MAX_RECONNECT_DELAY = 30
+HEARTBEAT = 30  # seconds between WebSocket pings
+DEFAULT_MAX_TICK_AGE = 120  # seconds after which a tick is no longer published
+
+
+class TickerCache:
+    """Latest tick per (source, base, quote), updated in place by the streams."""
+
+    def __init__(self):
+        self.ticks = {}
+
+    def update(self, source, base, quote, price, timestamp):
+        self.ticks[(source, base, quote)] = Tick(price, timestamp, time.time())
+
+    def get(self, source, base, quote, max_age=None):
+        tick = self.ticks.get((source, base, quote))
+        if tick is None:
+            return None
+        if max_age is not None and time.time() - tick.received_at > max_age:
+            return None
+        return tick
+
+    def __len__(self):
+        return len(self.ticks)
+
+
+class StreamingSource(ABC):
+    """Long-lived WebSocket connection to an exchange's ticker feed.
+
+    `run` keeps the connection open, resubscribing after every reconnect, and writes
+    each ticker update into a TickerCache. Messages that cannot be parsed are logged
+    and skipped, and any other error ends the connection and triggers a reconnect.
+    Subclasses describe the exchange protocol.
+    """
+
+    name = None
+    url = None
+
+    def __init__(self, pairs, url=None):
+        self.pairs = [tuple(pair) for pair in pairs]
+        if url is not None:
+            self.url = url
+        self.connections = 0
+        self.task = None
+
+    @abstractmethod
+    def subscribe_messages(self):
+        pass
+
+    @abstractmethod
+    def parse_message(self, message):
+        """Returns the (base, quote, price, timestamp) updates found in a message."""
+        pass
+
+    async def run(self, cache):
+        delay = INITIAL_RECONNECT_DELAY
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(
+                        self.url, heartbeat=HEARTBEAT
+                    ) as websocket:
+                        self.connections += 1
+                        for message in self.subscribe_messages():
+                            await websocket.send_json(message)
+                        print(f"Subscribed to {self.name} stream for {self.pairs}")
+
+                        async for message in websocket:
+                            if message.type != aiohttp.WSMsgType.TEXT:
+                                break
+                            self.handle_message(cache, message.data)
+                            delay = INITIAL_RECONNECT_DELAY
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"{self.name} stream error: {e}")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Unexpected {self.name} stream error: {e}")
+                    print(traceback.format_exc())
+
+                print(f"{self.name} stream disconnected, reconnecting in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(MAX_RECONNECT_DELAY, delay * 2)
+
+    def handle_message(self, cache, data):
+        try:
+            updates = self.parse_message(json.loads(data))
+        except Exception as e:
+            print(f"Skipping malformed {self.name} stream message {data!r}: {e!r}")
+            return
+
+        for base, quote, price, timestamp in updates:
+            cache.update(self.name, base, quote, price, timestamp)
+
+    def start(self, cache):
+        self.task = asyncio.ensure_future(self.run(cache))
+        return self.task
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+
+class CoinbaseStream(StreamingSource):
+    name = "Coinbase"
+    url = "wss://ws-feed.exchange.coinbase.com"
+
+    def subscribe_messages(self):
+        return [
+            {
+                "type": "subscribe",
+                "product_ids": [f"{base}-{quote}" for base, quote in self.pairs],
+                "channels": ["ticker"],
+            }
+        ]
+
+    def parse_message(self, message):
+        if message.get("type") != "ticker":
+            return []
+        base, quote = message["product_id"].split("-")
+        timestamp = int(
+            datetime.datetime.strptime(
+                message["time"], "%Y-%m-%dT%H:%M:%S.%f%z"
+            ).timestamp()
+        )
+        return [(base, quote, message["price"], timestamp)]
+
+
+class BinanceStream(StreamingSource):
+    # Binance.com only lists crypto/crypto spot pairs, Binance.US has USD pairs
+    name = "Binance"
+    url = "wss://stream.binance.us:9443/ws"
+
+    def __init__(self, pairs, url=None):
+        super().__init__(pairs, url)
+        self.symbols = {f"{base}{quote}": (base, quote) for base, quote in self.pairs}
+
+    def subscribe_messages(self):
+        return [
+            {
+                "method": "SUBSCRIBE",
+                "params": [f"{symbol.lower()}@ticker" for symbol in self.symbols],
+                "id": 1,
+            }
+        ]
+
+    def parse_message(self, message):
+        if message.get("e") != "24hrTicker" or message["s"] not in self.symbols:
+            return []
+        base, quote = self.symbols[message["s"]]
+        return [(base, quote, message["c"], int(message["E"] / 1000))]
+
+
+class GeminiStream(StreamingSource):
+    name = "Gemini"
+    url = "wss://api.gemini.com/v2/marketdata"
+
+    def __init__(self, pairs, url=None):
+        super().__init__(pairs, url)
+        self.symbols = {f"{base}{quote}": (base, quote) for base, quote in self.pairs}
+
+    def subscribe_messages(self):
+        return [
+            {
+                "type": "subscribe",
+                "subscriptions": [{"name": "l2", "symbols": list(self.symbols)}],
+            }
+        ]
+
+    def parse_message(self, message):
+        if message.get("type") != "trade" or message["symbol"] not in self.symbols:
+            return []
+        base, quote = self.symbols[message["symbol"]]
+        return [(base, quote, message["price"], int(message["timestamp"] / 1000))]
+
+
+class StreamingFetcher(Fetcher):
+    """Serves entries from a TickerCache kept up to date by a StreamingSource.
+
+    Reading the cache takes no network round trip, so it can stand in for the
+    REST fetcher of the same source in a publish cycle. Its entries are published
+    under the same publisher as that fetcher's.
+    """
+
+    def __init__(self, stream, cache, max_age=DEFAULT_MAX_TICK_AGE):
+        self.stream = stream
+        self.cache = cache
+        self.max_age = max_age
+        self.name = f"{stream.name} stream"
+        self.description = f"{stream.name} stream price"
+        self.asset_types = {"SPOT": None}
+        self.pairs = set(stream.pairs)
+
+    async def fetch(self, assets, transport=None):
+        assets = AssetRegistry.from_assets(assets)
+        PUBLISHER_PREFIX = os.environ.get("PUBLISHER_PREFIX")
+        publisher = PUBLISHER_PREFIX + "-" + self.stream.name.lower()
+
+        entries = []
+
+        for asset in assets:
+            pair = asset.pair
+            key = asset.key
+
+            tick = self.cache.get(self.stream.name, *pair, max_age=self.max_age)
+            if tick is None:
+                print(f"No recent tick for {key} from {self.name}")
+                continue
+
+            entries.append(
+                construct_entry(
+                    key=asset.felt_key,
+                    value=to_fixed(tick.price, asset.decimals),
+                    timestamp=tick.timestamp,
+                    publisher=publisher,
+                )
+            )
+
+        return entries
+
+
+STREAMS = {
+    "Coinbase": CoinbaseStream,
+    "Binance": BinanceStream,
+    "Gemini": GeminiStream,
+}
+
+
+def create_streams(sources, assets):
+    """One stream per source name, subscribed to the SPOT pairs of `assets`.
+
+    If the source's REST fetcher serves SPOT assets, only the pairs it supports are
+    subscribed to, as the others are unlikely to be listed on the exchange.
+    """
+    streams = []
+    for source in sources:
+        if source not in STREAMS:
+            raise ValueError(
+                f"Unknown stream {source}, expected one of {', '.join(STREAMS)}"
+            )
+        rest_fetcher = FETCHER_REGISTRY.get(source)
+        if rest_fetcher is not None and "SPOT" in rest_fetcher.asset_types:
+            spot_assets = rest_fetcher.supported_assets(assets)
+        else:
+            spot_assets = assets
+        pairs = [asset.pair for asset in spot_assets if asset.type == "SPOT"]
+        streams.append(STREAMS[source](pairs))
+    return streams
+
+
+def with_streaming_fetchers(fetchers, streams, cache):
+    """`fetchers` with a StreamingFetcher for each stream.
+
+    REST fetchers that only serve SPOT assets are replaced by the stream of their
+    source, others (e.g. Binance futures) keep serving their other asset types.
+    """
+    streamed = {stream.name for stream in streams}
+    return [
+        fetcher
+        for fetcher in fetchers
+        if not (fetcher.name in streamed and set(fetcher.asset_types) == {"SPOT"})
+    ] + [StreamingFetcher(stream, cache) for stream in streams]
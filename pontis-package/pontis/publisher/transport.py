@@ -0,0 +1,224 @@
+import json
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from pontis.publisher.cache import DiskCacheBackend
+from pontis.publisher.ratelimit import RateLimiter
+
+Timeout = namedtuple("Timeout", ["connect", "read"])
+
+DEFAULT_TIMEOUT = Timeout(connect=5, read=10)
+# Sources whose endpoints are known to respond slowly, or that should fail fast
+DEFAULT_SOURCE_TIMEOUTS = {
+    "Binance": Timeout(connect=5, read=20),
+    "Gemini": Timeout(connect=5, read=20),
+    "The Graph": Timeout(connect=5, read=5),
+}
+DEFAULT_LIMIT_PER_HOST = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 60  # seconds an idle connection is kept open
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status, url, body=None):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+class TransportResponse(
+    namedtuple("TransportResponse", ["status", "headers", "body", "url"])
+):
+    __slots__ = ()
+
+    def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPStatusError(self.status, self.url, self.body)
+
+
+class Transport:
+    """Pooled HTTP transport shared by all fetchers and monitors.
+
+    Keeps one keep-alive session per host, each with its own connection limit, so
+    repeated requests to a host reuse TCP and TLS connections. Timeouts can be set
+    per source (as named by the fetchers) and fall back to `default_timeout`. If a
+    `ResponseCache` is given, GET requests are served from and stored in it. If a
+    `RateLimiter` is given, requests that reach the network are paced per source. If a
+    `Hedger` is given, slow GET requests to its sources are duplicated, each copy
+    going through the rate limiter.
+    """
+
+    def __init__(
+        self,
+        default_timeout=None,
+        source_timeouts=None,
+        limit_per_host=None,
+        host_limits=None,
+        keepalive_timeout=None,
+        cache=None,
+        rate_limiter=None,
+        hedger=None,
+    ):
+        self.default_timeout = (
+            DEFAULT_TIMEOUT if default_timeout is None else default_timeout
+        )
+        self.source_timeouts = dict(DEFAULT_SOURCE_TIMEOUTS)
+        if source_timeouts is not None:
+            self.source_timeouts.update(source_timeouts)
+        self.limit_per_host = (
+            DEFAULT_LIMIT_PER_HOST if limit_per_host is None else limit_per_host
+        )
+        self.host_limits = {} if host_limits is None else host_limits
+        self.keepalive_timeout = (
+            DEFAULT_KEEPALIVE_TIMEOUT
+            if keepalive_timeout is None
+            else keepalive_timeout
+        )
+
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.hedger = hedger
+        self.sessions = {}
+
+    def session_for(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.sessions or self.sessions[host].closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.host_limits.get(host, self.limit_per_host),
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self.sessions[host] = aiohttp.ClientSession(connector=connector)
+        return self.sessions[host]
+
+    def timeout_for(self, source):
+        timeout = self.source_timeouts.get(source, self.default_timeout)
+        return aiohttp.ClientTimeout(
+            sock_connect=timeout.connect, sock_read=timeout.read
+        )
+
+    async def request(self, method, url, source=None, **kwargs):
+        """Send a request and read the whole body, releasing the connection to the pool.
+
+        Keyword arguments (params, headers, json, data) are passed on to aiohttp.
+        """
+        if self.cache is not None and method == "GET":
+            return await self.cached_request(url, source, **kwargs)
+
+        return await self.send(method, url, source, **kwargs)
+
+    async def cached_request(self, url, source, **kwargs):
+        key = self.cache.key_for(url, kwargs.get("params"))
+        entry, is_fresh = self.cache.lookup(key, source)
+        if entry is not None and is_fresh:
+            return TransportResponse(entry.status, entry.headers, entry.body, entry.url)
+
+        if entry is not None:
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                **self.cache.conditional_headers(entry),
+            }
+
+        response = await self.send("GET", url, source, **kwargs)
+
+        if entry is not None and response.status == 304:
+            entry = self.cache.revalidated(key, entry, source)
+            return TransportResponse(entry.status, entry.headers, entry.body, entry.url)
+
+        if entry is not None:
+            self.cache.stale(source)
+        if response.status == 200:
+            self.cache.store(
+                key, response.status, response.headers, response.body, response.url
+            )
+
+        return response
+
+    async def send(self, method, url, source=None, **kwargs):
+        if self.hedger is not None and method == "GET":
+            return await self.hedger.run(
+                source, lambda: self.send_limited(method, url, source, **kwargs)
+            )
+
+        return await self.send_limited(method, url, source, **kwargs)
+
+    async def send_limited(self, method, url, source=None, **kwargs):
+        if self.rate_limiter is not None:
+            return await self.rate_limiter.run(
+                source, lambda: self.send_now(method, url, source, **kwargs)
+            )
+
+        return await self.send_now(method, url, source, **kwargs)
+
+    async def send_now(self, method, url, source=None, **kwargs):
+        session = self.session_for(url)
+        async with session.request(
+            method, url, timeout=self.timeout_for(source), **kwargs
+        ) as response:
+            body = await response.read()
+            return TransportResponse(
+                response.status, response.headers, body, str(response.url)
+            )
+
+    async def get(self, url, source=None, **kwargs):
+        return await self.request("GET", url, source=source, **kwargs)
+
+    async def post(self, url, source=None, **kwargs):
+        return await self.request("POST", url, source=source, **kwargs)
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class WorkerTransportFactory:
+    """Builds the Transport of an executor worker from the daemon's Transport.
+
+    A worker fetches on its own event loop, so it cannot use the daemon's sessions,
+    and a process worker cannot update the daemon's rate limiter or hedger. Each
+    worker's Transport gets the same timeouts and connection limits and a rate limiter
+    with the same quotas, which are then only enforced within one fetch. It shares
+    the response cache only if it is on disk, and does not hedge, as it has no
+    latency history. Instances can be sent to a process pool.
+    """
+
+    def __init__(self, transport):
+        self.settings = {
+            "default_timeout": transport.default_timeout,
+            "source_timeouts": transport.source_timeouts,
+            "limit_per_host": transport.limit_per_host,
+            "host_limits": transport.host_limits,
+            "keepalive_timeout": transport.keepalive_timeout,
+        }
+        cache = transport.cache
+        self.cache = (
+            cache
+            if cache is not None and isinstance(cache.backend, DiskCacheBackend)
+            else None
+        )
+        rate_limiter = transport.rate_limiter
+        self.rate_limits = (
+            None
+            if rate_limiter is None
+            else (
+                rate_limiter.quotas,
+                rate_limiter.max_retries,
+                rate_limiter.max_retry_wait,
+            )
+        )
+
+    def __call__(self):
+        rate_limiter = (
+            None if self.rate_limits is None else RateLimiter(*self.rate_limits)
+        )
+        return Transport(cache=self.cache, rate_limiter=rate_limiter, **self.settings)
@@ -2,10 +2,11 @@ import asyncio
 import os
 
 from pontis.core.client import PontisClient
-from pontis.core.utils import currency_pair_to_key
+from pontis.core.decimals import load_decimals
 from pontis.publisher.assets import PONTIS_ALL_ASSETS
 from pontis.publisher.client import PontisPublisherClient
-from pontis.publisher.fetch import fetch_coinbase
+from pontis.publisher.fetch import fetch_coinbase_async
+from pontis.publisher.transport import Transport
 
 DECIMALS = 18
 
@@ -14,18 +15,11 @@ async def main():
     publisher_private_key = int(os.environ.get("PUBLISHER_PRIVATE_KEY"))
     publisher_address = int(os.environ.get("PUBLISHER_ADDRESS"))
 
-    assets = PONTIS_ALL_ASSETS
-
     client = PontisClient()
-    for i, asset in enumerate(assets):
-        if "pair" in asset:
-            key = currency_pair_to_key(*asset["pair"])
-        else:
-            key = asset["key"]
-        decimals = await client.get_decimals(key)
-        assets[i]["decimals"] = decimals
-
-    entries = fetch_coinbase(assets)
+    assets = await load_decimals(client, PONTIS_ALL_ASSETS)
+
+    async with Transport() as transport:
+        entries = await fetch_coinbase_async(assets, transport)
 
     publisher_client = PontisPublisherClient(publisher_private_key, publisher_address)
     await publisher_client.publish_many(entries)
@@ -4,7 +4,7 @@ import time
 import matplotlib.pyplot as plt
 import pandas as pd
 from pontis.core.client import PontisClient
-from pontis.core.utils import currency_pair_to_key, felt_to_str
+from pontis.core.utils import currency_pair_to_key, felts_to_strs
 
 
 async def main(pair):
@@ -26,7 +26,7 @@ async def main(pair):
     df = pd.DataFrame(entries)
     df["value"] = df["value"] / (10**decimals)
     df["datetime"] = pd.to_datetime(df["timestamp"], unit="s")
-    df["publisher"] = df["publisher"].apply(felt_to_str)
+    df["publisher"] = felts_to_strs(df["publisher"])
     df["publisher_prefix"] = df["publisher"].apply(lambda x: x.split("-")[0])
     df["source"] = df["publisher"].apply(
         lambda x: x.split("-")[1] if len(x.split("-")) == 2 else x
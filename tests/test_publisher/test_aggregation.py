@@ -0,0 +1,102 @@
+import random
+
+import numpy as np
+import pytest
+from pontis.core.aggregation import (
+    TIMESTAMP_BUFFER,
+    average_entries_value,
+    entries_median,
+    entry_arrays,
+    get_value,
+    get_values,
+)
+from pontis.core.entry import construct_entry
+
+NOW = 1650000000
+FRESH = NOW - 60
+STALE = NOW - TIMESTAMP_BUFFER
+
+
+def entry(value, timestamp=FRESH, publisher="foo", key="eth/usd"):
+    return construct_entry(
+        key=key, value=value, timestamp=timestamp, publisher=publisher
+    )
+
+
+def test_average_rounds_down_like_the_contract():
+    assert average_entries_value(3, 5) == 4
+    assert average_entries_value(3, 6) == 4
+    assert average_entries_value(3, 3) == 3
+    assert average_entries_value(2**200 + 1, 2**200 + 1) == 2**200 + 1
+
+
+def test_entries_median_matches_contract_test_cases():
+    # Values from test_median_aggregation in tests/test_oracle_implementation.py
+    prices = [1, 3, 10, 5, 12, 2]
+    medians = [entries_median(prices[:i]) for i in range(1, len(prices) + 1)]
+
+    assert medians == [1, 2, 3, 4, 5, 4]
+
+
+def test_get_value_skips_stale_and_uninitialized_entries():
+    entries = [
+        entry(100, publisher="a"),
+        entry(1, timestamp=STALE, publisher="b"),
+        entry(7, timestamp=0, publisher="c"),
+        entry(200, timestamp=STALE + 1, publisher="d"),
+    ]
+
+    assert get_value(entries, NOW) == (150, FRESH)
+    assert get_value(entries[1:3], NOW) == (0, 0)
+
+
+def test_get_values_over_keys_and_snapshots():
+    # 2 snapshots x 2 keys x 3 publishers
+    values = np.array([[[1, 3, 10], [5, 4, 0]], [[8, 2, 6], [9, 9, 9]]])
+    timestamps = np.array(
+        [[[FRESH, FRESH, FRESH], [FRESH, FRESH, 0]], [[FRESH, FRESH, STALE]] * 2]
+    )
+    now = np.array([NOW, NOW + TIMESTAMP_BUFFER])
+
+    median, last_updated = get_values(values, timestamps, now[:, np.newaxis])
+
+    assert median.tolist() == [[3, 4], [0, 0]]
+    assert last_updated.tolist() == [[FRESH, FRESH], [0, 0]]
+
+    median, last_updated = get_values(values, timestamps, NOW)
+    assert median.tolist() == [[3, 4], [5, 9]]
+
+
+@pytest.mark.parametrize("scale", [1, 10**18])
+def test_get_values_matches_reference(scale):
+    rng = random.Random(0)
+    publishers = [f"publisher-{i}" for i in range(7)]
+    keys = [f"key-{i}" for i in range(50)]
+    timestamp_choices = [0, STALE, STALE + 1, FRESH]
+    entries = [
+        entry(
+            rng.randint(0, 100000) * scale + rng.randint(0, 1),
+            timestamp=rng.choice(timestamp_choices),
+            publisher=publisher,
+            key=key,
+        )
+        for key in keys
+        for publisher in rng.sample(publishers, rng.randint(0, len(publishers)))
+    ]
+    key_felts = [entry(0, key=key).key for key in keys]
+    publisher_felts = [entry(0, publisher=p).publisher for p in publishers]
+
+    values, timestamps = entry_arrays(entries, key_felts, publisher_felts)
+    median, last_updated = get_values(values, timestamps, NOW)
+
+    expected = [
+        get_value([e for e in entries if e.key == key], NOW) for key in key_felts
+    ]
+    assert list(zip(median.tolist(), last_updated.tolist())) == expected
+
+
+def test_get_values_without_publishers():
+    median, last_updated = get_values(np.zeros((3, 0)), np.zeros((3, 0)), NOW)
+
+    assert median.tolist() == [0, 0, 0]
+    assert last_updated.tolist() == [0, 0, 0]
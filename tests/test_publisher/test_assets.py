@@ -0,0 +1,71 @@
+import pickle
+
+import pytest
+from pontis.core.utils import str_to_felt
+from pontis.publisher.assets import PONTIS_ALL_ASSETS, Asset, AssetRegistry
+
+AAVE = Asset(
+    "ONCHAIN",
+    key="aave-on-borrow",
+    source="AAVE",
+    detail={"asset_address": "0x0", "metric": "variableBorrowRate"},
+)
+ASSETS = AssetRegistry(
+    [
+        Asset("SPOT", ("ETH", "USD")),
+        Asset("FUTURE", ("ETH", "USD")),
+        {"type": "SPOT", "pair": ["BTC", "USD"]},
+        AAVE,
+    ]
+)
+
+
+def test_asset_keys_are_precomputed():
+    spot = ASSETS[2]
+
+    assert spot == Asset("SPOT", ("BTC", "USD"))
+    assert (spot.pair, spot.key, spot.felt_key) == (
+        ("BTC", "USD"),
+        "btc/usd",
+        str_to_felt("btc/usd"),
+    )
+    assert (AAVE.key, AAVE.felt_key) == (
+        "aave-on-borrow",
+        str_to_felt("aave-on-borrow"),
+    )
+
+
+def test_assets_are_immutable():
+    with pytest.raises(AttributeError):
+        AAVE.decimals = 18
+    with pytest.raises(TypeError):
+        AAVE.detail["metric"] = "stableBorrowRate"
+    with pytest.raises(AttributeError):
+        ASSETS.assets = ()
+
+
+def test_registry_lookups():
+    assert ASSETS.by_type("SPOT") == (ASSETS[0], ASSETS[2])
+    assert ASSETS.by_type("OPTION") == ()
+    assert ASSETS.by_source("AAVE") == (AAVE,)
+    assert ASSETS.by_felt_key(str_to_felt("eth/usd")) == ASSETS[0]
+    assert ASSETS.by_felt_key(str_to_felt("sol/usd")) is None
+    assert ASSETS.keys() == ["eth/usd", "eth/usd", "btc/usd", "aave-on-borrow"]
+
+
+def test_with_decimals_leaves_registry_untouched():
+    run_assets = ASSETS.with_decimals([8, 8, 8, 18])
+
+    assert [asset.decimals for asset in run_assets] == [8, 8, 8, 18]
+    assert [asset.decimals for asset in ASSETS] == [None] * 4
+    assert run_assets.by_source("AAVE")[0].detail == AAVE.detail
+
+    with pytest.raises(ValueError):
+        ASSETS.with_decimals([8])
+
+
+def test_assets_can_be_pickled():
+    # Assets are sent to worker processes by the process executor
+    run_assets = PONTIS_ALL_ASSETS.with_decimals([8] * len(PONTIS_ALL_ASSETS))
+
+    assert list(pickle.loads(pickle.dumps(run_assets))) == list(run_assets)
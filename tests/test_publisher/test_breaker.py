@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+from pontis.publisher.assets import Asset
+from pontis.publisher.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+)
+from pontis.publisher.fetch import Fetcher
+from pontis.publisher.orchestrator import fetch_all
+
+SPOT_USD = Asset("SPOT", ("ETH", "USD"))
+
+
+class FlakyFetcher(Fetcher):
+    asset_types = {"SPOT": None}
+
+    def __init__(self, name, fail=True):
+        self.name = name
+        self.description = f"{name} price"
+        self.fail = fail
+        self.calls = 0
+
+    async def fetch(self, assets, transport):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("exchange is down")
+        return [self.name]
+
+
+def test_breaker_opens_on_failure_rate():
+    breaker = CircuitBreaker(window=5, min_calls=3, failure_rate=0.6)
+
+    breaker.record_success(0.1, now=0)
+    breaker.record_failure(now=1)
+    assert breaker.current_state(now=1) == CLOSED
+    breaker.record_failure(now=2)
+    assert breaker.current_state(now=2) == OPEN
+    assert not breaker.allow(now=3)
+
+
+def test_breaker_counts_slow_calls_as_failures():
+    breaker = CircuitBreaker(min_calls=2, failure_rate=1, slow_call_duration=10)
+
+    breaker.record_success(11, now=0)
+    breaker.record_success(12, now=1)
+
+    assert breaker.current_state(now=1) == OPEN
+    assert "more than 10s" in breaker.status(now=1)["last_error"]
+
+
+def test_breaker_probes_once_when_half_open():
+    breaker = CircuitBreaker(min_calls=1, failure_rate=1, open_duration=60)
+    breaker.record_failure(now=0)
+
+    assert breaker.status(now=30)["retry_in"] == 30
+    assert breaker.current_state(now=60) == HALF_OPEN
+    assert breaker.allow(now=60)
+    assert not breaker.allow(now=61)
+
+    breaker.record_success(0.1, now=62)
+    assert breaker.current_state(now=62) == CLOSED
+    assert breaker.status(now=62)["failure_rate"] == 0
+
+
+def test_breaker_backs_off_after_failed_probe():
+    breaker = CircuitBreaker(min_calls=1, failure_rate=1, open_duration=60)
+    breaker.record_failure(now=0)
+    assert breaker.allow(now=60)
+
+    breaker.record_failure(now=61)
+
+    assert breaker.current_state(now=150) == OPEN
+    assert breaker.current_state(now=181) == HALF_OPEN
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_skips_sources_with_open_circuit():
+    breakers = CircuitBreakers(min_calls=2, failure_rate=1)
+    dead, alive = FlakyFetcher("dead"), FlakyFetcher("alive", fail=False)
+
+    for _ in range(4):
+        entries_by_source = await fetch_all(
+            [SPOT_USD], None, fetchers=[dead, alive], breakers=breakers
+        )
+
+    assert entries_by_source == {"alive": ["alive"]}
+    assert dead.calls == 2
+    assert alive.calls == 4
+    status = breakers.status()
+    assert status["dead"]["state"] == OPEN
+    assert status["dead"]["last_error"] == "exchange is down"
+    assert status["alive"]["state"] == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_closes_circuit_after_successful_probe():
+    breakers = CircuitBreakers(min_calls=1, failure_rate=1, open_duration=0.1)
+    fetcher = FlakyFetcher("flaky")
+
+    await fetch_all([SPOT_USD], None, fetchers=[fetcher], breakers=breakers)
+    assert breakers.status()["flaky"]["state"] == OPEN
+
+    fetcher.fail = False
+    time.sleep(0.1)
+    entries_by_source = await fetch_all(
+        [SPOT_USD], None, fetchers=[fetcher], breakers=breakers
+    )
+
+    assert entries_by_source == {"flaky": ["flaky"]}
+    assert breakers.status()["flaky"]["state"] == CLOSED
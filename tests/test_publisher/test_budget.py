@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import pytest
+from pontis.publisher.assets import Asset
+from pontis.publisher.breaker import OPEN, CircuitBreakers
+from pontis.publisher.budget import CycleBudget, DeadlineExceeded
+from pontis.publisher.fetch import Fetcher
+from pontis.publisher.orchestrator import (
+    create_executor,
+    fetch_all,
+    fetch_all_in_executor,
+)
+from pontis.publisher.pipeline import stream_entries
+
+SPOT_USD = Asset("SPOT", ("ETH", "USD"))
+BUDGET = 0.3
+
+
+class SleepyFetcher(Fetcher):
+    asset_types = {"SPOT": None}
+
+    def __init__(self, name, delay):
+        self.name = name
+        self.description = f"{name} price"
+        self.delay = delay
+        self.cancelled = False
+
+    async def fetch(self, assets, transport):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return [self.name]
+
+
+def test_source_slices_are_capped_by_remaining_time():
+    budget = CycleBudget(10, source_shares={"Slow": 0.2})
+
+    assert budget.timeout_for("Slow") == pytest.approx(2, abs=0.01)
+    assert budget.timeout_for("Other") == pytest.approx(8, abs=0.01)
+
+    budget.started_at -= 9
+    assert budget.timeout_for("Other") == pytest.approx(1, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_budget_cancels_fetch_past_its_slice():
+    budget = CycleBudget(BUDGET, default_share=0.5)
+    fetcher = SleepyFetcher("slow", 10)
+
+    with pytest.raises(DeadlineExceeded):
+        await budget.run("slow", fetcher.fetch([], None))
+    await asyncio.sleep(0)
+
+    assert fetcher.cancelled
+    assert budget.skipped == ["slow"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_keeps_sources_that_finished_in_time():
+    budget = CycleBudget(BUDGET)
+    breakers = CircuitBreakers(min_calls=1, failure_rate=1)
+    straggler = SleepyFetcher("straggler", 10)
+    fetchers = [SleepyFetcher("fast", 0), straggler]
+
+    start = time.monotonic()
+    entries_by_source = await fetch_all(
+        [SPOT_USD],
+        None,
+        fetchers=fetchers,
+        exit_on_error=True,
+        breakers=breakers,
+        budget=budget,
+    )
+
+    assert time.monotonic() - start < BUDGET
+    assert entries_by_source == {"fast": ["fast"]}
+    assert budget.skipped == ["straggler"]
+    assert straggler.cancelled
+    assert breakers.status()["straggler"]["state"] == OPEN
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_in_executor_abandons_stragglers():
+    budget = CycleBudget(BUDGET)
+    fetchers = [SleepyFetcher("fast", 0), SleepyFetcher("straggler", 2 * BUDGET)]
+
+    with create_executor("thread") as executor:
+        start = time.monotonic()
+        entries_by_source = await fetch_all_in_executor(
+            [SPOT_USD], executor, fetchers=fetchers, budget=budget
+        )
+        elapsed = time.monotonic() - start
+
+    assert elapsed < BUDGET
+    assert entries_by_source == {"fast": ["fast"]}
+    assert budget.skipped == ["straggler"]
+
+
+@pytest.mark.asyncio
+async def test_stream_entries_keeps_entries_yielded_before_deadline():
+    class TrickleFetcher(SleepyFetcher):
+        async def stream(self, assets, transport):
+            for i in range(10):
+                yield i
+                await asyncio.sleep(self.delay)
+
+    budget = CycleBudget(BUDGET, default_share=1)
+    entries = [
+        entry
+        async for entry in stream_entries(
+            [SPOT_USD], None, fetchers=[TrickleFetcher("trickle", 0.1)], budget=budget
+        )
+    ]
+
+    assert entries == [0, 1, 2]
+    assert budget.skipped == ["trickle"]
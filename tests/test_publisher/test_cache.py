@@ -0,0 +1,68 @@
+import pytest
+from aiohttp import web
+from pontis.publisher.cache import DiskCacheBackend, ResponseCache
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+ETAG = '"v1"'
+
+
+def make_app(requests_seen):
+    async def prices(request):
+        requests_seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304)
+        return web.json_response({"price": 1}, headers={"ETag": ETAG})
+
+    app = web.Application()
+    app.router.add_get("/prices", prices)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_fresh_responses_are_served_from_cache():
+    requests_seen = []
+    cache = ResponseCache(ttls={"source": 60})
+
+    async with serve_app(make_app(requests_seen)) as base_url:
+        async with Transport(cache=cache) as transport:
+            for _ in range(3):
+                response = await transport.get(f"{base_url}/prices", source="source")
+                assert response.json() == {"price": 1}
+
+    assert len(requests_seen) == 1
+    assert cache.stats() == {"hits": 2, "misses": 1, "revalidations": 0}
+    assert cache.stats("source")["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_responses_are_revalidated_with_etag():
+    requests_seen = []
+    cache = ResponseCache(default_ttl=0)
+
+    async with serve_app(make_app(requests_seen)) as base_url:
+        async with Transport(cache=cache) as transport:
+            await transport.get(f"{base_url}/prices")
+            response = await transport.get(f"{base_url}/prices")
+
+    assert requests_seen == [None, ETAG]
+    assert response.status == 200
+    assert response.json() == {"price": 1}
+    assert cache.stats() == {"hits": 0, "misses": 1, "revalidations": 1}
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_is_shared_between_caches(tmp_path):
+    requests_seen = []
+    first = ResponseCache(ttls={"source": 60}, backend=DiskCacheBackend(tmp_path))
+    second = ResponseCache(ttls={"source": 60}, backend=DiskCacheBackend(tmp_path))
+
+    async with serve_app(make_app(requests_seen)) as base_url:
+        async with Transport(cache=first) as transport:
+            await transport.get(f"{base_url}/prices", source="source")
+        async with Transport(cache=second) as transport:
+            response = await transport.get(f"{base_url}/prices", source="source")
+
+    assert len(requests_seen) == 1
+    assert response.json() == {"price": 1}
+    assert second.stats()["hits"] == 1
@@ -0,0 +1,59 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from pontis.core.utils import str_to_felt
+from pontis.publisher.assets import Asset
+from pontis.publisher.fetch import CoingeckoFetcher, coingecko, fetch_coingecko_async
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+ASSETS = [
+    Asset("SPOT", ("BTC", "USD"), decimals=8),
+    Asset("SPOT", ("ETH", "USD"), decimals=8),
+    Asset("SPOT", ("ETH", "MXN"), decimals=8),
+]
+SIMPLE_PRICE = {
+    "bitcoin": {"usd": 20000.5, "mxn": 400010.0, "last_updated_at": 1654084800},
+    "ethereum": {"usd": 1000.25, "mxn": 20000.0, "last_updated_at": 1654084801},
+}
+
+
+@pytest_asyncio.fixture
+async def requests_seen(monkeypatch):
+    requests_seen = []
+
+    async def simple_price(request):
+        requests_seen.append(dict(request.query))
+        return web.json_response(SIMPLE_PRICE)
+
+    app = web.Application()
+    app.router.add_get("/simple/price", simple_price)
+    async with serve_app(app) as base_url:
+        monkeypatch.setattr(coingecko, "BASE_URL", base_url)
+        monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+        yield requests_seen
+
+
+@pytest.mark.asyncio
+async def test_fetch_coingecko_batch_uses_single_request(requests_seen):
+    async with Transport() as transport:
+        entries = await fetch_coingecko_async(ASSETS, transport)
+
+    assert requests_seen == [
+        {
+            "ids": "bitcoin,ethereum",
+            "vs_currencies": "usd,mxn",
+            "include_last_updated_at": "true",
+        }
+    ]
+    assert [(entry.key, entry.value, entry.timestamp) for entry in entries] == [
+        (str_to_felt("btc/usd"), 2000050000000, 1654084800),
+        (str_to_felt("eth/usd"), 100025000000, 1654084801),
+        (str_to_felt("eth/mxn"), 2000000000000, 1654084801),
+    ]
+
+
+def test_coingecko_fetcher_only_supports_known_coins():
+    unknown = Asset("SPOT", ("XYZ", "USD"))
+
+    assert CoingeckoFetcher().supported_assets(ASSETS + [unknown]) == ASSETS
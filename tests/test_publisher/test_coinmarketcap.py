@@ -0,0 +1,78 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from pontis.core.utils import str_to_felt
+from pontis.publisher.assets import Asset
+from pontis.publisher.fetch import coinmarketcap, fetch_coinmarketcap_async
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+ASSETS = [
+    Asset("SPOT", ("BTC", "USD"), decimals=8),
+    Asset("SPOT", ("ETH", "USD"), decimals=8),
+    Asset("SPOT", ("ETH", "MXN"), decimals=8),
+    Asset("FUTURE", ("BTC", "USD"), decimals=8),
+]
+PRICES = {
+    ("BTC", "USD"): 20000.5,
+    ("ETH", "USD"): 1000.25,
+    ("ETH", "MXN"): 20000.0,
+}
+LAST_UPDATED = "2022-06-01T12:00:00.000Z"
+
+
+@pytest_asyncio.fixture
+async def requests_seen(monkeypatch):
+    requests_seen = []
+
+    async def quotes(request):
+        symbols = request.query["symbol"].split(",")
+        convert = request.query["convert"]
+        requests_seen.append((symbols, convert))
+        data = {
+            symbol: {
+                "quote": {
+                    convert: {
+                        "price": PRICES[(symbol, convert)],
+                        "last_updated": LAST_UPDATED,
+                    }
+                }
+            }
+            for symbol in symbols
+        }
+        return web.json_response({"data": data})
+
+    app = web.Application()
+    app.router.add_get("/quotes/latest", quotes)
+    async with serve_app(app) as base_url:
+        monkeypatch.setattr(coinmarketcap, "URL", f"{base_url}/quotes/latest")
+        monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+        monkeypatch.setenv("COINMARKETCAP_KEY", "key")
+        yield requests_seen
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch", [True, False])
+async def test_fetch_coinmarketcap_entries(requests_seen, batch):
+    async with Transport() as transport:
+        entries = await fetch_coinmarketcap_async(ASSETS, transport, batch=batch)
+
+    assert [entry.key for entry in entries] == [
+        str_to_felt("btc/usd"),
+        str_to_felt("eth/usd"),
+        str_to_felt("eth/mxn"),
+    ]
+    assert [entry.value for entry in entries] == [
+        2000050000000,
+        100025000000,
+        2000000000000,
+    ]
+    assert {entry.timestamp for entry in entries} == {1654084800}
+
+
+@pytest.mark.asyncio
+async def test_fetch_coinmarketcap_batches_by_convert_currency(requests_seen):
+    async with Transport() as transport:
+        await fetch_coinmarketcap_async(ASSETS, transport)
+
+    assert sorted(requests_seen) == [(["BTC", "ETH"], "USD"), (["ETH"], "MXN")]
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from pontis.core.decimals import DecimalsCache, load_decimals
+from pontis.core.utils import felt_to_str
+from pontis.publisher.assets import Asset, AssetRegistry
+
+ASSETS = AssetRegistry(
+    [
+        Asset("SPOT", ("BTC", "USD")),
+        Asset("SPOT", ("ETH", "USD")),
+        Asset("ONCHAIN", key="aave-on-borrow", source="AAVE"),
+    ]
+)
+DECIMALS = {"btc/usd": 8, "eth/usd": 8, "aave-on-borrow": 18}
+
+
+class FakeClient:
+    network = "testnet"
+
+    def __init__(self, oracle_controller_address=0x123):
+        self.oracle_controller_address = oracle_controller_address
+        self.decimals = dict(DECIMALS)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.contract_loads = 0
+        self.contract = None
+
+    async def fetch_oracle_controller_contract(self):
+        if self.contract is None:
+            self.contract_loads += 1
+            await asyncio.sleep(0.01)
+            self.contract = object()
+
+    async def get_decimals(self, key):
+        await self.fetch_oracle_controller_contract()
+        key = felt_to_str(key)
+        self.calls.append(key)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.decimals[key]
+
+
+@pytest.mark.asyncio
+async def test_load_decimals_fetches_misses_concurrently(tmp_path):
+    client = FakeClient()
+
+    loaded = await load_decimals(
+        client, ASSETS, DecimalsCache(tmp_path / "decimals.json")
+    )
+
+    assert [asset.decimals for asset in loaded] == [8, 8, 18]
+    assert [asset.decimals for asset in ASSETS] == [None, None, None]
+    assert sorted(client.calls) == sorted(DECIMALS)
+    assert client.max_in_flight == len(DECIMALS)
+    assert client.contract_loads == 1
+
+
+@pytest.mark.asyncio
+async def test_decimals_cache_persists_without_calls(tmp_path):
+    path = tmp_path / "decimals.json"
+    await load_decimals(FakeClient(), ASSETS, DecimalsCache(path))
+
+    client = FakeClient()
+    loaded = await load_decimals(client, ASSETS, DecimalsCache(path))
+
+    assert [asset.decimals for asset in loaded] == [8, 8, 18]
+    assert client.calls == []
+    assert client.contract_loads == 0
+
+
+@pytest.mark.asyncio
+async def test_decimals_cache_only_fetches_new_keys(tmp_path):
+    cache = DecimalsCache(tmp_path / "decimals.json")
+    client = FakeClient()
+    await cache.get_many(client, ["btc/usd"])
+    client.calls = []
+
+    assert await cache.get_many(client, ["btc/usd", "eth/usd", "eth/usd"]) == [8, 8, 8]
+    assert client.calls == ["eth/usd"]
+
+
+@pytest.mark.asyncio
+async def test_decimals_cache_is_keyed_by_controller():
+    cache = DecimalsCache()
+    await cache.get(FakeClient(), "btc/usd")
+
+    other = FakeClient(oracle_controller_address=0x789)
+    other.decimals["btc/usd"] = 6
+
+    assert await cache.get(other, "btc/usd") == 6
+
+
+@pytest.mark.asyncio
+async def test_decimals_cache_rereads_decimals_changed_in_place():
+    cache = DecimalsCache()
+    client = FakeClient()
+    await cache.get_many(client, ["btc/usd", "eth/usd"])
+    client.decimals["btc/usd"] = 6
+
+    assert await cache.get(client, "btc/usd") == 8
+
+    cache.max_age = 0
+    client.calls = []
+    assert await cache.get(client, "eth/usd") == 8
+    # Every cached key is read again, not only the ones asked for
+    assert sorted(client.calls) == ["btc/usd", "eth/usd"]
+    assert await cache.get(client, "btc/usd") == 6
+
+
+@pytest.mark.asyncio
+async def test_decimals_cache_invalidate():
+    cache = DecimalsCache()
+    client = FakeClient()
+    await cache.get(client, "btc/usd")
+    client.decimals["btc/usd"] = 6
+
+    cache.invalidate(client)
+
+    assert await cache.get(client, "btc/usd") == 6
+
+
+def test_corrupt_decimals_cache_is_ignored(tmp_path):
+    path = tmp_path / "decimals.json"
+    path.write_text("{")
+
+    assert DecimalsCache(path).controllers == {}
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from pontis.core.utils import (
+    FELT_PRIME,
+    felt_to_str,
+    felts_to_strs,
+    str_to_felt,
+    strs_to_felts,
+)
+
+
+def test_felt_round_trip():
+    assert str_to_felt("eth/usd") == int.from_bytes(b"eth/usd", "big")
+    assert felt_to_str(str_to_felt("pontis-coinbase")) == "pontis-coinbase"
+    assert felt_to_str(0) == ""
+
+
+def test_str_to_felt_lowercases():
+    with pytest.warns(UserWarning):
+        assert str_to_felt("ETH/MXN") == str_to_felt("eth/mxn")
+
+
+def test_felt_bit_width_is_validated():
+    assert felt_to_str(str_to_felt("a" * 31)) == "a" * 31
+    with pytest.raises(ValueError):
+        str_to_felt("a" * 32)
+    with pytest.raises(ValueError):
+        felt_to_str(FELT_PRIME)
+    with pytest.raises(ValueError):
+        felt_to_str(-1)
+
+
+def test_decoded_strings_are_interned():
+    first = felt_to_str(str_to_felt("pontis-gemini"))
+    felt_to_str.cache_clear()
+
+    assert felt_to_str(str_to_felt("pontis-gemini")) is first
+
+
+def test_batch_conversions():
+    keys = ["btc/usd", "eth/usd", "btc/usd"]
+    felts = strs_to_felts(keys)
+
+    assert felts == [str_to_felt(key) for key in keys]
+    assert felts_to_strs(felts) == keys
+    assert felts_to_strs(np.array(felts, dtype=np.int64)) == keys
+    assert felts_to_strs(np.array(felts, dtype=object)) == keys
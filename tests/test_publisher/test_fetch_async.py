@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from pontis.core.utils import str_to_felt
+from pontis.publisher.assets import Asset
+from pontis.publisher.fetch import bitstamp, fetch_bitstamp_async
+from pontis.publisher.fetch.utils import run_fetcher
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+RESPONSE_DELAY = 0.2
+
+ASSETS = [
+    Asset("SPOT", ("BTC", "USD"), decimals=8),
+    Asset("SPOT", ("ETH", "USD"), decimals=8),
+    Asset("SPOT", ("TEMP", "USD"), decimals=8),
+    Asset("FUTURE", ("BTC", "USD"), decimals=8),
+]
+PRICES = {"btcusd": "20000.5", "ethusd": "1000.25"}
+
+
+async def ticker(request):
+    await asyncio.sleep(RESPONSE_DELAY)
+    pair = request.match_info["pair"]
+    if pair not in PRICES:
+        raise web.HTTPNotFound()
+    return web.json_response({"timestamp": "1650000000", "last": PRICES[pair]})
+
+
+@pytest_asyncio.fixture
+async def bitstamp_server(monkeypatch):
+    app = web.Application()
+    app.router.add_get("/ticker/{pair}", ticker)
+    async with serve_app(app) as base_url:
+        monkeypatch.setattr(bitstamp, "BASE_URL", f"{base_url}/ticker")
+        monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+        yield
+
+
+@pytest.mark.asyncio
+async def test_fetch_bitstamp_async(bitstamp_server):
+    async with Transport() as transport:
+        entries = await fetch_bitstamp_async(ASSETS, transport)
+
+    assert [entry.key for entry in entries] == [
+        str_to_felt("btc/usd"),
+        str_to_felt("eth/usd"),
+    ]
+    assert entries[0].value == 2000050000000
+    assert entries[0].timestamp == 1650000000
+    assert entries[0].publisher == str_to_felt("test-bitstamp")
+
+
+@pytest.mark.asyncio
+async def test_fetch_bitstamp_async_accepts_asset_dicts(bitstamp_server):
+    assets = [{"type": "SPOT", "pair": ("ETH", "USD"), "decimals": 8}]
+    async with Transport() as transport:
+        entries = await fetch_bitstamp_async(assets, transport)
+
+    assert [(entry.key, entry.value) for entry in entries] == [
+        (str_to_felt("eth/usd"), 100025000000)
+    ]
+    assert bitstamp.BitstampFetcher().supported_assets(assets) == [
+        Asset("SPOT", ("ETH", "USD"), decimals=8)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_bitstamp_async_requests_are_concurrent(bitstamp_server):
+    start = time.monotonic()
+    async with Transport() as transport:
+        await fetch_bitstamp_async(ASSETS, transport)
+
+    # Three spot assets are requested, so a sequential fetch would take 3 delays
+    assert time.monotonic() - start < 2 * RESPONSE_DELAY
+
+
+@pytest.mark.asyncio
+async def test_run_fetcher_can_be_called_from_a_coroutine():
+    async def fetch(assets, transport):
+        return asyncio.get_running_loop(), assets
+
+    loop, assets = run_fetcher(fetch, ASSETS)
+
+    assert loop is not asyncio.get_running_loop()
+    assert assets == ASSETS
@@ -0,0 +1,65 @@
+from pontis.core.entry import construct_entry
+from pontis.publisher.assets import Asset
+from pontis.publisher.filter import DEFAULT_THRESHOLDS, PublishFilter, Threshold
+
+NOW = 1650000000
+ASSETS = [
+    Asset("SPOT", ("ETH", "USD")),
+    Asset("FUTURE", ("BTC", "USD")),
+    Asset("ONCHAIN", key="aave-on-borrow", source="AAVE"),
+]
+
+
+def entry(key, value, timestamp=NOW, publisher="pontis"):
+    return construct_entry(
+        key=key, value=value, timestamp=timestamp, publisher=publisher
+    )
+
+
+def test_first_entry_is_always_published():
+    publish_filter = PublishFilter.from_assets(ASSETS)
+
+    assert publish_filter.should_publish(entry("eth/usd", 100), now=NOW)
+
+
+def test_entry_within_deviation_is_dropped_until_heartbeat():
+    publish_filter = PublishFilter.from_assets(ASSETS)
+    publish_filter.record([entry("eth/usd", 100000)])
+    heartbeat = DEFAULT_THRESHOLDS["SPOT"].heartbeat
+
+    assert not publish_filter.should_publish(entry("eth/usd", 100100), now=NOW + 60)
+    assert publish_filter.should_publish(entry("eth/usd", 100300), now=NOW + 60)
+    assert publish_filter.should_publish(entry("eth/usd", 100100), now=NOW + heartbeat)
+
+
+def test_thresholds_depend_on_asset_type():
+    publish_filter = PublishFilter.from_assets(ASSETS)
+    # 0.4% moves: above the spot threshold, below the futures and on-chain ones
+    last = [
+        entry("eth/usd", 1000),
+        entry("btc/usd-20220624", 1000),
+        entry("aave-on-borrow", 1000),
+    ]
+    publish_filter.record(last)
+
+    moved = [entry(e.key, 1004) for e in last]
+    assert publish_filter.filter(moved, now=NOW + 60) == moved[:1]
+
+
+def test_thresholds_can_be_overridden():
+    publish_filter = PublishFilter.from_assets(
+        ASSETS, thresholds={"SPOT": Threshold(deviation=0.01, heartbeat=600)}
+    )
+    publish_filter.record([entry("eth/usd", 1000)])
+
+    assert not publish_filter.should_publish(entry("eth/usd", 1005), now=NOW + 60)
+    assert publish_filter.should_publish(entry("eth/usd", 1005), now=NOW + 600)
+
+
+def test_last_published_is_tracked_per_publisher():
+    publish_filter = PublishFilter.from_assets(ASSETS)
+    publish_filter.record([entry("eth/usd", 1000, publisher="pontis")])
+
+    assert publish_filter.should_publish(
+        entry("eth/usd", 1000, publisher="other"), now=NOW + 60
+    )
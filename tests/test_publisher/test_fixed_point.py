@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import pytest
+from pontis.core.fixed_point import to_fixed, to_fixed_many
+
+
+def test_to_fixed_is_exact_at_18_decimals():
+    assert to_fixed("20000.123456789012345678", 18) == 20000123456789012345678
+    assert to_fixed("0.1", 18) == 10**17
+    assert to_fixed(0.1, 18) == 10**17
+    assert int(float("1.1") * 10**18) != to_fixed("1.1", 18)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("1000.25", 100025000000),
+        ("-1000.25", -100025000000),
+        ("1.23e3", 123000000000),
+        ("5E-8", 5),
+        (".5", 50000000),
+        ("7.", 700000000),
+        (" 42 ", 4200000000),
+        (42, 4200000000),
+        (1e-05, 1000),
+        (Decimal("3.14"), 314000000),
+    ],
+)
+def test_to_fixed_parses_decimal_formats(value, expected):
+    assert to_fixed(value, 8) == expected
+
+
+def test_to_fixed_truncates_extra_digits_towards_zero():
+    assert to_fixed("1.999999999", 8) == 199999999
+    assert to_fixed("-1.999999999", 8) == -199999999
+
+
+def test_to_fixed_rescales_from_input_decimals():
+    # Aave rates are reported with 27 decimals
+    assert to_fixed("31234567890123456789012345", 18, 27) == 31234567890123456
+
+
+@pytest.mark.parametrize("value", ["", ".", "abc", "1.2.3", "nan", float("inf"), None])
+def test_to_fixed_rejects_invalid_values(value):
+    with pytest.raises((ValueError, TypeError)):
+        to_fixed(value, 8)
+
+
+def test_to_fixed_many_matches_to_fixed():
+    values = ["20000.5", "0.05", "1e2", "-3.25", "7", 1.5, "123.123456789"]
+
+    assert to_fixed_many(values, 8) == [to_fixed(value, 8) for value in values]
+    assert to_fixed_many(values, 30, 27) == [to_fixed(v, 30, 27) for v in values]
@@ -0,0 +1,33 @@
+from pontis.publisher.fetch import FuturesIndex
+
+BINANCE_PREMIUM_INDEX = [
+    {"symbol": "BTCUSD_PERP", "markPrice": "20000.0", "time": 1654084800000},
+    {"symbol": "BTCUSD_220930", "markPrice": "20200.0", "time": 1654084800000},
+    {"symbol": "BTCUSD_220624", "markPrice": "20100.0", "time": 1654084800000},
+    {"symbol": "ETHUSD_220624", "markPrice": "1010.0", "time": 1654084800000},
+]
+FTX_FUTURES = [
+    {"name": "BTC-PERP", "mark": 20000.0, "expiry": None},
+    {"name": "BTC-0624", "mark": 20100.0, "expiry": "2022-06-24T03:00:00+00:00"},
+    {"name": "BTC-MOVE-0601", "mark": 500.0, "expiry": "2022-06-02T00:00:00+00:00"},
+    {"name": "BTC-1230", "mark": 20300.0, "expiry": "2022-12-30T03:00:00+00:00"},
+]
+
+
+def test_binance_term_structure_is_sorted_by_expiry():
+    index = FuturesIndex.from_binance(BINANCE_PREMIUM_INDEX)
+
+    assert len(index) == 3
+    assert [c.symbol for c in index.term_structure("BTC", "USD")] == [
+        "BTCUSD_220624",
+        "BTCUSD_220930",
+    ]
+    assert index.get("ETH", "USD", 20220624).data["markPrice"] == "1010.0"
+    assert index.term_structure("SOL", "USD") == []
+
+
+def test_ftx_index_skips_perpetuals_and_move_contracts():
+    index = FuturesIndex.from_ftx(FTX_FUTURES)
+
+    assert index.underlyings() == [("BTC", "USD")]
+    assert index.keys() == ["btc/usd-20220624", "btc/usd-20221230"]
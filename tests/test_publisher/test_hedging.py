@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from pontis.publisher.hedging import Hedger, LatencyTracker
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+FAST = 0.01
+SLOW = 0.5
+
+
+def warmed_up_hedger(max_extra_ratio=1.0, samples=5):
+    hedger = Hedger(sources={"Slow"}, min_samples=5, max_extra_ratio=max_extra_ratio)
+    for _ in range(samples):
+        hedger.latencies.record("Slow", FAST)
+    return hedger
+
+
+def test_latency_tracker_percentile_over_window():
+    tracker = LatencyTracker(window=10)
+    for latency in range(100):
+        tracker.record("source", latency)
+
+    assert tracker.count("source") == 10
+    assert tracker.percentile("source", 0.95) == 99
+    assert tracker.percentile("source", 0.5) == 95
+    assert tracker.percentile("other", 0.95) is None
+
+
+@pytest.mark.asyncio
+async def test_hedger_does_not_hedge_until_warmed_up():
+    hedger = Hedger(sources={"Slow"}, min_samples=5, max_extra_ratio=1.0)
+    calls = []
+
+    async def send():
+        calls.append(time.monotonic())
+        await asyncio.sleep(FAST)
+        return "response"
+
+    assert await hedger.run("Slow", send) == "response"
+    assert len(calls) == 1
+    assert hedger.hedge_delay("Slow") is None
+    assert hedger.hedge_delay("Other") is None
+
+
+@pytest.mark.asyncio
+async def test_hedger_sends_duplicate_of_slow_request():
+    hedger = warmed_up_hedger()
+    delays = [SLOW, FAST]
+    cancelled = []
+
+    async def send():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    start = time.monotonic()
+    assert await hedger.run("Slow", send) == FAST
+    await asyncio.sleep(0)
+
+    assert time.monotonic() - start < SLOW / 2
+    assert cancelled == [SLOW]
+    assert hedger.stats("Slow")["hedged"] == 1
+    assert hedger.stats("Slow")["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedger_waits_for_other_attempt_if_one_fails():
+    hedger = warmed_up_hedger()
+    attempts = []
+
+    async def send():
+        attempts.append(None)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.2)
+            return "first"
+        raise ValueError()
+
+    assert await hedger.run("Slow", send) == "first"
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_hedger_caps_extra_requests():
+    # Enough fast samples that the slow requests do not move the percentile
+    hedger = warmed_up_hedger(max_extra_ratio=0.5, samples=95)
+    calls = []
+
+    async def send():
+        calls.append(None)
+        await asyncio.sleep(0.1)
+        return "response"
+
+    for _ in range(4):
+        await hedger.run("Slow", send)
+
+    # Every request is slow, but only one extra request per two is allowed
+    assert hedger.stats("Slow")["hedged"] == 2
+    assert len(calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_transport_hedges_slow_get_requests():
+    calls = []
+
+    async def prices(request):
+        calls.append(None)
+        # Only the first request of the slow one is slow
+        await asyncio.sleep(SLOW if len(calls) == 6 else FAST)
+        return web.json_response({"price": "1"})
+
+    app = web.Application()
+    app.router.add_get("/prices", prices)
+    hedger = Hedger(sources={"Slow"}, min_samples=5, max_extra_ratio=1.0)
+    async with serve_app(app) as base_url:
+        async with Transport(hedger=hedger) as transport:
+            for _ in range(5):
+                await transport.get(f"{base_url}/prices", source="Slow")
+
+            start = time.monotonic()
+            response = await transport.get(f"{base_url}/prices", source="Slow")
+            elapsed = time.monotonic() - start
+
+    assert response.json() == {"price": "1"}
+    assert elapsed < SLOW / 2
+    assert len(calls) == 7
@@ -0,0 +1,283 @@
+import asyncio
+import os
+import time
+
+import pytest
+from pontis.core.entry import construct_entry
+from pontis.publisher.assets import Asset
+from pontis.publisher.cache import DiskCacheBackend, ResponseCache
+from pontis.publisher.fetch import Fetcher
+from pontis.publisher.filter import PublishFilter
+from pontis.publisher.orchestrator import (
+    create_executor,
+    fetch_all,
+    fetch_all_in_executor,
+    plan_fetches,
+    publish_all_sources,
+)
+from pontis.publisher.ratelimit import Quota, RateLimiter
+from pontis.publisher.transport import Timeout, Transport
+
+FETCH_DELAY = 0.2
+
+SPOT_USD = Asset("SPOT", ("ETH", "USD"))
+SPOT_MXN = Asset("SPOT", ("ETH", "MXN"))
+FUTURE_USD = Asset("FUTURE", ("BTC", "USD"))
+ONCHAIN_AAVE = Asset("ONCHAIN", key="aave-on-borrow", source="AAVE")
+
+
+class StubFetcher(Fetcher):
+    asset_types = {"SPOT": None}
+
+    def __init__(self, name, error=None):
+        self.name = name
+        self.description = f"{name} price"
+        self.error = error
+
+    async def fetch(self, assets, transport):
+        await asyncio.sleep(FETCH_DELAY)
+        if self.error is not None:
+            raise self.error
+        return [self.name]
+
+
+class BlockingFetcher(StubFetcher):
+    """Blocks its thread like a synchronous fetcher would."""
+
+    def __init__(self, name, delay=FETCH_DELAY, error=None):
+        super().__init__(name, error)
+        self.delay = delay
+
+    async def fetch(self, assets, transport):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [self.name]
+
+
+class TransportFetcher(StubFetcher):
+    """Reports the settings of the transport it is given."""
+
+    async def fetch(self, assets, transport):
+        return [
+            transport.default_timeout,
+            transport.rate_limiter.quotas["test"],
+            transport.cache is not None,
+            transport.hedger,
+        ]
+
+
+class PidFetcher(StubFetcher):
+    """Reports the process it fetches in, and counts its fetches."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.fetches = 0
+
+    async def fetch(self, assets, transport):
+        self.fetches += 1
+        return [os.getpid()]
+
+
+class StatefulFetcher(PidFetcher):
+    keeps_state = True
+
+
+def test_fetcher_supports_declared_capabilities():
+    class UsdSpotFetcher(StubFetcher):
+        asset_types = {"SPOT": {"USD"}, "FUTURE": {"USD"}}
+
+    class AaveFetcher(StubFetcher):
+        asset_types = {"ONCHAIN": None}
+        onchain_sources = {"AAVE"}
+
+    class PairFetcher(StubFetcher):
+        pairs = {("ETH", "MXN")}
+
+    assets = [SPOT_USD, SPOT_MXN, FUTURE_USD, ONCHAIN_AAVE]
+    assert UsdSpotFetcher("usd").supported_assets(assets) == [SPOT_USD, FUTURE_USD]
+    assert AaveFetcher("aave").supported_assets(assets) == [ONCHAIN_AAVE]
+    assert PairFetcher("pair").supported_assets(assets) == [SPOT_MXN]
+
+
+def test_plan_fetches_skips_fetchers_without_supported_assets():
+    class FutureFetcher(StubFetcher):
+        asset_types = {"FUTURE": None}
+
+    spot_fetcher = StubFetcher("spot")
+    plan = plan_fetches([SPOT_USD], [spot_fetcher, FutureFetcher("future")])
+
+    assert plan == [(spot_fetcher, [SPOT_USD])]
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_runs_fetchers_concurrently():
+    fetchers = [StubFetcher(f"source-{i}") for i in range(5)]
+
+    start = time.monotonic()
+    entries_by_source = await fetch_all([SPOT_USD], None, fetchers=fetchers)
+
+    assert time.monotonic() - start < 2 * FETCH_DELAY
+    assert list(entries_by_source) == [f"source-{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_isolates_fetcher_errors():
+    fetchers = [
+        StubFetcher("good"),
+        StubFetcher("bad", error=ValueError("boom")),
+        StubFetcher("other"),
+    ]
+
+    entries_by_source = await fetch_all([SPOT_USD], None, fetchers=fetchers)
+
+    assert entries_by_source == {"good": ["good"], "other": ["other"]}
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_raises_when_exit_on_error():
+    fetchers = [StubFetcher("good"), StubFetcher("bad", error=ValueError())]
+
+    with pytest.raises(ValueError):
+        await fetch_all([SPOT_USD], None, fetchers=fetchers, exit_on_error=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process"])
+async def test_fetch_all_in_executor_collects_results_as_they_complete(kind):
+    fetchers = [
+        BlockingFetcher("slow", delay=2 * FETCH_DELAY),
+        BlockingFetcher("fast", delay=FETCH_DELAY),
+    ]
+
+    with create_executor(kind, max_workers=2) as executor:
+        start = time.monotonic()
+        entries_by_source = await fetch_all_in_executor(
+            [SPOT_USD], executor, fetchers=fetchers
+        )
+
+    assert time.monotonic() - start < 3 * FETCH_DELAY
+    assert list(entries_by_source.items()) == [("fast", ["fast"]), ("slow", ["slow"])]
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_in_executor_keeps_event_loop_free():
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(FETCH_DELAY / 10)
+
+    ticker = asyncio.ensure_future(tick())
+    with create_executor("thread") as executor:
+        await fetch_all_in_executor(
+            [SPOT_USD], executor, fetchers=[BlockingFetcher("blocking")]
+        )
+    ticker.cancel()
+
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_in_executor_isolates_fetcher_errors():
+    fetchers = [BlockingFetcher("good"), BlockingFetcher("bad", error=ValueError())]
+
+    with create_executor("thread") as executor:
+        entries_by_source = await fetch_all_in_executor(
+            [SPOT_USD], executor, fetchers=fetchers
+        )
+        with pytest.raises(ValueError):
+            await fetch_all_in_executor(
+                [SPOT_USD], executor, fetchers=fetchers, exit_on_error=True
+            )
+
+    assert entries_by_source == {"good": ["good"]}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process"])
+@pytest.mark.parametrize("on_disk", [False, True])
+async def test_fetch_all_in_executor_builds_worker_transports(kind, on_disk, tmp_path):
+    backend = DiskCacheBackend(str(tmp_path)) if on_disk else None
+    transport = Transport(
+        default_timeout=Timeout(connect=1, read=2),
+        cache=ResponseCache(backend=backend),
+        rate_limiter=RateLimiter(quotas={"test": Quota(requests=3, period=1, burst=1)}),
+    )
+
+    with create_executor(kind) as executor:
+        entries_by_source = await fetch_all_in_executor(
+            [SPOT_USD],
+            executor,
+            fetchers=[TransportFetcher("transport")],
+            transport=transport,
+        )
+
+    assert entries_by_source == {
+        "transport": [Timeout(connect=1, read=2), Quota(3, 1, 1), on_disk, None]
+    }
+
+
+@pytest.mark.asyncio
+async def test_fetchers_keeping_state_run_on_the_event_loop_with_a_process_pool():
+    stateless, stateful = PidFetcher("stateless"), StatefulFetcher("stateful")
+
+    with create_executor("process") as executor:
+        entries_by_source = await fetch_all_in_executor(
+            [SPOT_USD], executor, fetchers=[stateless, stateful]
+        )
+
+    assert entries_by_source["stateful"] == [os.getpid()]
+    assert entries_by_source["stateless"] != [os.getpid()]
+    assert (stateless.fetches, stateful.fetches) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_in_executor_cancels_pending_fetches_on_error():
+    tasks_before = asyncio.all_tasks()
+    fetchers = [
+        BlockingFetcher("slow", delay=2 * FETCH_DELAY),
+        BlockingFetcher("bad", delay=0, error=ValueError()),
+    ]
+
+    with create_executor("thread", max_workers=2) as executor:
+        with pytest.raises(ValueError):
+            await fetch_all_in_executor(
+                [SPOT_USD], executor, fetchers=fetchers, exit_on_error=True
+            )
+        pending = [task for task in asyncio.all_tasks() - tasks_before]
+
+    assert all(task.done() for task in pending)
+
+
+def test_create_executor_rejects_unknown_kinds():
+    with pytest.raises(ValueError):
+        create_executor("fiber")
+
+
+@pytest.mark.asyncio
+async def test_publish_all_sources_only_prints_forwarded_entries(capsys):
+    class Client:
+        async def publish_many(self, entries):
+            self.published = entries
+
+    now = int(time.time())
+    eth = construct_entry(key="eth/usd", value=100, timestamp=now, publisher="test")
+    btc = construct_entry(key="btc/usd", value=200, timestamp=now, publisher="test")
+    publish_filter = PublishFilter.from_assets([SPOT_USD, FUTURE_USD])
+    publish_filter.record([eth])
+    client = Client()
+
+    await publish_all_sources(
+        client,
+        {"stub": [eth, btc]},
+        fetchers=[StubFetcher("stub")],
+        publish_filter=publish_filter,
+    )
+
+    assert client.published == [btc]
+    printed = capsys.readouterr().out
+    assert "key=btc/usd" in printed
+    assert "key=eth/usd" not in printed
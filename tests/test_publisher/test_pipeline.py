@@ -0,0 +1,226 @@
+import asyncio
+import time
+
+import pytest
+from pontis.core.entry import construct_entry
+from pontis.publisher.assets import Asset
+from pontis.publisher.breaker import CircuitBreakers
+from pontis.publisher.fetch import Fetcher
+from pontis.publisher.fetch.utils import TrackedEntry, iterate_entries
+from pontis.publisher.pipeline import (
+    batch_entries,
+    publish_batches,
+    stream_and_publish,
+    stream_entries,
+)
+
+SPOT_USD = Asset("SPOT", ("ETH", "USD"))
+DELAY = 0.2
+
+
+def entry(key):
+    return construct_entry(key=key, value=1, timestamp=0, publisher="test")
+
+
+class DelayedFetcher(Fetcher):
+    asset_types = {"SPOT": None}
+
+    def __init__(self, name, delay, count=1, error=None):
+        self.name = name
+        self.description = f"{name} price"
+        self.delay = delay
+        self.count = count
+        self.error = error
+
+    async def fetch(self, assets, transport):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [entry(f"{self.name}-{i}") for i in range(self.count)]
+
+
+class RecordingClient:
+    def __init__(self):
+        self.published = []
+
+    async def publish_many(self, entries):
+        self.published.append((time.monotonic(), list(entries)))
+        return len(self.published)
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+async def timed(entries):
+    start = time.monotonic()
+    async for entry in entries:
+        yield time.monotonic() - start, entry
+
+
+@pytest.mark.asyncio
+async def test_iterate_entries_yields_as_coroutines_complete():
+    async def fetch(value, delay):
+        await asyncio.sleep(delay)
+        return value
+
+    entries = iterate_entries(
+        [fetch("slow", 2 * DELAY), fetch(["a", "b"], DELAY), fetch(None, 0)]
+    )
+
+    assert await collect(entries) == ["a", "b", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_stream_entries_does_not_wait_for_slow_sources():
+    fetchers = [DelayedFetcher("slow", 3 * DELAY), DelayedFetcher("fast", DELAY)]
+
+    arrivals = await collect(timed(stream_entries([SPOT_USD], None, fetchers=fetchers)))
+
+    assert [e for _, e in arrivals] == [entry("fast-0"), entry("slow-0")]
+    assert arrivals[0][0] < 2 * DELAY
+
+
+@pytest.mark.asyncio
+async def test_stream_entries_reports_failed_sources():
+    breakers = CircuitBreakers()
+    fetchers = [
+        DelayedFetcher("bad", 0, error=ValueError("boom")),
+        DelayedFetcher("good", 0),
+    ]
+
+    entries = await collect(
+        stream_entries([SPOT_USD], None, fetchers=fetchers, breakers=breakers)
+    )
+
+    assert entries == [entry("good-0")]
+    assert breakers.status()["bad"]["last_error"] == "boom"
+    with pytest.raises(ValueError):
+        await collect(
+            stream_entries([SPOT_USD], None, fetchers=fetchers, exit_on_error=True)
+        )
+
+
+@pytest.mark.asyncio
+async def test_stream_entries_applies_backpressure():
+    fetcher = DelayedFetcher("many", 0, count=10)
+    entries = stream_entries([SPOT_USD], None, fetchers=[fetcher], max_pending=2)
+
+    assert await entries.__anext__() == entry("many-0")
+    await asyncio.sleep(0.05)
+    # The fetcher is waiting for room in the queue instead of buffering everything
+    assert await collect(entries) == [entry(f"many-{i}") for i in range(1, 10)]
+
+
+@pytest.mark.asyncio
+async def test_batch_entries_flushes_on_size_and_delay():
+    async def entries():
+        for i in range(5):
+            yield i
+        await asyncio.sleep(3 * DELAY)
+        yield 5
+
+    batches = await collect(
+        timed(batch_entries(entries(), max_size=2, max_delay=DELAY))
+    )
+
+    assert [batch for _, batch in batches] == [[0, 1], [2, 3], [4], [5]]
+    # The odd entry out is flushed after the delay, not when the input ends
+    assert DELAY <= batches[2][0] < 2 * DELAY
+
+
+@pytest.mark.asyncio
+async def test_batch_entries_propagates_errors():
+    async def entries():
+        yield 1
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        await collect(batch_entries(entries(), max_size=10, max_delay=DELAY))
+
+
+@pytest.mark.asyncio
+async def test_publish_batches_skips_failed_batches():
+    class FlakyClient(RecordingClient):
+        async def publish_many(self, entries):
+            if entries == [entry("bad")]:
+                raise ConnectionError()
+            return await super().publish_many(entries)
+
+    notified = []
+
+    async def batches():
+        yield [TrackedEntry(entry("good"), notified.append)]
+        yield [TrackedEntry(entry("bad"), notified.append)]
+        yield []
+
+    client = FlakyClient()
+    invocation = await publish_batches(client, batches())
+
+    assert [entries for _, entries in client.published] == [[entry("good")]]
+    assert invocation == 1
+    assert notified == [entry("good")]
+
+
+@pytest.mark.asyncio
+async def test_stream_and_publish_publishes_fast_sources_first():
+    client = RecordingClient()
+    fetchers = [DelayedFetcher("slow", 3 * DELAY), DelayedFetcher("fast", 0, count=3)]
+
+    start = time.monotonic()
+    await stream_and_publish(
+        client,
+        [SPOT_USD],
+        None,
+        fetchers=fetchers,
+        max_batch_size=3,
+        max_batch_delay=DELAY,
+    )
+
+    (first_at, first), (_, second) = client.published
+    assert first == [entry(f"fast-{i}") for i in range(3)]
+    assert first_at - start < DELAY
+    assert second == [entry("slow-0")]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_stream_and_publish_with_full_queues_stops_fetches():
+    class EndlessFetcher(DelayedFetcher):
+        async def stream(self, assets, transport):
+            i = 0
+            while True:
+                yield entry(f"{self.name}-{i}")
+                i += 1
+
+    class StuckClient(RecordingClient):
+        async def publish_many(self, entries):
+            await super().publish_many(entries)
+            await asyncio.sleep(60)
+
+    tasks_before = asyncio.all_tasks()
+    breakers = CircuitBreakers()
+    client = StuckClient()
+    publishing = asyncio.ensure_future(
+        stream_and_publish(
+            client,
+            [SPOT_USD],
+            None,
+            fetchers=[EndlessFetcher("endless", 0)],
+            breakers=breakers,
+            max_batch_size=1,
+            max_pending=1,
+        )
+    )
+    await asyncio.sleep(DELAY)
+    publishing.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(publishing, DELAY)
+    # Let the abandoned fetcher stream be finalized
+    await asyncio.sleep(0.01)
+
+    assert len(client.published) == 1
+    assert breakers.status().get("endless", {"calls": 0})["calls"] == 0
+    assert [
+        task for task in asyncio.all_tasks() - tasks_before if not task.done()
+    ] == []
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from aiohttp import web
+from pontis.publisher.ratelimit import (
+    Quota,
+    RateLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+    parse_retry_after,
+)
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spreads_requests_over_quota():
+    bucket = TokenBucket(Quota(requests=20, period=1, burst=2))
+
+    start = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+
+    # Two requests go out immediately, the other four are spaced 50ms apart
+    assert 0.18 <= time.monotonic() - start < 0.4
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_retries_after_429():
+    calls = []
+
+    async def prices(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return web.json_response({}, status=429, headers={"Retry-After": "0.2"})
+        return web.json_response({"price": 1})
+
+    app = web.Application()
+    app.router.add_get("/prices", prices)
+    rate_limiter = RateLimiter()
+
+    async with serve_app(app) as base_url:
+        async with Transport(rate_limiter=rate_limiter) as transport:
+            response = await transport.get(f"{base_url}/prices", source="source")
+
+    assert response.json() == {"price": 1}
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.2
+    assert rate_limiter.bucket_for("source").rate_factor == pytest.approx(0.55)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_gives_up_on_long_retry_after():
+    async def prices(request):
+        return web.json_response({}, status=429, headers={"Retry-After": "3600"})
+
+    app = web.Application()
+    app.router.add_get("/prices", prices)
+
+    rate_limiter = RateLimiter()
+
+    async with serve_app(app) as base_url:
+        async with Transport(rate_limiter=rate_limiter) as transport:
+            response = await transport.get(f"{base_url}/prices", source="source")
+
+    assert response.status == 429
+
+    # The source stays paused, so further requests fail without being sent
+    with pytest.raises(RateLimitExceeded):
+        async with Transport(rate_limiter=rate_limiter) as transport:
+            await transport.get(f"{base_url}/prices", source="source")
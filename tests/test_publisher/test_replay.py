@@ -0,0 +1,97 @@
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from pontis.publisher.assets import Asset
+from pontis.publisher.fetch import bitstamp, fetch_bitstamp_async, fetch_thegraph_async
+from pontis.publisher.replay import (
+    RecordedTransport,
+    Recordings,
+    RecordingTransport,
+    ReplayServer,
+    ReplayTransport,
+    request_key,
+    serve_app,
+)
+
+ASSETS = [
+    Asset("SPOT", ("BTC", "USD"), decimals=8),
+    Asset("SPOT", ("ETH", "USD"), decimals=8),
+]
+PRICES = {"btcusd": "20000.5", "ethusd": "1000.25"}
+
+
+async def ticker(request):
+    pair = request.match_info["pair"]
+    return web.json_response({"timestamp": "1650000000", "last": PRICES[pair]})
+
+
+@pytest_asyncio.fixture
+async def recordings(monkeypatch, tmp_path):
+    """Record Bitstamp responses from a local server and round-trip them to disk."""
+    app = web.Application()
+    app.router.add_get("/ticker/{pair}", ticker)
+    monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+    async with serve_app(app) as base_url:
+        monkeypatch.setattr(bitstamp, "BASE_URL", f"{base_url}/ticker")
+        async with RecordingTransport() as transport:
+            await fetch_bitstamp_async(ASSETS, transport)
+
+    path = tmp_path / "responses.json"
+    transport.recordings.save(path)
+    return Recordings.load(path)
+
+
+def test_request_key_normalizes_query_and_body():
+    assert request_key("GET", "https://a.com/p?b=2&a=1") == request_key(
+        "GET", "https://a.com/p", params={"a": 1, "b": "2"}
+    )
+    assert request_key("POST", "https://a.com/p", json_body={"x": 1, "y": 2}) == (
+        request_key("POST", "https://a.com/p", json_body={"y": 2, "x": 1})
+    )
+
+
+@pytest.mark.asyncio
+async def test_recorded_transport_replays_without_http(recordings):
+    async with RecordedTransport(recordings) as transport:
+        entries = await fetch_bitstamp_async(ASSETS, transport)
+
+    assert [entry.value for entry in entries] == [2000050000000, 100025000000]
+    assert transport.request_counts == {"Bitstamp": 2}
+
+
+@pytest.mark.asyncio
+async def test_replay_server_serves_recordings_with_latency(recordings):
+    latency = 0.2
+    server = ReplayServer(recordings, latency=latency, scheme="http")
+    async with server.serve() as base_url:
+        start = time.monotonic()
+        async with ReplayTransport(base_url) as transport:
+            entries = await fetch_bitstamp_async(ASSETS, transport)
+        elapsed = time.monotonic() - start
+
+    assert [entry.value for entry in entries] == [2000050000000, 100025000000]
+    assert sum(server.request_counts.values()) == 2
+    # Requests are concurrent, so both are delayed at once
+    assert latency <= elapsed < 2 * latency
+
+
+@pytest.mark.asyncio
+async def test_replay_server_reports_missing_recordings(monkeypatch):
+    monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+    server = ReplayServer(Recordings())
+    asset = Asset(
+        "ONCHAIN",
+        key="aave-on-borrow",
+        source="AAVE",
+        detail={"asset_address": "0x0", "metric": "variableBorrowRate"},
+        decimals=18,
+    )
+    async with server.serve() as base_url:
+        async with ReplayTransport(base_url) as transport:
+            with pytest.raises(Exception):
+                await fetch_thegraph_async([asset], transport)
+
+    assert len(server.misses) == 1
+    assert server.misses[0].startswith("POST https://api.thegraph.com/")
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from pontis.publisher.scheduler import CadenceScheduler
+
+INTERVAL = 0.1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_starts_cycles_on_a_fixed_cadence():
+    loop = asyncio.get_running_loop()
+    scheduler = CadenceScheduler(INTERVAL)
+    starts = []
+
+    async def cycle():
+        starts.append(loop.time())
+        await asyncio.sleep(INTERVAL / 2)
+        if len(starts) == 4:
+            scheduler.stop()
+
+    await scheduler.run(cycle)
+
+    offsets = [start - starts[0] for start in starts]
+    for i, offset in enumerate(offsets):
+        assert offset == pytest.approx(i * INTERVAL, abs=INTERVAL / 4)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_does_not_overlap_slow_cycles():
+    loop = asyncio.get_running_loop()
+    scheduler = CadenceScheduler(INTERVAL)
+    running = []
+    starts = []
+
+    async def cycle():
+        assert not running
+        running.append(True)
+        starts.append(loop.time())
+        await asyncio.sleep(INTERVAL * 1.5 if len(starts) == 1 else 0)
+        running.pop()
+        if len(starts) == 2:
+            scheduler.stop()
+
+    await scheduler.run(cycle)
+
+    # The first cycle overran into the second slot, so the next one starts in the third
+    assert starts[1] - starts[0] == pytest.approx(2 * INTERVAL, abs=INTERVAL / 4)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_stops_without_waiting_for_next_slot():
+    loop = asyncio.get_running_loop()
+    scheduler = CadenceScheduler(10)
+
+    async def cycle():
+        loop.call_later(0.05, scheduler.stop)
+
+    start = loop.time()
+    await scheduler.run(cycle)
+
+    assert loop.time() - start < 1
@@ -0,0 +1,61 @@
+import pytest
+from aiohttp import web
+from pontis.publisher.assets import Asset
+from pontis.publisher.fetch import ExchangeSnapshot, fetch_gemini_async, gemini
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+PRICEFEED = [
+    {"pair": "BTCUSD", "price": "20000.5"},
+    {"pair": "ETHUSD", "price": "1000.25"},
+    {"pair": "ETHBTC", "price": "0.05"},
+]
+
+
+def test_snapshot_indexes_by_normalized_symbol():
+    snapshot = ExchangeSnapshot(
+        [{"name": "BTC/USD"}, {"name": "eth-usd"}],
+        lambda row: row["name"],
+        timestamp=1,
+    )
+
+    assert snapshot.get("BTC", "USD") == {"name": "BTC/USD"}
+    assert snapshot.get("ETH", "USD") == {"name": "eth-usd"}
+    assert snapshot.get("SOL", "USD") is None
+    assert "btc/usd" in snapshot
+    assert len(snapshot) == 2
+
+
+def test_snapshot_rejects_ambiguous_symbols():
+    snapshot = ExchangeSnapshot(
+        [{"name": "BTC/USD"}, {"name": "BTC-USD"}], lambda row: row["name"]
+    )
+
+    with pytest.raises(AssertionError):
+        snapshot.get("BTC", "USD")
+
+
+@pytest.mark.asyncio
+async def test_fetch_gemini_requests_pricefeed_once(monkeypatch):
+    requests_seen = []
+
+    async def pricefeed(request):
+        requests_seen.append(request.path)
+        return web.json_response(PRICEFEED)
+
+    app = web.Application()
+    app.router.add_get("/pricefeed", pricefeed)
+    assets = [
+        Asset("SPOT", ("BTC", "USD"), decimals=8),
+        Asset("SPOT", ("ETH", "USD"), decimals=8),
+        Asset("SPOT", ("SOL", "USD"), decimals=8),
+    ]
+
+    async with serve_app(app) as base_url:
+        monkeypatch.setattr(gemini, "BASE_URL", base_url)
+        monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+        async with Transport() as transport:
+            entries = await fetch_gemini_async(assets, transport)
+
+    assert requests_seen == ["/pricefeed"]
+    assert [entry.value for entry in entries] == [2000050000000, 100025000000]
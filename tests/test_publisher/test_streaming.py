@@ -0,0 +1,186 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from pontis.core.utils import str_to_felt
+from pontis.publisher import streaming
+from pontis.publisher.assets import Asset
+from pontis.publisher.replay import serve_app
+from pontis.publisher.streaming import (
+    BinanceStream,
+    CoinbaseStream,
+    GeminiStream,
+    StreamingFetcher,
+    TickerCache,
+    create_streams,
+    with_streaming_fetchers,
+)
+
+
+def make_coinbase_app(subscriptions):
+    """Stand-in Coinbase feed that sends one tick per connection, then hangs up."""
+
+    async def feed(request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+
+        subscription = json.loads((await websocket.receive()).data)
+        subscriptions.append(subscription)
+        await websocket.send_json({"type": "subscriptions"})
+        await websocket.send_json(
+            {
+                "type": "ticker",
+                "product_id": "ETH-USD",
+                "price": str(1000 + len(subscriptions)),
+                "time": "2022-06-01T12:00:00.000000Z",
+            }
+        )
+        await websocket.close()
+        return websocket
+
+    app = web.Application()
+    app.router.add_get("/feed", feed)
+    return app
+
+
+async def wait_for(condition, timeout=2):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met in time")
+
+
+@pytest.mark.asyncio
+async def test_stream_updates_cache_and_resubscribes(monkeypatch):
+    monkeypatch.setattr(streaming, "INITIAL_RECONNECT_DELAY", 0.01)
+    subscriptions = []
+    cache = TickerCache()
+
+    async with serve_app(make_coinbase_app(subscriptions)) as base_url:
+        stream = CoinbaseStream([("ETH", "USD")], url=f"{base_url}/feed")
+        stream.start(cache)
+        await wait_for(lambda: len(subscriptions) >= 2)
+        await stream.stop()
+
+    assert subscriptions[0] == subscriptions[1]
+    assert subscriptions[0]["product_ids"] == ["ETH-USD"]
+    tick = cache.get("Coinbase", "ETH", "USD")
+    assert tick.timestamp == 1654084800
+    assert float(tick.price) >= 1002
+
+
+@pytest.mark.asyncio
+async def test_stream_skips_malformed_messages():
+    cache = TickerCache()
+    connections = []
+
+    async def feed(request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        connections.append(request)
+        await websocket.receive()
+        await websocket.send_str("not json")
+        await websocket.send_json(
+            {"type": "ticker", "product_id": "ETH-USD", "price": "1000.5"}
+        )
+        await websocket.send_json(
+            {
+                "type": "ticker",
+                "product_id": "ETH-USD",
+                "price": "1001.5",
+                "time": "2022-06-01T12:00:00.000000Z",
+            }
+        )
+        await websocket.receive()
+        return websocket
+
+    app = web.Application()
+    app.router.add_get("/feed", feed)
+
+    async with serve_app(app) as base_url:
+        stream = CoinbaseStream([("ETH", "USD")], url=f"{base_url}/feed")
+        stream.start(cache)
+        await wait_for(lambda: cache.get("Coinbase", "ETH", "USD") is not None)
+        assert not stream.task.done()
+        await stream.stop()
+
+    assert len(connections) == 1
+    assert cache.get("Coinbase", "ETH", "USD").price == "1001.5"
+
+
+@pytest.mark.asyncio
+async def test_streaming_fetcher_reads_recent_ticks(monkeypatch):
+    monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+    cache = TickerCache()
+    cache.update("Coinbase", "ETH", "USD", "1000.25", 1654084800)
+    fetcher = StreamingFetcher(CoinbaseStream([("ETH", "USD"), ("BTC", "USD")]), cache)
+    assets = [
+        Asset("SPOT", ("ETH", "USD"), decimals=8),
+        Asset("SPOT", ("BTC", "USD"), decimals=8),
+    ]
+
+    entries = await fetcher.fetch(assets)
+
+    assert [(entry.key, entry.value) for entry in entries] == [
+        (str_to_felt("eth/usd"), 100025000000)
+    ]
+    assert entries[0].publisher == str_to_felt("test-coinbase")
+
+    cache.ticks[("Coinbase", "ETH", "USD")] = cache.ticks[
+        ("Coinbase", "ETH", "USD")
+    ]._replace(received_at=0)
+    assert await fetcher.fetch(assets) == []
+
+
+def test_binance_and_gemini_messages_are_parsed():
+    binance = BinanceStream([("BTC", "USD")])
+    gemini = GeminiStream([("BTC", "USD")])
+
+    assert binance.parse_message(
+        {"e": "24hrTicker", "s": "BTCUSD", "c": "20000.5", "E": 1654084800123}
+    ) == [("BTC", "USD", "20000.5", 1654084800)]
+    assert binance.parse_message({"result": None, "id": 1}) == []
+    assert gemini.parse_message(
+        {
+            "type": "trade",
+            "symbol": "BTCUSD",
+            "price": "20000.5",
+            "timestamp": 1654084800123,
+        }
+    ) == [("BTC", "USD", "20000.5", 1654084800)]
+    assert gemini.parse_message({"type": "l2_updates", "symbol": "BTCUSD"}) == []
+
+
+def test_streaming_fetchers_replace_spot_only_fetchers():
+    assets = [
+        Asset("SPOT", ("ETH", "USD"), decimals=8),
+        Asset("FUTURE", ("ETH", "USD"), decimals=8),
+    ]
+    coinbase, binance = create_streams(["Coinbase", "Binance"], assets)
+    assert coinbase.pairs == [("ETH", "USD")]
+
+    class RestFetcher:
+        def __init__(self, name, asset_types):
+            self.name = name
+            self.asset_types = asset_types
+
+    fetchers = with_streaming_fetchers(
+        [
+            RestFetcher("Coinbase", {"SPOT": None}),
+            RestFetcher("Binance", {"FUTURE": None}),
+            RestFetcher("Bitstamp", {"SPOT": None}),
+        ],
+        [coinbase, binance],
+        TickerCache(),
+    )
+
+    assert [fetcher.name for fetcher in fetchers] == [
+        "Binance",
+        "Bitstamp",
+        "Coinbase stream",
+        "Binance stream",
+    ]
+    with pytest.raises(ValueError):
+        create_streams(["Kraken"], assets)
@@ -0,0 +1,147 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from pontis.core.utils import str_to_felt
+from pontis.publisher.assets import Asset
+from pontis.publisher.fetch import TheGraphFetcher, fetch_thegraph_async, thegraph
+from pontis.publisher.fetch.thegraph import build_query
+from pontis.publisher.orchestrator import publish_all_sources
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import Transport
+
+USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+DAI = "0x6b175474e89094c44da98b954eedeac495271d0f"
+
+
+def aave_asset(key, asset_name, asset_address, metric):
+    return Asset(
+        "ONCHAIN",
+        key=key,
+        source="AAVE",
+        detail={
+            "asset_name": asset_name,
+            "asset_address": asset_address,
+            "metric": metric,
+        },
+        decimals=18,
+    )
+
+
+ASSETS = [
+    aave_asset("aave-usdc-variable", "USD Coin", USDC, "variableBorrowRate"),
+    aave_asset("aave-usdc-stable", "USD Coin", USDC, "stableBorrowRate"),
+    aave_asset("aave-dai-variable", "Dai Stablecoin", DAI, "variableBorrowRate"),
+]
+
+
+def reserve(name, variable_rate, stable_rate):
+    return [
+        {
+            "name": name,
+            "isActive": True,
+            "isFrozen": False,
+            "variableBorrowRate": variable_rate,
+            "stableBorrowRate": stable_rate,
+        }
+    ]
+
+
+@pytest_asyncio.fixture
+async def subgraph(monkeypatch):
+    state = {"block": 15000000, "queries": []}
+
+    async def query(request):
+        state["queries"].append((await request.json())["query"])
+        return web.json_response(
+            {
+                "data": {
+                    "_meta": {"block": {"number": state["block"]}},
+                    "e0": reserve(
+                        "USD Coin", "25000000000000000000000000", "1" + "0" * 26
+                    ),
+                    "e1": reserve("Dai Stablecoin", "3" + "0" * 25, "0"),
+                }
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/aave/protocol-v2", query)
+    async with serve_app(app) as base_url:
+        monkeypatch.setattr(thegraph, "BASE_URL", base_url + "/")
+        monkeypatch.setenv("PUBLISHER_PREFIX", "test")
+        yield state
+
+
+def test_build_query_aliases_each_entity_once():
+    query, aliases = build_query(ASSETS)
+
+    assert aliases == ["e0", "e0", "e1"]
+    assert query == (
+        "query {_meta {block {number}} "
+        f'e0: reserves(where: {{id: "{USDC}"}}) '
+        "{name isActive isFrozen variableBorrowRate stableBorrowRate} "
+        f'e1: reserves(where: {{id: "{DAI}"}}) '
+        "{name isActive isFrozen variableBorrowRate}}"
+    )
+
+
+def test_build_query_rejects_unsafe_input():
+    asset = aave_asset("aave", "USD Coin", '0x0"}) { id', "variableBorrowRate")
+
+    with pytest.raises(ValueError):
+        build_query([asset])
+
+
+@pytest.mark.asyncio
+async def test_fetch_thegraph_uses_single_request_per_subgraph(subgraph):
+    async with Transport() as transport:
+        entries = await fetch_thegraph_async(ASSETS, transport)
+
+    assert len(subgraph["queries"]) == 1
+    assert [(entry.key, entry.value) for entry in entries] == [
+        (str_to_felt("aave-usdc-variable"), 25000000000000000),
+        (str_to_felt("aave-usdc-stable"), 100000000000000000),
+        (str_to_felt("aave-dai-variable"), 30000000000000000),
+    ]
+
+
+class PublisherClient:
+    def __init__(self, error=None):
+        self.error = error
+
+    async def publish_many(self, entries):
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.mark.asyncio
+async def test_thegraph_fetcher_skips_blocks_once_published(subgraph):
+    fetcher = TheGraphFetcher()
+
+    async def fetch_and_publish(client):
+        entries = await fetcher.fetch(ASSETS, transport)
+        await publish_all_sources(client, {fetcher.name: entries}, [fetcher])
+        return len(entries)
+
+    async with Transport() as transport:
+        failed = await fetch_and_publish(PublisherClient(ConnectionError()))
+        retried = await fetch_and_publish(PublisherClient())
+        unchanged = await fetch_and_publish(PublisherClient())
+        subgraph["block"] += 1
+        changed = await fetch_and_publish(PublisherClient())
+
+    assert (failed, retried, unchanged, changed) == (3, 3, 0, 3)
+
+
+@pytest.mark.asyncio
+async def test_fetch_thegraph_rejects_unexpected_reserve(subgraph):
+    asset = aave_asset("aave-usdc", "Tether USD", USDC, "variableBorrowRate")
+    async with Transport() as transport:
+        with pytest.raises(AssertionError):
+            await fetch_thegraph_async([asset], transport)
+
+
+def test_thegraph_fetcher_only_supports_known_sources():
+    unknown = Asset("ONCHAIN", key="compound", source="COMPOUND")
+
+    assert TheGraphFetcher().supported_assets(ASSETS + [unknown]) == ASSETS
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from pontis.publisher.replay import serve_app
+from pontis.publisher.transport import HTTPStatusError, Timeout, Transport
+
+
+def make_app(peers):
+    async def ok(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    async def missing(request):
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_get("/ok", ok)
+    app.router.add_get("/slow", slow)
+    app.router.add_get("/missing", missing)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_transport_reuses_connections_per_host():
+    peers = []
+    async with serve_app(make_app(peers)) as base_url:
+        async with Transport() as transport:
+            for _ in range(3):
+                response = await transport.get(f"{base_url}/ok")
+                assert response.json() == {"ok": True}
+
+    assert len(peers) == 3
+    assert len(set(peers)) == 1
+
+
+@pytest.mark.asyncio
+async def test_transport_uses_source_timeouts():
+    timeouts = {"slow-source": Timeout(connect=1, read=0.1)}
+    async with serve_app(make_app([])) as base_url:
+        async with Transport(source_timeouts=timeouts) as transport:
+            with pytest.raises(asyncio.TimeoutError):
+                await transport.get(f"{base_url}/slow", source="slow-source")
+
+
+@pytest.mark.asyncio
+async def test_transport_raise_for_status():
+    async with serve_app(make_app([])) as base_url:
+        async with Transport() as transport:
+            response = await transport.get(f"{base_url}/missing")
+
+    assert response.status == 404
+    with pytest.raises(HTTPStatusError):
+        response.raise_for_status()